@@ -0,0 +1,66 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from metrics import registry
+
+
+# Route class -> (concurrent requests, queued requests) unless overridden
+ADMISSION_DEFAULTS = {
+    'build': (1, 16),   # cold dataset builds
+    'search': (2, 8),   # full-tree /api/search dumps
+    'export': (2, 8),   # inline workbook exports
+}
+
+admission_in_flight = registry.gauge('admission_in_flight', 'Admitted requests running per route class')
+admission_queued = registry.gauge('admission_queued', 'Requests waiting for a slot per route class')
+admission_rejected_total = registry.counter('admission_rejected_total', 'Requests rejected with 429 per route class')
+
+
+class AdmissionRejected(Exception):
+    """Raised when a route class is at its concurrency limit and its queue is full."""
+
+    def __init__(self, route_class: str, retry_after: int):
+        super().__init__(f"Too many {route_class} requests in progress")
+        self.route_class = route_class
+        self.retry_after = retry_after
+
+
+class AdmissionLimiter:
+    """Concurrency limit with a bounded wait queue for one class of expensive routes.
+
+    Up to max_concurrent requests run at once and up to max_queue wait for a
+    slot; beyond that requests are turned away immediately, so a burst of
+    heavy requests can't pile up behind each other or crowd out cheap ones.
+    """
+
+    def __init__(self, route_class: str, max_concurrent: int, max_queue: int, retry_after: int = 5):
+        self.route_class = route_class
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.running = 0
+        self.waiting = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        if self.semaphore.locked() and self.waiting >= self.max_queue:
+            admission_rejected_total.inc(route_class=self.route_class)
+            raise AdmissionRejected(self.route_class, self.retry_after)
+
+        self.waiting += 1
+        admission_queued.set(self.waiting, route_class=self.route_class)
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+            admission_queued.set(self.waiting, route_class=self.route_class)
+
+        self.running += 1
+        admission_in_flight.set(self.running, route_class=self.route_class)
+        try:
+            yield
+        finally:
+            self.running -= 1
+            admission_in_flight.set(self.running, route_class=self.route_class)
+            self.semaphore.release()
@@ -0,0 +1,80 @@
+import numpy as np
+from typing import Dict, List, Optional
+
+from drilldown import PAPER_SORT_KEYS
+from flat_tables import RaggedArray, RecordTable
+from leaderboards import h_index
+
+
+class AuthorIndex:
+    """Authors keyed by Scopus author ID, merged across all their affiliations.
+
+    The hierarchy holds one author entry per country and university, each
+    with its own paper list. This index keeps one profile per author with
+    every affiliation, the unique papers and totals, stored as one record
+    per author key. Papers are stored as integer keys pre-sorted per sort
+    key and only turned into paper dicts for the requested page.
+    """
+
+    def __init__(self, data: List[Dict], papers: RecordTable, ids, author_papers: RaggedArray,
+                 paper_dicts: List[Dict]):
+        """papers are in integer key order, as records and as dicts; author_papers holds each author's paper keys by author key."""
+        self.papers = papers
+        self.ids = ids
+
+        affiliations = {}
+        for country in data:
+            for uni in country['universities']:
+                for author in uni['authors']:
+                    affiliations.setdefault(author['id'], (author['name'], []))[1].append({
+                        'countryId': country['id'],
+                        'country': country['name'],
+                        'universityId': uni['id'],
+                        'university': uni['name'],
+                        'paperCount': author['paperCount']
+                    })
+
+        citations = np.array([paper.get('cited_by') or 0 for paper in paper_dicts], dtype=np.int64)
+        sort_values = {
+            key: [fn(paper) for paper in paper_dicts] for key, fn in PAPER_SORT_KEYS.items()
+        }
+        profiles = [None] * ids.count('author')
+        sorted_papers = {key: [np.zeros(0, dtype=np.int32)] * len(profiles) for key in sort_values}
+        for author_id, (name, author_affiliations) in affiliations.items():
+            row = ids.key('author', author_id)
+            keys = author_papers[row]
+            cites = np.sort(citations[keys])[::-1]
+            author_affiliations.sort(key=lambda a: (-a['paperCount'], a['university']))
+            profiles[row] = {
+                'id': author_id,
+                'name': name,
+                'affiliations': author_affiliations,
+                'paperCount': len(keys),
+                'citations': int(cites.sum()),
+                'hIndex': h_index(cites)
+            }
+            for key, values in sort_values.items():
+                sorted_papers[key][row] = sorted(keys.tolist(), key=values.__getitem__, reverse=True)
+
+        self.profiles = RecordTable(profiles)
+        self.sorted_papers = {key: RaggedArray(rows) for key, rows in sorted_papers.items()}
+
+    @classmethod
+    def from_processor(cls, processor) -> 'AuthorIndex':
+        """Build the index from a processed CSVProcessor."""
+        return cls(
+            processor.get_processed_data() or [], processor.paper_table(), processor.ids,
+            processor.entity_papers.get('author', RaggedArray([])), processor.paper_list()
+        )
+
+    def get(self, author_id: str) -> Optional[Dict]:
+        """Get an author's merged profile, without papers, or None if unknown."""
+        row = self.ids.key('author', author_id)
+        return None if row is None else self.profiles[row]
+
+    def paper_keys(self, author_id: str, sort_key: str) -> np.ndarray:
+        """An author's paper keys in descending order of a sort key."""
+        return self.sorted_papers[sort_key][self.ids.key('author', author_id)]
+
+    def paper_dicts(self, keys) -> List[Dict]:
+        return self.papers.rows(keys)
@@ -0,0 +1,112 @@
+import numpy as np
+from scipy import sparse
+from typing import Dict, List, Optional
+
+from flat_tables import RecordTable
+
+
+GRAPH_KINDS = ('country', 'university')
+
+
+class CollaborationGraph:
+    """Weighted co-authorship edges between countries and between universities.
+
+    Edges come from a sparse paper × entity incidence matrix A: the product
+    A^T A counts, for every pair of entities, the papers they share. Only the
+    non-zero upper triangle is kept, sorted by weight, so top-k queries are a
+    slice and min-weight filters are a binary search.
+    """
+
+    def __init__(self, ids):
+        self.ids = ids
+        self.kinds = {}
+
+    @classmethod
+    def from_processor(cls, processor) -> 'CollaborationGraph':
+        """Build country and university graphs from a processed CSVProcessor."""
+        graph = cls(processor.ids)
+
+        # Display details for each node, taken from the hierarchy
+        nodes = {'country': {}, 'university': {}}
+        for country in processor.get_processed_data() or []:
+            nodes['country'][country['id']] = {
+                'name': country['name'],
+                'lat': country['lat'],
+                'lng': country['lng']
+            }
+            for uni in country['universities']:
+                nodes['university'].setdefault(uni['id'], {
+                    'name': uni['name'],
+                    'country': country['name'],
+                    'countryId': country['id']
+                })
+
+        for kind in GRAPH_KINDS:
+            graph.add_kind(kind, *processor.incidence(kind), nodes[kind])
+        return graph
+
+    def add_kind(self, kind: str, entity_keys: np.ndarray, paper_keys: np.ndarray, nodes: Dict[str, Dict]):
+        """Compute the co-authorship edges of one entity kind from its (entity key, paper key) pairs."""
+        entity_ids = self.ids.id_list(kind)
+        incidence = sparse.csr_matrix(
+            (np.ones(len(paper_keys), dtype=np.int32), (paper_keys, entity_keys)),
+            shape=(len(self.ids.paper_ids), len(entity_ids))
+        )
+
+        co_papers = sparse.triu(incidence.T @ incidence, k=1).tocoo()
+        order = np.argsort(-co_papers.data, kind='stable')
+
+        self.kinds[kind] = {
+            'ids': entity_ids,
+            'nodes': RecordTable(nodes.get(entity_id, {'name': entity_id}) for entity_id in entity_ids),
+            'source': co_papers.row[order].astype(np.int32),
+            'target': co_papers.col[order].astype(np.int32),
+            'weight': co_papers.data[order].astype(np.int32)
+        }
+        return self
+
+    def edges(self, kind: str, top_k: Optional[int] = None, min_weight: int = 1,
+              entity_id: Optional[str] = None) -> Optional[List[Dict]]:
+        """Get the heaviest edges, optionally restricted to those touching one entity.
+
+        Returns None if the entity is unknown.
+        """
+        graph = self.kinds[kind]
+        weights = graph['weight']
+
+        # Weights are sorted descending, so the min-weight cut is a prefix
+        end = int(np.searchsorted(-weights, -min_weight, side='right'))
+        selected = np.arange(end)
+
+        if entity_id is not None:
+            row = self.ids.key(kind, entity_id)
+            if row is None:
+                return None
+            touches = (graph['source'][:end] == row) | (graph['target'][:end] == row)
+            selected = selected[touches]
+
+        if top_k is not None:
+            selected = selected[:top_k]
+
+        ids = graph['ids']
+        return [
+            {
+                'source': ids[graph['source'][i]],
+                'target': ids[graph['target'][i]],
+                'weight': int(weights[i])
+            }
+            for i in selected
+        ]
+
+    def nodes_for(self, kind: str, edges: List[Dict]) -> List[Dict]:
+        """Node details for every entity referenced by a list of edges."""
+        graph = self.kinds[kind]
+        seen = {}
+        for edge in edges:
+            for entity_id in (edge['source'], edge['target']):
+                if entity_id not in seen:
+                    seen[entity_id] = {'id': entity_id, **graph['nodes'][self.ids.key(kind, entity_id)]}
+        return list(seen.values())
+
+    def edge_count(self, kind: str) -> int:
+        return len(self.kinds[kind]['weight'])
@@ -96,6 +96,58 @@ COUNTRY_COORDINATES = {
     'sudan': {'lat': 12.8628, 'lng': 30.2176},
 }
 
+# Alternative spellings -> canonical name, applied once at ingest so the same
+# country never appears twice. Canonical names follow Scopus affiliation
+# countries, which keeps the IDs of countries already in the data unchanged.
+COUNTRY_ALIASES = {
+    'uk': 'United Kingdom',
+    'u.k.': 'United Kingdom',
+    'great britain': 'United Kingdom',
+    'england': 'United Kingdom',
+    'scotland': 'United Kingdom',
+    'wales': 'United Kingdom',
+    'northern ireland': 'United Kingdom',
+    'usa': 'United States',
+    'u.s.a.': 'United States',
+    'us': 'United States',
+    'u.s.': 'United States',
+    'united states of america': 'United States',
+    'vietnam': 'Viet Nam',
+    'russia': 'Russian Federation',
+    'brunei': 'Brunei Darussalam',
+    'uae': 'United Arab Emirates',
+    'u.a.e.': 'United Arab Emirates',
+    'korea': 'South Korea',
+    'republic of korea': 'South Korea',
+    'korea, republic of': 'South Korea',
+    'czechia': 'Czech Republic',
+    'türkiye': 'Turkey',
+    'turkiye': 'Turkey',
+    'macau': 'Macao',
+    'iran, islamic republic of': 'Iran',
+    'islamic republic of iran': 'Iran',
+    'hong kong sar': 'Hong Kong',
+    'hong kong, china': 'Hong Kong',
+    'state of palestine': 'Palestine',
+    'the netherlands': 'Netherlands',
+    'holland': 'Netherlands',
+    'taiwan, province of china': 'Taiwan',
+    "people's republic of china": 'China',
+    'pr china': 'China',
+    'p.r. china': 'China',
+}
+
+
+CANONICAL_COUNTRIES = {name.lower(): name for name in COUNTRY_ALIASES.values()}
+
+
+def canonical_country_name(country_name: str) -> str:
+    """Get the canonical name for a country, resolving aliases (case-insensitive)."""
+    name = ' '.join(country_name.split())
+    key = name.lower()
+    return COUNTRY_ALIASES.get(key) or CANONICAL_COUNTRIES.get(key, name)
+
+
 def get_country_coordinates(country_name: str) -> dict:
     """Get coordinates for a country name (case-insensitive)."""
     key = country_name.lower().strip()
@@ -1,28 +1,49 @@
 import pandas as pd
+import numpy as np
 import os
-from typing import Dict, List, Set
+from typing import Dict, List, Set, Tuple
 from collections import defaultdict
-import hashlib
 import re
-from country_coordinates import get_country_coordinates
+from country_coordinates import get_country_coordinates, canonical_country_name
+from entity_ids import EntityIds, ID_KINDS
+from flat_tables import RaggedArray, RecordTable
+from metrics import timed_stage
 
 
 class CSVProcessor:
-    def __init__(self, csv_path: str, year_filter: int = None):
+    def __init__(self, csv_path: str, year_filter: int = None, affiliation_mode: str = 'precise'):
         self.csv_path = csv_path
+        self.affiliation_mode = affiliation_mode  # see data_cleaner.AFFILIATION_MODES
         self.df = None
+        self.quarantined = None  # rows rejected by row_validation, with a Reason column
         self.processed_data = None
         self.year_filter = year_filter
+        self.papers = {}  # paper_id -> paper
+        self.ids = EntityIds()  # public IDs and integer keys shared by the indexes
+        self.entity_papers = {}  # kind -> ragged array of sorted paper keys by entity key
+        self._incidence = {}
+        self._paper_table = None
         
     def load_csv(self):
         """Load CSV file into pandas DataFrame."""
         print(f"Loading CSV from {self.csv_path}...")
         
-        # Import cleaner
-        from data_cleaner import load_and_clean_csv
+        from dataset_manifest import load_sources, dataset_version
+        from entity_resolution import resolve_universities, apply_university_mapping
+        from row_validation import validate_rows
         
-        # Load and auto-clean if needed
-        self.df = load_and_clean_csv(self.csv_path)
+        # Load and auto-clean if needed, merging multi-file sources
+        self.df = load_sources(self.csv_path, self.affiliation_mode)
+        
+        # Set malformed rows aside so they can't fail processing of the rest
+        with timed_stage('validate'):
+            self.df, self.quarantined = validate_rows(self.df)
+        
+        # Merge university spelling variants on the full dataset so every year
+        # filter sees the same canonical names
+        with timed_stage('resolve'):
+            mapping = resolve_universities(self.df, dataset_version(self.csv_path))
+            self.df = apply_university_mapping(self.df, mapping)
         
         # Apply year filter if specified
         if self.year_filter:
@@ -38,21 +59,14 @@ class CSVProcessor:
             return None
         return str(text).strip()
     
-    def generate_id(self, text: str) -> str:
-        """Generate a unique ID from text."""
-        if not text:
-            return ""
-        clean = re.sub(r'[^a-z0-9]', '', text.lower())
-        return clean[:50] if len(clean) > 50 else clean
-    
     def extract_author_id(self, author_text: str) -> str:
-        """Extract author ID from 'Name (ID)' format."""
+        """Extract the Scopus author ID from 'Name (ID)' format, or None if absent."""
         if not author_text or pd.isna(author_text):
             return None
         match = re.search(r'\((\d+)\)', author_text)
         if match:
             return match.group(1)
-        return self.generate_id(author_text)
+        return None
     
     def extract_author_name(self, author_text: str) -> str:
         """Extract author name from 'Name (ID)' format."""
@@ -88,8 +102,18 @@ class CSVProcessor:
             return parts[0].strip(), parts[1].strip()
         return None, affiliation_text.strip()
     
+    def numbered_columns(self, prefix: str) -> int:
+        """Highest N among the '<prefix> N' columns of the frame."""
+        pattern = re.compile(rf'^{re.escape(prefix)} (\d+)$')
+        numbers = [int(m.group(1)) for m in map(pattern.match, self.df.columns) if m]
+        return max(numbers, default=0)
+    
     def process_data(self):
         """Process CSV and build hierarchical data structure."""
+        with timed_stage('process'):
+            return self._process_data()
+    
+    def _process_data(self):
         print("Processing data...")
         
         # Data structures
@@ -108,10 +132,17 @@ class CSVProcessor:
         })
         
         all_papers = {}
+        precise = self.affiliation_mode == 'precise'
+        
+        # Cleaned files have as many numbered columns as their widest paper
+        author_slots = self.numbered_columns('Author')
+        country_slots = self.numbered_columns('Country')
+        university_slots = self.numbered_columns('University')
+        affiliation_slots = self.numbered_columns('Author with Affliliation')
         
         # Process each paper
         for idx, row in self.df.iterrows():
-            paper_id = self.clean_text(row.get('EID', f'paper_{idx}'))
+            paper_id = self.clean_text(row.get('EID')) or f'paper_{idx}'
             
             # Extract paper details
             paper = {
@@ -128,7 +159,7 @@ class CSVProcessor:
             
             # Extract authors with IDs
             authors_in_paper = []
-            for i in range(1, 11):
+            for i in range(1, author_slots + 1):
                 author_col = f'Author {i}'
                 if author_col in row and pd.notna(row[author_col]):
                     author_text = self.clean_text(row[author_col])
@@ -140,19 +171,20 @@ class CSVProcessor:
             
             paper['authors'] = [name for name, _, _ in authors_in_paper]
             all_papers[paper_id] = paper
+            self.ids.add_paper(paper_id)
             
             # Extract countries with indices
             paper_countries = {}  # index -> country
-            for i in range(1, 19):
+            for i in range(1, country_slots + 1):
                 country_col = f'Country {i}'
                 if country_col in self.df.columns and pd.notna(row.get(country_col)):
                     country = self.clean_text(row.get(country_col))
                     if country:
-                        paper_countries[i] = country
+                        paper_countries[i] = canonical_country_name(country)
             
             # Extract universities with indices
             paper_universities = {}  # index -> university
-            for i in range(1, 19):
+            for i in range(1, university_slots + 1):
                 uni_col = f'University {i}'
                 if uni_col in self.df.columns and pd.notna(row.get(uni_col)):
                     uni = self.clean_text(row.get(uni_col))
@@ -160,8 +192,8 @@ class CSVProcessor:
                         paper_universities[i] = uni
             
             # Extract author-affiliation mapping
-            author_affiliations = {}  # normalized_author_name -> (original_name, university, index)
-            for i in range(1, 11):
+            author_affiliations = {}  # normalized_author_name -> (original_name, universities, index)
+            for i in range(1, affiliation_slots + 1):
                 affil_col = f'Author with Affliliation {i}'
                 if affil_col in row and pd.notna(row[affil_col]):
                     affil_text = self.clean_text(row[affil_col])
@@ -177,18 +209,22 @@ class CSVProcessor:
                             if uni_idx is not None:
                                 # Store with normalized name as key
                                 normalized = self.normalize_author_name(author_name)
-                                author_affiliations[normalized] = (author_name, university, uni_idx)
+                                if precise:
+                                    # Keep every institution of an author with several
+                                    author_affiliations.setdefault(normalized, (author_name, set(), uni_idx))[1].add(university)
+                                else:
+                                    author_affiliations[normalized] = (author_name, {university}, uni_idx)
             
             # Build hierarchical structure with correct country-university association
             for uni_idx, university in paper_universities.items():
                 # University N is associated with Country N
                 if uni_idx in paper_countries:
                     country = paper_countries[uni_idx]
-                    country_id = self.generate_id(country)
+                    country_id = self.ids.assign('country', country)
                     countries_data[country_id]['name'] = country
                     countries_data[country_id]['paper_ids'].add(paper_id)
                     
-                    uni_id = self.generate_id(university)
+                    uni_id = self.ids.assign('university', university)
                     countries_data[country_id]['universities'][uni_id]['name'] = university
                     countries_data[country_id]['universities'][uni_id]['paper_ids'].add(paper_id)
                     
@@ -198,10 +234,10 @@ class CSVProcessor:
                         # Normalize author name for matching
                         normalized_author = self.normalize_author_name(author_name)
                         if normalized_author in author_affiliations:
-                            original_name, affil_uni, affil_uni_idx = author_affiliations[normalized_author]
+                            original_name, affil_unis, affil_uni_idx = author_affiliations[normalized_author]
                             # Match by university name
-                            if affil_uni == university:
-                                author_id = author_id_num if author_id_num else self.generate_id(author_name)
+                            if university in affil_unis:
+                                author_id = author_id_num or self.ids.assign('author', author_name)
                                 author_data = countries_data[country_id]['universities'][uni_id]['authors'][author_id]
                                 author_data['name'] = author_name  # Use name from Author column (with ID format)
                                 author_data['affiliation'] = university
@@ -209,24 +245,38 @@ class CSVProcessor:
                                 authors_added_to_uni = True
                     
                     # If no authors were matched to this university, add all authors from the paper
-                    # This handles cases where university is listed but author affiliations don't specify it
+                    # This handles cases where university is listed but author affiliations don't specify it.
+                    # In precise mode only authors not matched to any of the paper's universities are added.
                     if not authors_added_to_uni and len(authors_in_paper) > 0:
                         for author_name, author_id_num, author_idx in authors_in_paper:
-                            author_id = author_id_num if author_id_num else self.generate_id(author_name)
+                            if precise and self.normalize_author_name(author_name) in author_affiliations:
+                                continue
+                            author_id = author_id_num or self.ids.assign('author', author_name)
                             author_data = countries_data[country_id]['universities'][uni_id]['authors'][author_id]
                             author_data['name'] = author_name
                             author_data['affiliation'] = university
                             author_data['paper_ids'].add(paper_id)
         
+        # Keep per-entity paper sets, by integer key, so indexes can be built on top of the hierarchy
+        entity_paper_keys = {kind: defaultdict(set) for kind in ID_KINDS}
+        paper_keys = self.ids.paper_keys
+        
         # Build final structure with UNIQUE counts
         result = []
         for country_id, country_data in countries_data.items():
             universities = []
+            keys = {paper_keys[pid] for pid in country_data['paper_ids']}
+            entity_paper_keys['country'][self.ids.key('country', country_id)] = keys
             
             for uni_id, uni_data in country_data['universities'].items():
                 authors = []
+                keys = {paper_keys[pid] for pid in uni_data['paper_ids']}
+                entity_paper_keys['university'][self.ids.key('university', uni_id)].update(keys)
+                entity_paper_keys['country_university'][self.ids.add('country_university', f"{country_id}/{uni_id}")] = keys
                 
                 for author_id, author_data in uni_data['authors'].items():
+                    author_key = self.ids.add('author', author_id)
+                    entity_paper_keys['author'][author_key].update(paper_keys[pid] for pid in author_data['paper_ids'])
                     paper_ids = list(author_data['paper_ids'])  # Already a set, so unique
                     authors.append({
                         'id': author_id,
@@ -256,15 +306,48 @@ class CSVProcessor:
                 })
         
         self.processed_data = sorted(result, key=lambda x: x['paperCount'], reverse=True)
+        self.papers = all_papers
+        self.entity_papers = {
+            kind: RaggedArray([
+                np.array(sorted(entity_paper_keys[kind][key]), dtype=np.int32)
+                for key in range(self.ids.count(kind))
+            ])
+            for kind in ID_KINDS
+        }
+        # Every ID is assigned by now; the indexes share the flat, mappable form
+        self.ids = self.ids.freeze()
         print(f"Processed {len(self.processed_data)} countries")
         return self
     
+    def incidence(self, kind: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(entity key, paper key) pairs of one kind, computed once and shared by the indexes."""
+        if kind not in self._incidence:
+            entity_papers = self.entity_papers.get(kind, RaggedArray([]))
+            rows = np.repeat(np.arange(len(entity_papers), dtype=np.int64), entity_papers.lengths())
+            cols = entity_papers.values.astype(np.int64)
+            self._incidence[kind] = (rows, cols)
+        return self._incidence[kind]
+    
+    def paper_list(self) -> List[Dict]:
+        """Papers in integer key order."""
+        return [self.papers[pid] for pid in self.ids.paper_ids]
+    
+    def paper_table(self) -> RecordTable:
+        """Papers in integer key order as one record table, built once and shared by the indexes."""
+        if self._paper_table is None:
+            self._paper_table = RecordTable(self.paper_list())
+        return self._paper_table
+    
     def get_processed_data(self):
         """Get the processed data."""
         return self.processed_data
     
     def get_stats(self):
         """Calculate statistics from processed data."""
+        with timed_stage('stats'):
+            return self._get_stats()
+    
+    def _get_stats(self):
         if not self.processed_data:
             return None
         
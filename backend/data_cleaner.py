@@ -1,12 +1,24 @@
 import pandas as pd
 import re
 from typing import Dict, List, Tuple
+from metrics import timed_stage
+
+# 'precise' maps each author to the institutions in their own segment of
+# 'Authors with affiliations'; 'all' assigns every author to every institution
+AFFILIATION_MODES = ('precise', 'all')
+
+# The 'all' mode keeps at most this many author/university slots per paper
+MAX_AFFILIATION_SLOTS = 10
+
 
 class DataCleaner:
     """Clean and normalize Scopus dataset to standard format."""
     
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, affiliation_mode: str = 'precise'):
+        if affiliation_mode not in AFFILIATION_MODES:
+            raise ValueError(f"affiliation_mode must be one of {', '.join(AFFILIATION_MODES)}")
         self.df = df
+        self.affiliation_mode = affiliation_mode
         self.is_cleaned = self._detect_format()
         
     def _detect_format(self) -> bool:
@@ -25,6 +37,9 @@ class DataCleaner:
             return self.df
         
         print("Cleaning uncleaned dataset...")
+        if self.affiliation_mode == 'precise':
+            return self._clean_precise()
+        
         cleaned_df = self.df.copy()
         
         # Parse Authors with affiliations
@@ -33,7 +48,7 @@ class DataCleaner:
             
             # Add parsed data to row
             for i, author_data in enumerate(authors_data, 1):
-                if i <= 10:  # Limit to 10 authors
+                if i <= MAX_AFFILIATION_SLOTS:
                     # Author column
                     if 'name' in author_data and 'id' in author_data:
                         cleaned_df.at[idx, f'Author {i}'] = f"{author_data['name']} ({author_data['id']})"
@@ -53,6 +68,42 @@ class DataCleaner:
         print(f"Cleaning complete. Dataset now has {len(cleaned_df)} papers.")
         return cleaned_df
     
+    def _clean_precise(self) -> pd.DataFrame:
+        """Add the cleaned columns from real author-institution pairs only.
+        
+        Authors, institutions and author-institution pairs get their own
+        numbered columns, as many as the paper has, so nothing is truncated
+        and nothing is multiplied out.
+        """
+        records = []
+        for _, row in self.df.iterrows():
+            record = {}
+            pairs = self._parse_author_segments(row)
+            
+            authors = list(dict.fromkeys((name, author_id) for name, author_id, _ in pairs))
+            for i, (name, author_id) in enumerate(authors, 1):
+                record[f'Author {i}'] = f"{name} ({author_id})" if author_id else name
+            
+            institutions = {}
+            for _, _, insts in pairs:
+                for university, country in insts:
+                    institutions.setdefault((university.lower(), country.lower()), (university, country))
+            for i, (university, country) in enumerate(institutions.values(), 1):
+                record[f'University {i}'] = university
+                record[f'Country {i}'] = country
+            
+            slot = 0
+            for name, _, insts in pairs:
+                for university, _ in insts:
+                    slot += 1
+                    record[f'Author with Affliliation {slot}'] = f"{name} - {university}"
+            records.append(record)
+        
+        added = pd.DataFrame.from_records(records, index=self.df.index)
+        cleaned_df = pd.concat([self.df.drop(columns=added.columns, errors='ignore'), added], axis=1)
+        print(f"Cleaning complete. Dataset now has {len(cleaned_df)} papers.")
+        return cleaned_df
+    
     def _extract_universities_and_countries(self, affiliations_text: str) -> List[Tuple[str, str]]:
         """Extract ALL (university, country) pairs from affiliations text.
         
@@ -81,63 +132,68 @@ class DataCleaner:
             
             # Skip first 2 parts (LastName, FirstName)
             # Remaining parts: groups of affiliations
-            affiliation_parts = parts[2:]
+            for pair in self._affiliation_groups(parts[2:]):
+                key = (pair[0].lower(), pair[1].lower())
+                if key not in seen:
+                    seen.add(key)
+                    universities_countries.append(pair)
+        
+        return universities_countries
+    
+    def _affiliation_groups(self, affiliation_parts: List[str]) -> List[Tuple[str, str]]:
+        """Split the comma-separated parts after an author's name into (institution, country) pairs."""
+        groups = []
+        # Strategy: Process in groups of 3-4
+        # Pattern recognition: Institution, Location(s), Country
+        # Country is typically the last element in a group before next institution
+        
+        i = 0
+        while i < len(affiliation_parts):
+            # Take current part as institution
+            university = affiliation_parts[i]
             
-            # Strategy: Process in groups of 3-4
-            # Pattern recognition: Institution, Location(s), Country
-            # Country is typically the last element in a group before next institution
+            # Look ahead for the country (typically 2-3 positions ahead)
+            # Group size is usually 3 (Inst, City, Country) or 4 (Inst, City, State, Country)
             
-            i = 0
-            while i < len(affiliation_parts):
-                # Take current part as institution
-                university = affiliation_parts[i]
-                
-                # Look ahead for the country (typically 2-3 positions ahead)
-                # Group size is usually 3 (Inst, City, Country) or 4 (Inst, City, State, Country)
+            if i + 2 < len(affiliation_parts):
+                # Try pattern: Inst, City, Country
+                country = affiliation_parts[i + 2]
                 
-                if i + 2 < len(affiliation_parts):
-                    # Try pattern: Inst, City, Country
-                    country = affiliation_parts[i + 2]
+                # Check if i+3 exists and looks like another institution
+                # If i+3 has "university/college" keyword, then i+2 is likely the country
+                if i + 3 < len(affiliation_parts):
+                    next_part = affiliation_parts[i + 3].lower()
+                    has_inst_keyword = any(kw in next_part for kw in 
+                                         ['university', 'college', 'institute', 'school'])
                     
-                    # Check if i+3 exists and looks like another institution
-                    # If i+3 has "university/college" keyword, then i+2 is likely the country
-                    if i + 3 < len(affiliation_parts):
-                        next_part = affiliation_parts[i + 3].lower()
-                        has_inst_keyword = any(kw in next_part for kw in 
-                                             ['university', 'college', 'institute', 'school'])
-                        
-                        if has_inst_keyword:
-                            # Pattern: Inst, City, Country, NextInst
-                            # i+2 is the country
-                            pass  # country already set to i+2
-                        else:
-                            # Pattern might be: Inst, City, State, Country
-                            # Check if i+3 looks more like a country (shorter, no institution keywords)
-                            if len(affiliation_parts[i + 3]) < len(country) or i + 3 == len(affiliation_parts) - 1:
-                                country = affiliation_parts[i + 3]
-                                i += 4
-                            else:
-                                i += 3
-                    else:
-                        # End of list, i+2 is country
+                    if has_inst_keyword:
+                        # Pattern: Inst, City, Country, NextInst
+                        # i+2 is the country
                         i += 3
-                    
-                    key = (university.lower(), country.lower())
-                    if key not in seen and len(university) > 2 and len(country) > 1:
-                        seen.add(key)
-                        universities_countries.append((university, country))
-                elif i + 1 < len(affiliation_parts):
-                    # Only 2 elements: Inst, Country
-                    country = affiliation_parts[i + 1]
-                    key = (university.lower(), country.lower())
-                    if key not in seen and len(university) > 2 and len(country) > 1:
-                        seen.add(key)
-                        universities_countries.append((university, country))
-                    i += 2
+                    else:
+                        # Pattern might be: Inst, City, State, Country
+                        # Check if i+3 looks more like a country (shorter, no institution keywords)
+                        if len(affiliation_parts[i + 3]) < len(country) or i + 3 == len(affiliation_parts) - 1:
+                            country = affiliation_parts[i + 3]
+                            i += 4
+                        else:
+                            i += 3
                 else:
-                    i += 1
+                    # End of list, i+2 is country
+                    i += 3
+                
+                if len(university) > 2 and len(country) > 1:
+                    groups.append((university, country))
+            elif i + 1 < len(affiliation_parts):
+                # Only 2 elements: Inst, Country
+                country = affiliation_parts[i + 1]
+                if len(university) > 2 and len(country) > 1:
+                    groups.append((university, country))
+                i += 2
+            else:
+                i += 1
         
-        return universities_countries
+        return groups
     
     def _parse_authors_with_affiliations(self, row) -> List[Dict]:
         """Parse 'Authors with affiliations' field.
@@ -153,16 +209,7 @@ class DataCleaner:
             return []
         
         # Parse all authors with IDs
-        author_list = []
-        if author_full_names and author_full_names != 'nan':
-            parts = author_full_names.split(';')
-            for part in parts:
-                part = part.strip()
-                match = re.search(r'^(.+?)\s*\((\d+)\)$', part)
-                if match:
-                    full_name = match.group(1).strip()
-                    author_id = match.group(2).strip()
-                    author_list.append((full_name, author_id))
+        author_list = self._parse_author_full_names(author_full_names)
         
         # Extract all unique (university, country) pairs
         universities_countries = self._extract_universities_and_countries(authors_with_affil)
@@ -180,19 +227,73 @@ class DataCleaner:
         
         return authors_data
 
+    
+    def _parse_author_full_names(self, author_full_names: str) -> List[Tuple[str, str]]:
+        """Parse 'Author full names' into (name, Scopus ID) pairs, in author order."""
+        author_list = []
+        if author_full_names and author_full_names != 'nan':
+            for part in author_full_names.split(';'):
+                match = re.search(r'^(.+?)\s*\((\d+)\)$', part.strip())
+                if match:
+                    author_list.append((match.group(1).strip(), match.group(2).strip()))
+        return author_list
+    
+    def _parse_author_segments(self, row) -> List[Tuple[str, str, List[Tuple[str, str]]]]:
+        """Map each author to the institutions in their own 'Authors with affiliations' segment.
+        
+        Scopus lists one 'Last, First, Institution, City, Country, ...'
+        segment per author, in the same order as 'Author full names'.
+        Segments are matched to authors by position when the counts agree
+        and by surname otherwise. Returns (name, id, [(university, country)])
+        per author; authors without a segment get no institutions.
+        """
+        authors_with_affil = str(row.get('Authors with affiliations', ''))
+        author_list = self._parse_author_full_names(str(row.get('Author full names', '')))
+        
+        segments = []
+        if authors_with_affil and authors_with_affil != 'nan':
+            for entry in authors_with_affil.split(';'):
+                parts = [p.strip() for p in entry.split(',')]
+                if len(parts) >= 2 and parts[0]:
+                    segments.append((parts[0].lower(), self._affiliation_groups(parts[2:])))
+        
+        if len(segments) == len(author_list):
+            return [(name, author_id, insts) for (name, author_id), (_, insts) in zip(author_list, segments)]
+        
+        pairs = []
+        unused = list(segments)
+        for name, author_id in author_list:
+            surname = name.split(',')[0].strip().lower()
+            match = next((seg for seg in unused if seg[0] == surname), None)
+            if match is not None:
+                unused.remove(match)
+            pairs.append((name, author_id, match[1] if match else []))
+        return pairs
 
-def load_and_clean_csv(csv_path: str) -> pd.DataFrame:
+def load_and_clean_csv(csv_path: str, affiliation_mode: str = 'precise') -> pd.DataFrame:
     """Load CSV and automatically clean if needed."""
     print(f"Loading CSV from {csv_path}...")
-    df = pd.read_csv(csv_path)
+    with timed_stage('read'):
+        df = pd.read_csv(csv_path)
     print(f"Loaded {len(df)} papers")
     
-    cleaner = DataCleaner(df)
-    cleaned_df = cleaner.clean_and_normalize()
+    with timed_stage('clean'):
+        cleaner = DataCleaner(df, affiliation_mode)
+        cleaned_df = cleaner.clean_and_normalize()
     
     return cleaned_df
 
 
+def read_years(source: str) -> set:
+    """Read the set of publication years in a dataset source without loading the other columns."""
+    from dataset_manifest import source_paths
+    years = set()
+    for path in source_paths(source):
+        column = pd.read_csv(path, usecols=['Year'])['Year']
+        years.update(pd.to_numeric(column, errors='coerce').dropna().astype(int).tolist())
+    return years
+
+
 if __name__ == '__main__':
     # Test the cleaner
     df = load_and_clean_csv('/app/Scopus_Data_APU_2021_Dec_2025_Complete.csv')
@@ -0,0 +1,136 @@
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from metrics import cache_requests_total, cache_evictions_total, cache_entries, cache_bytes
+
+
+def deep_sizeof(obj: Any) -> int:
+    """Approximate memory held by a nested structure, counting shared objects once."""
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        # getsizeof already includes the buffer for numpy arrays that own their data,
+        # and arrays have no __dict__, so the walk stops there
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(item, '__dict__') and not isinstance(item, type):
+            stack.append(item.__dict__)
+    return total
+
+
+def pickled_size(obj: Any) -> int:
+    """Memory held by a value whose data lives in arrays: their buffers plus the pickled frame around them.
+
+    The arrays are handed over out-of-band rather than copied, so this costs
+    one pass over the small object frame instead of a walk of every object.
+    """
+    buffers = []
+    frame = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    return len(frame) + sum(buffer.raw().nbytes for buffer in buffers)
+
+
+class DatasetCache:
+    """LRU cache of built datasets, bounded by entry count and estimated memory.
+
+    Builds go through get_or_build(), which holds a per-key lock so concurrent
+    requests for the same cold key trigger one build rather than a stampede.
+    """
+
+    def __init__(self, name: str, max_entries: int = 8, max_bytes: Optional[int] = None):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (value, size)
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.build_locks = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def peek(self, key: Hashable):
+        """Get a value without counting a lookup or touching the LRU order."""
+        entry = self.entries.get(key)
+        return entry[0] if entry else None
+
+    def get(self, key: Hashable):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                cache_requests_total.inc(cache=self.name, result='miss')
+                return None
+            self.entries.move_to_end(key)
+        cache_requests_total.inc(cache=self.name, result='hit')
+        return entry[0]
+
+    def put(self, key: Hashable, value, size: Optional[int] = None):
+        """Store a value and evict least recently used entries beyond the limits."""
+        if size is None:
+            size = deep_sizeof(value)
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (value, size)
+            self.total_bytes += size
+
+            # Never evict the entry just stored, even if it alone exceeds the cap
+            while len(self.entries) > 1 and (
+                len(self.entries) > self.max_entries or
+                (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+            ):
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                cache_evictions_total.inc(cache=self.name)
+            self._update_gauges()
+
+    def get_or_build(self, key: Hashable, builder: Callable[[], Any], size_of: Optional[Callable[[Any], int]] = None):
+        """Return the cached value, building it at most once per key at a time.
+
+        Builders returning None are not cached, so a failed build is retried
+        on the next request. size_of reads the size of a built value, so the
+        build lock isn't held while put() estimates it.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self.lock:
+            build_lock = self.build_locks.setdefault(key, threading.Lock())
+
+        with build_lock:
+            # Another request may have finished the build while we waited
+            value = self.peek(key)
+            if value is not None:
+                return value
+            value = builder()
+            if value is not None:
+                self.put(key, value, size=size_of(value) if size_of else None)
+
+        with self.lock:
+            self.build_locks.pop(key, None)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+            self._update_gauges()
+
+    def _update_gauges(self):
+        cache_entries.set(len(self.entries), cache=self.name)
+        cache_bytes.set(self.total_bytes, cache=self.name)
@@ -0,0 +1,60 @@
+import glob
+import os
+from typing import List, Tuple
+
+
+def source_paths(source: str) -> List[str]:
+    """CSV files making up a dataset source: one file, every CSV in a directory, or a glob."""
+    if os.path.isfile(source):
+        return [source]
+    if os.path.isdir(source):
+        return sorted(glob.glob(os.path.join(source, '*.csv')))
+    return sorted(path for path in glob.glob(source) if os.path.isfile(path))
+
+
+def dataset_version(source: str) -> Tuple:
+    """Identify a dataset source by the path, modification time and size of its files."""
+    versions = []
+    for path in source_paths(source):
+        stat = os.stat(path)
+        versions.append((os.path.abspath(path), stat.st_mtime, stat.st_size))
+    # A single file keeps its plain (path, mtime, size) version
+    return versions[0] if len(versions) == 1 else tuple(versions)
+
+
+def load_sources(source: str, affiliation_mode: str = 'precise'):
+    """Load and clean every file of a source into one frame, one row per paper.
+
+    Files are read newest first, each normalized through the cleaner whatever
+    its layout, and streamed through a set of EIDs already seen: a paper
+    present in several overlapping exports keeps the row, and so the
+    citation count, of the most recently modified file. Rows without an EID
+    are kept as they are.
+    """
+    import pandas as pd
+    from data_cleaner import load_and_clean_csv
+
+    paths = source_paths(source)
+    if len(paths) == 1:
+        return load_and_clean_csv(paths[0], affiliation_mode)
+    if not paths:
+        raise FileNotFoundError(f"No CSV files found for {source}")
+
+    paths.sort(key=lambda path: (os.path.getmtime(path), path), reverse=True)
+    seen = set()
+    frames = []
+    duplicates = 0
+    for path in paths:
+        df = load_and_clean_csv(path, affiliation_mode)
+        if 'EID' in df.columns:
+            eids = df['EID'].astype(str).str.strip()
+            has_eid = df['EID'].notna() & (eids != '')
+            keep = ~has_eid | (~eids.isin(seen) & ~eids.duplicated())
+            duplicates += int((~keep).sum())
+            df = df[keep]
+            seen.update(eids[keep & has_eid])
+        frames.append(df)
+
+    merged = pd.concat(frames, ignore_index=True, sort=False)
+    print(f"Merged {len(paths)} files: {len(merged)} papers ({duplicates} duplicates dropped)")
+    return merged
@@ -0,0 +1,160 @@
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import pickle
+import struct
+import sys
+from typing import Any, Callable, Optional, Tuple
+
+from dataset_manifest import dataset_version
+from metrics import registry
+
+
+logger = logging.getLogger(__name__)
+
+snapshot_loads_total = registry.counter('dataset_snapshot_loads_total', 'Dataset snapshot lookups by result')
+
+MAGIC = b'RPWMSNP1'
+# Header: magic, pickle offset, pickle length, buffer count
+HEADER = struct.Struct('<8sQQQ')
+BUFFER_ENTRY = struct.Struct('<QQ')
+# Buffers start on cache-line boundaries so mapped arrays stay aligned
+ALIGNMENT = 64
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_snapshot(path: str, value: Any):
+    """Pickle a value to path with its array buffers stored out-of-band, aligned for mapping."""
+    buffers = []
+    payload = pickle.dumps(value, protocol=5, buffer_callback=buffers.append)
+    raws = [buffer.raw() for buffer in buffers]
+
+    table_offset = HEADER.size
+    offset = table_offset + BUFFER_ENTRY.size * len(raws)
+    entries = []
+    for raw in raws:
+        offset = _align(offset)
+        entries.append((offset, raw.nbytes))
+        offset += raw.nbytes
+    payload_offset = _align(offset)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, payload_offset, len(payload), len(raws)))
+        for entry in entries:
+            f.write(BUFFER_ENTRY.pack(*entry))
+        for (start, _), raw in zip(entries, raws):
+            f.write(b'\0' * (start - f.tell()))
+            f.write(raw)
+        f.write(b'\0' * (payload_offset - f.tell()))
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str) -> Any:
+    """Load a snapshot, with its array buffers mapped read-only from the file rather than copied."""
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    magic, payload_offset, payload_length, count = HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a dataset snapshot")
+
+    buffers = []
+    for i in range(count):
+        start, length = BUFFER_ENTRY.unpack_from(view, HEADER.size + i * BUFFER_ENTRY.size)
+        buffers.append(view[start:start + length])
+    # Arrays keep their slice of the mapping alive; the mapping closes when the last one goes
+    return pickle.loads(view[payload_offset:payload_offset + payload_length], buffers=buffers)
+
+
+class SnapshotStore:
+    """Built datasets shared by all worker processes through memory-mapped files.
+
+    The first process to need a (dataset version, year) builds it while
+    holding a file lock and writes a snapshot; every other worker waits on the
+    lock and maps that snapshot instead of parsing the CSV again. Every index
+    keeps its data in flat arrays (bitmaps, facet columns, sparse graphs, and
+    the drill-down, profile and paper records as byte tables), which stay in
+    the shared page cache, so memory does not grow with the worker count.
+    Only the small frame of index objects around them is unpickled per
+    worker.
+    """
+
+    def __init__(self, directory: str, settings: Tuple = ()):
+        """settings are options that change the built dataset; they are part of each snapshot's version."""
+        self.directory = directory
+        self.settings = settings
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, csv_path: str, year_filter: Optional[int]) -> str:
+        version = hashlib.sha1(repr((dataset_version(csv_path), self.settings)).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.directory, f"{version}-{year_filter or 'all'}.snapshot")
+
+    def get_or_build(self, csv_path: str, year_filter: Optional[int], builder: Callable[[], Any]):
+        """Map the snapshot for a year filter, building and writing it first if no process has."""
+        path = self.path(csv_path, year_filter)
+        value = self._load(path)
+        if value is not None:
+            return value
+
+        with open(f"{path}.lock", 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                # Another worker may have written it while we waited
+                value = self._load(path)
+                if value is not None:
+                    return value
+                snapshot_loads_total.inc(result='built')
+                value = builder()
+                if value is not None:
+                    write_snapshot(path, value)
+                    self._remove_stale(path)
+                return value
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load(self, path: str):
+        if not os.path.exists(path):
+            return None
+        try:
+            value = read_snapshot(path)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable snapshot {path}: {e}")
+            snapshot_loads_total.inc(result='invalid')
+            return None
+        snapshot_loads_total.inc(result='mapped')
+        return value
+
+    def _remove_stale(self, path: str):
+        """Delete snapshots of older dataset versions; workers still mapping them keep their pages.
+
+        Lock files are left alone: another worker may hold one, and removing
+        it would let a third open a fresh lock and build the same snapshot.
+        """
+        version = os.path.basename(path).split('-', 1)[0]
+        for name in os.listdir(self.directory):
+            if name.endswith('.snapshot') and not name.startswith(version + '-'):
+                os.remove(os.path.join(self.directory, name))
+
+
+if __name__ == '__main__':
+    # Prebuild snapshots before starting the workers:
+    #   DATASET_SNAPSHOT_DIR=/var/cache/research-map python dataset_snapshot.py [year ...]
+    import server
+    from data_cleaner import read_years
+
+    if server.snapshot_store is None:
+        sys.exit("Set DATASET_SNAPSHOT_DIR to build snapshots")
+    csv_path = server.get_csv_path()
+    if csv_path is None:
+        sys.exit(1)
+    years = [int(arg) for arg in sys.argv[1:]] or [None] + sorted(read_years(csv_path))
+    for year in years:
+        server.snapshot_store.get_or_build(csv_path, year, lambda: server.build_dataset(csv_path, year))
+        print(f"Snapshot ready: {server.snapshot_store.path(csv_path, year)}")
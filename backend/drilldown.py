@@ -0,0 +1,195 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from flat_tables import RaggedArray, RecordTable, StringKeys
+
+
+# Sort key -> function producing the value sorted on (descending order is stored)
+UNIVERSITY_SORT_KEYS = {
+    'paperCount': lambda u: (u['paperCount'], u['name'].lower()),
+    'authors': lambda u: (u['authors'], u['paperCount']),
+    'name': lambda u: u['name'].lower(),
+}
+
+AUTHOR_SORT_KEYS = {
+    'paperCount': lambda a: (a['paperCount'], a['name'].lower()),
+    'name': lambda a: a['name'].lower(),
+}
+
+PAPER_SORT_KEYS = {
+    'year': lambda p: (p.get('year') or 0, p.get('cited_by') or 0),
+    'citations': lambda p: (p.get('cited_by') or 0, p.get('year') or 0),
+    'title': lambda p: (p.get('title') or '').lower(),
+}
+
+DEFAULT_UNIVERSITY_SORT = '-paperCount'
+DEFAULT_AUTHOR_SORT = '-paperCount'
+DEFAULT_PAPER_SORT = '-year'
+
+
+def parse_sort(sort: Optional[str], sort_keys: Dict, default: str) -> Optional[Tuple[str, bool]]:
+    """Parse a sort spec like '-paperCount' into (key, descending), or None if the key is unknown."""
+    sort = sort or default
+    descending = sort.startswith('-')
+    key = sort.lstrip('-+')
+    if key not in sort_keys:
+        return None
+    return key, descending
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated field projection."""
+    if not fields:
+        return None
+    return [f.strip() for f in fields.split(',') if f.strip()]
+
+
+def page(items: List, descending: bool, offset: int = 0, limit: Optional[int] = None) -> List:
+    """Slice a list stored in descending order, reading it backwards for ascending pages."""
+    n = len(items)
+    if limit is None:
+        limit = n
+    if descending:
+        return items[offset:offset + limit]
+    end = max(n - offset, 0)
+    start = max(end - limit, 0)
+    return items[start:end][::-1]
+
+
+def project(items: List[Dict], fields: Optional[List[str]]) -> List[Dict]:
+    """Keep only the requested fields of each item."""
+    if not fields:
+        return items
+    return [{f: item[f] for f in fields if f in item} for item in items]
+
+
+def sort_segments(items: np.ndarray, starts: np.ndarray, values: List) -> np.ndarray:
+    """Copy of items with each segment items[starts[i]:starts[i + 1]] sorted descending by values[item]."""
+    ordered = items.copy()
+    for start, end in zip(starts[:-1].tolist(), starts[1:].tolist()):
+        ordered[start:end] = sorted(items[start:end].tolist(), key=values.__getitem__, reverse=True)
+    return ordered
+
+
+class DrilldownIndex:
+    """Row lookups and pre-sorted child lists for the country → university → author drill-down.
+
+    Countries, universities and authors are each one record table laid out
+    parent by parent, so the children of an entity are a contiguous range
+    of rows. Child lists are sorted once per sort key at load time into flat
+    row arrays with the same layout, so a page of any size costs O(page
+    size) regardless of how many children an entity has, and only the
+    records on the page are decoded. Everything is a flat array, so a
+    mapped snapshot shares it between workers.
+    """
+
+    def __init__(self, data: List[Dict], papers: RecordTable, paper_dicts: List[Dict]):
+        """papers are in integer key order, as records and as dicts."""
+        paper_keys = {paper['id']: key for key, paper in enumerate(paper_dicts)}
+        countries, universities, authors, tree_papers = [], [], [], []
+        country_ids, university_ids, author_ids = [], [], []
+        university_starts, author_starts, paper_starts = [0], [0], [0]
+
+        for country in data:
+            cid = country['id']
+            country_ids.append(cid)
+            countries.append({key: country[key] for key in ('id', 'name', 'lat', 'lng', 'paperCount')})
+            for uni in country['universities']:
+                uid = uni['id']
+                university_ids.append(f"{cid}/{uid}")
+                universities.append({
+                    'id': uid,
+                    'name': uni['name'],
+                    'paperCount': uni['paperCount'],
+                    'authors': len(uni['authors'])
+                })
+                for author in uni['authors']:
+                    author_ids.append(f"{cid}/{uid}/{author['id']}")
+                    authors.append({
+                        'id': author['id'],
+                        'name': author['name'],
+                        'affiliation': author['affiliation'],
+                        'paperCount': author['paperCount']
+                    })
+                    tree_papers.extend(paper_keys[paper['id']] for paper in author['papers'])
+                    paper_starts.append(len(tree_papers))
+                author_starts.append(len(authors))
+            university_starts.append(len(universities))
+
+        university_starts = np.array(university_starts, dtype=np.int64)
+        author_starts = np.array(author_starts, dtype=np.int64)
+        paper_starts = np.array(paper_starts, dtype=np.int64)
+        tree_papers = np.array(tree_papers, dtype=np.int32)
+
+        self.country_ids = StringKeys(country_ids)
+        self.university_ids = StringKeys(university_ids)
+        self.author_ids = StringKeys(author_ids)
+        self.countries = RecordTable(countries)
+        self.universities = RecordTable(universities)
+        self.authors = RecordTable(authors)
+        self.papers = papers
+
+        # Hierarchy order, for rebuilding the full tree
+        self.university_starts = university_starts
+        self.author_starts = author_starts
+        self.tree_papers = RaggedArray.from_flat(tree_papers, paper_starts)
+
+        self.sorted_universities = {
+            key: RaggedArray.from_flat(sort_segments(
+                np.arange(len(universities), dtype=np.int32), university_starts, [fn(u) for u in universities]
+            ), university_starts)
+            for key, fn in UNIVERSITY_SORT_KEYS.items()
+        }
+        self.sorted_authors = {
+            key: RaggedArray.from_flat(sort_segments(
+                np.arange(len(authors), dtype=np.int32), author_starts, [fn(a) for a in authors]
+            ), author_starts)
+            for key, fn in AUTHOR_SORT_KEYS.items()
+        }
+        self.sorted_papers = {
+            key: RaggedArray.from_flat(sort_segments(tree_papers, paper_starts, [fn(p) for p in paper_dicts]), paper_starts)
+            for key, fn in PAPER_SORT_KEYS.items()
+        }
+
+    @classmethod
+    def from_processor(cls, processor) -> 'DrilldownIndex':
+        """Build the index from a processed CSVProcessor."""
+        return cls(processor.get_processed_data() or [], processor.paper_table(), processor.paper_list())
+
+    def country_row(self, country_id: str) -> Optional[int]:
+        return self.country_ids.find(country_id)
+
+    def university_row(self, country_id: str, university_id: str) -> Optional[int]:
+        return self.university_ids.find(f"{country_id}/{university_id}")
+
+    def author_row(self, country_id: str, university_id: str, author_id: str) -> Optional[int]:
+        return self.author_ids.find(f"{country_id}/{university_id}/{author_id}")
+
+    def university_rows(self, country_row: int, sort_key: str) -> np.ndarray:
+        """University rows of a country in descending order of a sort key."""
+        return self.sorted_universities[sort_key][country_row]
+
+    def author_rows(self, university_row: int, sort_key: str) -> np.ndarray:
+        """Author rows of a university in descending order of a sort key."""
+        return self.sorted_authors[sort_key][university_row]
+
+    def paper_keys(self, author_row: int, sort_key: str) -> np.ndarray:
+        """Paper keys of an author in descending order of a sort key."""
+        return self.sorted_papers[sort_key][author_row]
+
+    def tree(self) -> List[Dict]:
+        """The full country → university → author → paper hierarchy, decoded for search and exports."""
+        papers = list(self.papers)
+        result = []
+        for c, country in enumerate(self.countries):
+            universities = []
+            for u in range(self.university_starts[c], self.university_starts[c + 1]):
+                uni = self.universities[u]
+                uni['authors'] = [
+                    {**self.authors[a], 'papers': [papers[key] for key in self.tree_papers[a]]}
+                    for a in range(self.author_starts[u], self.author_starts[u + 1])
+                ]
+                universities.append(uni)
+            result.append({**country, 'universities': universities})
+        return result
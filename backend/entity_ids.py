@@ -0,0 +1,148 @@
+import base64
+import hashlib
+import re
+from typing import List, Optional
+
+from flat_tables import StringKeys
+
+
+ID_KINDS = ('country', 'university', 'country_university', 'author')
+
+# Compact IDs are this many base32 characters (50 bits); on a collision the
+# later name gets the next length up, so IDs are always unique per dataset
+ID_LENGTHS = (10, 16, 26)
+
+
+def slug(text: str) -> str:
+    """Lowercase alphanumerics of a name; names with the same slug are the same entity."""
+    return re.sub(r'[^a-z0-9]', '', text.lower()) if text else ''
+
+
+def legacy_id(text: str) -> str:
+    """The original ID scheme: the slug truncated to 50 characters."""
+    return slug(text)[:50]
+
+
+def compact_id(text: str, length: int = ID_LENGTHS[0]) -> str:
+    """Stable short ID hashed from the full slug of a name."""
+    digest = hashlib.blake2b(slug(text).encode('utf-8'), digest_size=16).digest()
+    return base64.b32encode(digest).decode('ascii').lower().rstrip('=')[:length]
+
+
+class EntityIds:
+    """Public IDs and dense integer keys for papers and entities of one dataset.
+
+    Public IDs are compact hashes of the full name slug, so they are stable
+    across year filters and reloads and never merge names that only share a
+    long prefix. Every paper and entity also gets a dense integer key, shared
+    by all indexes in place of their own string lookups. IDs from the old
+    truncated-slug scheme are kept as aliases so existing links still resolve.
+    """
+
+    def __init__(self):
+        self.ids = {kind: [] for kind in ID_KINDS}  # kind -> key -> public id
+        self.keys = {kind: {} for kind in ID_KINDS}  # kind -> public id -> key
+        self.slugs = {kind: {} for kind in ID_KINDS}  # kind -> slug -> public id
+        self.legacy = {kind: {} for kind in ID_KINDS}  # kind -> legacy id -> public id
+        self.paper_ids = []
+        self.paper_keys = {}
+
+    def assign(self, kind: str, name: str) -> str:
+        """Get the public ID for a named entity, creating it on first sight."""
+        name_slug = slug(name)
+        entity_id = self.slugs[kind].get(name_slug)
+        if entity_id is not None:
+            return entity_id
+
+        taken = self.keys[kind]
+        for length in ID_LENGTHS:
+            entity_id = compact_id(name, length)
+            if entity_id not in taken:
+                break
+        else:
+            raise ValueError(f"Could not assign a unique {kind} ID for {name!r}")
+
+        self.slugs[kind][name_slug] = entity_id
+        self.legacy[kind].setdefault(legacy_id(name), entity_id)
+        self.add(kind, entity_id)
+        return entity_id
+
+    def add(self, kind: str, entity_id: str) -> int:
+        """Register an externally issued ID (e.g. a Scopus author ID) and get its key."""
+        key = self.keys[kind].get(entity_id)
+        if key is None:
+            key = self.keys[kind][entity_id] = len(self.ids[kind])
+            self.ids[kind].append(entity_id)
+        return key
+
+    def add_paper(self, paper_id: str) -> int:
+        key = self.paper_keys.get(paper_id)
+        if key is None:
+            key = self.paper_keys[paper_id] = len(self.paper_ids)
+            self.paper_ids.append(paper_id)
+        return key
+
+    def key(self, kind: str, entity_id: str) -> Optional[int]:
+        """Dense integer key of an entity, or None if it is unknown."""
+        return self.keys[kind].get(entity_id)
+
+    def id_for(self, kind: str, name: str) -> Optional[str]:
+        """Get the public ID already assigned to a name, or None."""
+        return self.slugs[kind].get(slug(name))
+
+    def resolve(self, kind: str, entity_id: str) -> Optional[str]:
+        """Get the current public ID for a current or legacy ID, or None if unknown."""
+        if entity_id in self.keys[kind]:
+            return entity_id
+        return self.legacy[kind].get(entity_id)
+
+    def count(self, kind: str) -> int:
+        return len(self.ids[kind])
+
+    def id_list(self, kind: str) -> List[str]:
+        return self.ids[kind]
+
+    def freeze(self) -> 'FrozenEntityIds':
+        """Read-only copy held as flat arrays, for a finished dataset."""
+        return FrozenEntityIds(self)
+
+
+class FrozenEntityIds:
+    """The IDs and keys of a finished dataset, held as flat string arrays.
+
+    Answers the same lookups as EntityIds with binary searches over sorted
+    byte arrays instead of dicts, so a mapped snapshot shares them between
+    workers. IDs can no longer be assigned.
+    """
+
+    def __init__(self, ids: EntityIds):
+        self.ids = {kind: StringKeys(ids.ids[kind]) for kind in ID_KINDS}
+        self.slugs = {kind: self._aliases(ids, kind, ids.slugs[kind]) for kind in ID_KINDS}
+        self.legacy = {kind: self._aliases(ids, kind, ids.legacy[kind]) for kind in ID_KINDS}
+        self.paper_ids = StringKeys(ids.paper_ids)
+
+    @staticmethod
+    def _aliases(ids: EntityIds, kind: str, aliases: dict) -> StringKeys:
+        return StringKeys(list(aliases), [ids.keys[kind][entity_id] for entity_id in aliases.values()])
+
+    def key(self, kind: str, entity_id: str) -> Optional[int]:
+        """Dense integer key of an entity, or None if it is unknown."""
+        return self.ids[kind].find(entity_id)
+
+    def id_for(self, kind: str, name: str) -> Optional[str]:
+        """Get the public ID already assigned to a name, or None."""
+        key = self.slugs[kind].find(slug(name))
+        return None if key is None else self.ids[kind][key]
+
+    def resolve(self, kind: str, entity_id: str) -> Optional[str]:
+        """Get the current public ID for a current or legacy ID, or None if unknown."""
+        if self.key(kind, entity_id) is not None:
+            return entity_id
+        key = self.legacy[kind].find(entity_id)
+        return None if key is None else self.ids[kind][key]
+
+    def count(self, kind: str) -> int:
+        return len(self.ids[kind])
+
+    def id_list(self, kind: str) -> StringKeys:
+        return self.ids[kind]
@@ -0,0 +1,287 @@
+import re
+import unicodedata
+import zlib
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from country_coordinates import canonical_country_name
+
+
+# Abbreviated tokens expanded before comparing names ('Univ.' vs 'University')
+ABBREVIATIONS = {
+    'univ': 'university',
+    'uni': 'university',
+    'inst': 'institute',
+    'tech': 'technology',
+    'technol': 'technology',
+    'natl': 'national',
+    'intl': 'international',
+    'coll': 'college',
+    'sci': 'science',
+    'sch': 'school',
+    'dept': 'department',
+    'ctr': 'centre',
+    'center': 'centre',
+    'acad': 'academy',
+    'polytech': 'polytechnic',
+    'med': 'medical',
+    'engn': 'engineering',
+    'mgmt': 'management',
+    'res': 'research',
+    'hosp': 'hospital',
+}
+
+# Leading words marking a sub-unit rather than the institution itself
+DEPARTMENT_PREFIXES = (
+    'department', 'faculty', 'school of', 'centre', 'division', 'laboratory', 'lab ',
+    'unit ', 'programme', 'program ', 'graduate school', 'institute of'
+)
+
+# Words shared by many institutions; names must also agree on what remains
+GENERIC_WORDS = frozenset({
+    'university', 'universiti', 'universitas', 'universidad', 'universidade', 'universite',
+    'universita', 'universitat', 'universiteit', 'universitet', 'institute', 'college', 'school',
+    'academy', 'polytechnic', 'faculty', 'department', 'centre', 'of', 'and', 'the', 'for', 'in',
+    'at', 'de', 'di', 'del', 'da', 'do', 'la', 'technology', 'science', 'sciences', 'applied',
+    'research', 'national', 'international', 'engineering', 'management', 'medical', 'state',
+})
+
+INSTITUTION_KEYWORDS = (
+    'universit', 'institut', 'college', 'polytechnic', 'academy', 'hospital', 'politecnic', 'politechnika'
+)
+
+# Latest mapping per dataset version: (path, mtime, size) -> {variant: canonical}
+cached_mappings = {}
+
+
+def normalize_university(name: str) -> Tuple[str, bool]:
+    """Get the comparison key for a university name, and whether a sub-unit prefix was dropped."""
+    text = unicodedata.normalize('NFKD', name)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    text = text.replace('&', ' and ')
+    # Trailing acronyms such as '(APU)' add nothing to the comparison
+    text = re.sub(r'\([^)]*\)', ' ', text)
+
+    # 'Department of Computing, Asia Pacific University' -> 'Asia Pacific University'
+    stripped = False
+    segments = [s.strip() for s in text.split(',') if s.strip()]
+    if len(segments) > 1:
+        institutions = [
+            s for s in segments
+            if any(k in s for k in INSTITUTION_KEYWORDS) and not s.startswith(DEPARTMENT_PREFIXES)
+        ]
+        if institutions:
+            stripped = True
+            text = institutions[0]
+
+    tokens = re.findall(r'[a-z0-9]+', text)
+    tokens = [ABBREVIATIONS.get(t, t) for t in tokens]
+    return ' '.join(tokens), stripped
+
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+@lru_cache(maxsize=65536)
+def is_generic(token: str) -> bool:
+    """Whether a token is a generic word, allowing misspellings of the longer ones ('Universty')."""
+    if token in GENERIC_WORDS:
+        return True
+    if len(token) < 6:
+        return False
+    token_shingles = shingles(token)
+    return any(
+        jaccard(token_shingles, shingles(word)) >= 0.5 for word in GENERIC_WORDS if len(word) >= 6
+    )
+
+
+def distinctive_tokens(key: str) -> Tuple[str, ...]:
+    return tuple(t for t in key.split() if not is_generic(t))
+
+
+def same_distinctive_words(a: Tuple[str, ...], b: Tuple[str, ...]) -> bool:
+    """Whether two names agree once generic words are ignored.
+
+    Every distinctive word of each name has to appear in the other, with word
+    breaks ignored so 'Lajpat Rai' matches 'Lajpatrai'; failing that, the
+    joined words must be near-identical.
+    """
+    joined_a, joined_b = ''.join(a), ''.join(b)
+    if all(t in joined_b for t in a) and all(t in joined_a for t in b):
+        return True
+    return bool(joined_a and joined_b) and jaccard(shingles(joined_a), shingles(joined_b)) >= 0.8
+
+
+def shingles(key: str, size: int = 3) -> set:
+    """Character shingles of a normalized name."""
+    padded = f' {key} '
+    if len(padded) <= size:
+        return {padded}
+    return {padded[i:i + size] for i in range(len(padded) - size + 1)}
+
+
+class UniversityResolver:
+    """Cluster spelling variants of university names with blocking and MinHash/LSH.
+
+    Names are first merged on an exact normalized key (case, accents,
+    punctuation, abbreviations, department prefixes). The remaining keys are
+    blocked by country and hashed into LSH bands over character shingles, so
+    only names sharing a band bucket in the same country are compared.
+    Candidates are confirmed on exact shingle Jaccard similarity, on agreeing
+    distinctive words ('DRK Institute' is never 'SRM Institute') and on
+    matching numbers ('Paris 1' is never 'Paris 8').
+    Work grows with the number of distinct names rather than with the
+    number of pairs.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, threshold: float = 0.8, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        rng = np.random.default_rng(seed)
+        # Coefficients below 2^29 keep a * crc32 + b inside uint64 before the modulus
+        self.a = rng.integers(1, 1 << 29, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 1 << 29, size=num_perm, dtype=np.uint64)
+        self.prime = np.uint64((1 << 61) - 1)
+
+    def signature(self, shingle_set: set) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingle_set), dtype=np.uint64)
+        return ((np.outer(self.a, hashes) + self.b[:, None]) % self.prime).min(axis=1)
+
+    def resolve(self, names: Dict[str, Dict]) -> Dict[str, str]:
+        """Map each variant name to its canonical name.
+
+        names maps a raw university name to {'count': papers, 'countries': set}.
+        Only names that change are included in the result.
+        """
+        # Exact normalized-key merge
+        keys = {}  # key -> list of raw names
+        stripped = {}
+        for name in names:
+            key, was_stripped = normalize_university(name)
+            if not key:
+                continue
+            keys.setdefault(key, []).append(name)
+            stripped[name] = was_stripped
+
+        key_list = list(keys)
+        parent = list(range(len(key_list)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        # LSH within each country block
+        key_shingles = [shingles(k) for k in key_list]
+        key_numbers = [tuple(re.findall(r'\d+', k)) for k in key_list]
+        key_distinct = [distinctive_tokens(k) for k in key_list]
+        buckets = defaultdict(list)
+        for idx, key in enumerate(key_list):
+            signature = self.signature(key_shingles[idx])
+            blocks = set()
+            for name in keys[key]:
+                blocks.update(names[name]['countries'] or {''})
+            for band in range(self.bands):
+                band_hash = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+                for block in blocks:
+                    buckets[(block, band, band_hash)].append(idx)
+
+        compared = set()
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            for pos, i in enumerate(members):
+                for j in members[pos + 1:]:
+                    if (i, j) in compared or find(i) == find(j):
+                        continue
+                    compared.add((i, j))
+                    if key_numbers[i] != key_numbers[j]:
+                        continue
+                    if (jaccard(key_shingles[i], key_shingles[j]) >= self.threshold and
+                            same_distinctive_words(key_distinct[i], key_distinct[j])):
+                        parent[find(j)] = find(i)
+
+        clusters = defaultdict(list)
+        for idx, key in enumerate(key_list):
+            clusters[find(idx)].extend(keys[key])
+
+        # Canonical name: prefer full institution names, then the most used spelling
+        mapping = {}
+        for variants in clusters.values():
+            if len(variants) < 2:
+                continue
+            canonical = max(variants, key=lambda n: (
+                not stripped[n], '.' not in n, names[n]['count'], -len(n), n
+            ))
+            for name in variants:
+                if name != canonical:
+                    mapping[name] = canonical
+        return mapping
+
+
+def collect_university_names(df: pd.DataFrame) -> Dict[str, Dict]:
+    """Count papers per university name and the countries each name appears with."""
+    names = {}
+    numbers = sorted(int(col.split()[-1]) for col in df.columns if re.fullmatch(r'University \d+', col))
+    for i in numbers:
+        uni_col, country_col = f'University {i}', f'Country {i}'
+        universities = df[uni_col].dropna().astype(str).str.strip()
+        universities = universities[universities != '']
+        if country_col in df.columns:
+            countries = df.loc[universities.index, country_col]
+        else:
+            countries = pd.Series(None, index=universities.index, dtype=object)
+        for name, country in zip(universities, countries):
+            entry = names.get(name)
+            if entry is None:
+                entry = names[name] = {'count': 0, 'countries': set()}
+            entry['count'] += 1
+            if isinstance(country, str) and country.strip():
+                entry['countries'].add(canonical_country_name(country))
+    return names
+
+
+def apply_university_mapping(df: pd.DataFrame, mapping: Dict[str, str]) -> pd.DataFrame:
+    """Rewrite University N and 'Author - University' affiliation columns to canonical names."""
+    if not mapping:
+        return df
+    for col in df.columns:
+        if col.startswith('University '):
+            values = df[col].astype(object)
+            mapped = values.where(values.isna(), values.astype(str).str.strip()).map(mapping)
+            df[col] = mapped.where(mapped.notna(), values)
+        elif col.startswith('Author with Affliliation '):
+            parts = df[col].astype(object).str.split(' - ', n=1, expand=True)
+            if parts.shape[1] < 2:
+                continue
+            mapped = parts[1].str.strip().map(mapping)
+            changed = mapped.notna()
+            if changed.any():
+                df.loc[changed, col] = parts.loc[changed, 0].str.strip() + ' - ' + mapped[changed]
+    return df
+
+
+def resolve_universities(df: pd.DataFrame, version: Optional[Tuple] = None,
+                         resolver: Optional[UniversityResolver] = None) -> Dict[str, str]:
+    """Get the variant -> canonical university mapping for a dataset, cached per version."""
+    if version is not None and version in cached_mappings:
+        return cached_mappings[version]
+
+    names = collect_university_names(df)
+    mapping = (resolver or UniversityResolver()).resolve(names)
+    print(f"Resolved {len(mapping)} university name variants ({len(names)} distinct names)")
+
+    if version is not None:
+        cached_mappings.clear()
+        cached_mappings[version] = mapping
+    return mapping
@@ -0,0 +1,161 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Optional
+
+from metrics import registry
+
+
+export_jobs_total = registry.counter('export_jobs_total', 'Export jobs by kind and outcome')
+
+JOB_STATUSES = ('queued', 'running', 'done', 'failed')
+
+
+class QueueFullError(RuntimeError):
+    """Raised when too many export jobs are already waiting."""
+
+
+class ExportJob:
+    """One export run and its artifact on disk."""
+
+    def __init__(self, kind: str, year: Optional[int], key: Hashable, filename: str):
+        self.id = uuid.uuid4().hex[:16]
+        self.kind = kind
+        self.year = year
+        self.key = key
+        self.filename = filename
+        self.status = 'queued'
+        self.progress = 0.0
+        self.error = None
+        self.path = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future: Optional[Future] = None
+
+    def to_dict(self, ttl_seconds: float) -> Dict:
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'year': self.year,
+            'status': self.status,
+            'progress': round(self.progress, 3),
+            'error': self.error,
+            'createdAt': self.created_at,
+            'startedAt': self.started_at,
+            'finishedAt': self.finished_at,
+            'expiresAt': self.finished_at + ttl_seconds if self.finished_at else None,
+            'downloadUrl': f"/api/exports/{self.id}/download" if self.status == 'done' else None
+        }
+
+
+class ExportJobQueue:
+    """Bounded pool running exports off the event loop.
+
+    Jobs are deduplicated on a key (kind, year, dataset version): submitting an
+    export that is already queued, running or finished returns the existing
+    job. Finished artifacts are written to disk and removed once their TTL
+    has passed; a failed job is replaced by the next submit of its key.
+    Jobs live in this process, so each worker keeps its own queue.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 16, ttl_seconds: float = 3600,
+                 directory: Optional[str] = None):
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+        # A configured directory may be shared with other workers, so only a
+        # directory made here is removed wholesale on shutdown
+        self.owns_directory = directory is None
+        self.directory = directory or tempfile.mkdtemp(prefix='research-map-exports-')
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='export')
+        self.jobs = {}  # job id -> job
+        self.by_key = {}  # dedupe key -> job id
+        self.lock = threading.Lock()
+
+    def submit(self, kind: str, year: Optional[int], key: Hashable, filename: str,
+               runner: Callable[[str, Callable[[float], None]], None]) -> ExportJob:
+        """Get the job for a key, starting one if there is none.
+
+        runner(path, progress) writes the artifact to path and reports
+        progress as a fraction between 0 and 1.
+        """
+        self.purge_expired()
+        with self.lock:
+            job = self.jobs.get(self.by_key.get(key))
+            if job is not None and job.status != 'failed':
+                export_jobs_total.inc(kind=kind, outcome='deduplicated')
+                return job
+
+            pending = sum(1 for j in self.jobs.values() if j.status in ('queued', 'running'))
+            if pending >= self.max_pending:
+                export_jobs_total.inc(kind=kind, outcome='rejected')
+                raise QueueFullError(f"{pending} export jobs are already pending")
+
+            job = ExportJob(kind, year, key, filename)
+            self.jobs[job.id] = job
+            self.by_key[key] = job.id
+            job.future = self.executor.submit(self._run, job, runner)
+        return job
+
+    def _run(self, job: ExportJob, runner: Callable):
+        job.status = 'running'
+        job.started_at = time.time()
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{job.id}.tmp")
+
+        def progress(fraction: float):
+            job.progress = min(max(fraction, 0.0), 1.0)
+
+        try:
+            runner(path, progress)
+            final_path = os.path.join(self.directory, f"{job.id}-{job.filename}")
+            os.replace(path, final_path)
+            job.path = final_path
+            job.progress = 1.0
+            job.status = 'done'
+            export_jobs_total.inc(kind=job.kind, outcome='done')
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'failed'
+            export_jobs_total.inc(kind=job.kind, outcome='failed')
+            if os.path.exists(path):
+                os.remove(path)
+        finally:
+            job.finished_at = time.time()
+        return job
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        self.purge_expired()
+        return self.jobs.get(job_id)
+
+    def purge_expired(self):
+        """Forget finished jobs past their TTL and delete their artifacts."""
+        now = time.time()
+        with self.lock:
+            expired = [
+                job for job in self.jobs.values()
+                if job.finished_at is not None and now - job.finished_at > self.ttl_seconds
+            ]
+            for job in expired:
+                del self.jobs[job.id]
+                if self.by_key.get(job.key) == job.id:
+                    del self.by_key[job.key]
+        for job in expired:
+            if job.path and os.path.exists(job.path):
+                os.remove(job.path)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.owns_directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            return
+        with self.lock:
+            jobs = list(self.jobs.values())
+        for job in jobs:
+            for path in (job.path, os.path.join(self.directory, f"{job.id}.tmp")):
+                if path and os.path.exists(path):
+                    os.remove(path)
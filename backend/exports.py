@@ -0,0 +1,123 @@
+from typing import Callable, Dict, List, Optional
+
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Report progress after this many rows
+PROGRESS_EVERY = 500
+
+
+def export_filename(kind: str, year: Optional[int] = None) -> str:
+    return f"{kind}_export_{year if year else 'all_years'}.xlsx"
+
+
+def _write_workbook(path: str, title: str, headers: List[str], rows: List[List], widths: Dict[str, int],
+                    progress: Optional[Callable[[float], None]] = None):
+    """Write rows to a single-sheet workbook, reporting progress as a fraction."""
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title)
+    for column, width in widths.items():
+        ws.column_dimensions[column].width = width
+
+    ws.append(headers)
+    total = len(rows)
+    for idx, row in enumerate(rows, 1):
+        ws.append([idx] + row)
+        if progress and idx % PROGRESS_EVERY == 0:
+            # Saving takes the last slice of the work
+            progress(0.9 * idx / total)
+
+    wb.save(path)
+    if progress:
+        progress(1.0)
+
+
+def export_papers(data: List[Dict], path: str, progress: Optional[Callable[[float], None]] = None):
+    """Export all paper titles to Excel."""
+    # Collect all unique papers
+    papers_dict = {}
+    for country in data:
+        for uni in country['universities']:
+            for author in uni['authors']:
+                for paper in author['papers']:
+                    if paper['id'] not in papers_dict:
+                        papers_dict[paper['id']] = paper
+
+    rows = [
+        [
+            paper['title'],
+            paper['year'],
+            paper['source'],
+            paper.get('cited_by', 0),
+            paper.get('doi', ''),
+            ', '.join(paper.get('authors', []))
+        ]
+        for paper in papers_dict.values()
+    ]
+    _write_workbook(
+        path, "Papers", ["#", "Title", "Year", "Source", "Citations", "DOI", "Authors"], rows,
+        {'B': 60, 'D': 40, 'F': 30, 'G': 50}, progress
+    )
+
+
+def export_authors(data: List[Dict], path: str, progress: Optional[Callable[[float], None]] = None):
+    """Export all authors to Excel."""
+    # Collect all unique authors
+    authors_dict = {}
+    for country in data:
+        for uni in country['universities']:
+            for author in uni['authors']:
+                if author['id'] not in authors_dict:
+                    authors_dict[author['id']] = [
+                        author['name'],
+                        author['id'],
+                        author['affiliation'],
+                        country['name'],
+                        author['paperCount']
+                    ]
+
+    _write_workbook(
+        path, "Authors", ["#", "Author Name", "Author ID", "Affiliation", "Country", "Paper Count"],
+        list(authors_dict.values()), {'B': 40, 'C': 20, 'D': 50, 'E': 25}, progress
+    )
+
+
+def export_countries(data: List[Dict], path: str, progress: Optional[Callable[[float], None]] = None):
+    """Export all countries to Excel."""
+    rows = [
+        [
+            country['name'],
+            country['paperCount'],
+            len(country['universities']),
+            country['lat'],
+            country['lng']
+        ]
+        for country in data
+    ]
+    _write_workbook(
+        path, "Countries", ["#", "Country Name", "Paper Count", "Universities Count", "Latitude", "Longitude"],
+        rows, {'B': 30}, progress
+    )
+
+
+def export_universities(data: List[Dict], path: str, progress: Optional[Callable[[float], None]] = None):
+    """Export all universities to Excel, by paper count."""
+    rows = [
+        [uni['name'], country['name'], uni['paperCount'], len(uni['authors'])]
+        for country in data
+        for uni in country['universities']
+    ]
+    rows.sort(key=lambda row: row[2], reverse=True)
+    _write_workbook(
+        path, "Universities", ["#", "University Name", "Country", "Paper Count", "Authors Count"],
+        rows, {'B': 60, 'C': 25}, progress
+    )
+
+
+EXPORTS = {
+    'papers': export_papers,
+    'authors': export_authors,
+    'countries': export_countries,
+    'universities': export_universities,
+}
@@ -0,0 +1,197 @@
+import numpy as np
+from typing import Dict, List, Optional
+
+
+# (label, min, max) - max of None means open-ended
+CITATION_BUCKETS = [
+    ('0', 0, 0),
+    ('1-4', 1, 4),
+    ('5-9', 5, 9),
+    ('10-24', 10, 24),
+    ('25-49', 25, 49),
+    ('50-99', 50, 99),
+    ('100+', 100, None),
+]
+
+CUBE_KINDS = ('country', 'country_university')
+
+UNKNOWN_DOCUMENT_TYPE = 'Unknown'
+UNKNOWN_SOURCE = 'Unknown'
+
+
+def citation_bucket(cited_by: int) -> int:
+    """Get the citation bucket index for a citation count."""
+    for idx, (_, low, high) in enumerate(CITATION_BUCKETS):
+        if cited_by >= low and (high is None or cited_by <= high):
+            return idx
+    return 0
+
+
+class FacetFilter:
+    """Facet selection parsed from query parameters."""
+
+    def __init__(self, document_types: Optional[List[str]] = None, sources: Optional[List[str]] = None,
+                 min_citations: Optional[int] = None):
+        self.document_types = set(document_types) if document_types else None
+        self.sources = set(sources) if sources else None
+        self.min_citations = min_citations if min_citations and min_citations > 0 else None
+
+    def is_empty(self) -> bool:
+        return self.document_types is None and self.sources is None and self.min_citations is None
+
+    def to_dict(self) -> Dict:
+        return {
+            'documentType': sorted(self.document_types) if self.document_types else [],
+            'source': sorted(self.sources) if self.sources else [],
+            'minCitations': self.min_citations or 0
+        }
+
+
+class FacetCube:
+    """Aggregate cube of unique paper and citation counts per entity.
+
+    Dense dimensions are entity × year × document type × citation bucket, one
+    cube for countries and one for universities within a country. Each paper
+    lands in exactly one cell per entity, so summing any slice of the cube
+    gives exact unique counts. Source filters and citation thresholds that fall
+    between bucket edges are answered from the paper × entity incidence arrays
+    with a single bincount instead of walking the hierarchy.
+    """
+
+    def __init__(self, papers: List[Dict], ids, incidence: Dict[str, tuple]):
+        """papers are in integer key order; incidence maps a kind to (entity key, paper key) arrays."""
+        years = [paper.get('year', 0) for paper in papers]
+        doc_types = [paper.get('document_type') or UNKNOWN_DOCUMENT_TYPE for paper in papers]
+        sources = [paper.get('source') or UNKNOWN_SOURCE for paper in papers]
+
+        self.years = sorted(set(years))
+        self.document_types = sorted(set(doc_types))
+        self.sources = sorted(set(sources))
+        self.source_codes_by_name = {name: i for i, name in enumerate(self.sources)}
+
+        year_lookup = {y: i for i, y in enumerate(self.years)}
+        doc_lookup = {d: i for i, d in enumerate(self.document_types)}
+
+        self.citations = np.array([paper.get('cited_by', 0) or 0 for paper in papers], dtype=np.int64)
+        self.year_codes = np.array([year_lookup[y] for y in years], dtype=np.int32)
+        self.doc_codes = np.array([doc_lookup[d] for d in doc_types], dtype=np.int32)
+        self.source_codes = np.array([self.source_codes_by_name[s] for s in sources], dtype=np.int32)
+        self.bucket_codes = np.array([citation_bucket(c) for c in self.citations], dtype=np.int32)
+
+        shape = (len(self.years), len(self.document_types), len(CITATION_BUCKETS))
+        self.kinds = {}
+        for kind in CUBE_KINDS:
+            entity_ids = ids.id_list(kind)
+            rows, cols = incidence[kind]
+
+            counts = np.zeros((len(entity_ids),) + shape, dtype=np.int32)
+            cites = np.zeros((len(entity_ids),) + shape, dtype=np.int64)
+            cell = (rows, self.year_codes[cols], self.doc_codes[cols], self.bucket_codes[cols])
+            np.add.at(counts, cell, 1)
+            np.add.at(cites, cell, self.citations[cols])
+
+            self.kinds[kind] = {
+                'ids': entity_ids,
+                'pair_rows': rows,
+                'pair_cols': cols,
+                'counts': counts,
+                'citations': cites
+            }
+
+        self._unfiltered_facets = None
+        self._unfiltered_facets = self.facet_counts(FacetFilter())
+
+    @classmethod
+    def from_processor(cls, processor) -> 'FacetCube':
+        """Build the cube from a processed CSVProcessor."""
+        return cls(
+            processor.paper_list(), processor.ids,
+            {kind: processor.incidence(kind) for kind in CUBE_KINDS}
+        )
+
+    def _dimension_masks(self, facet_filter: FacetFilter):
+        """Boolean masks over the document type and citation bucket axes."""
+        if facet_filter.document_types is None:
+            doc_mask = np.ones(len(self.document_types), dtype=bool)
+        else:
+            doc_mask = np.array([d in facet_filter.document_types for d in self.document_types], dtype=bool)
+        min_citations = facet_filter.min_citations or 0
+        bucket_mask = np.array([low >= min_citations for _, low, _ in CITATION_BUCKETS], dtype=bool)
+        return doc_mask, bucket_mask
+
+    def _uses_cube(self, facet_filter: FacetFilter) -> bool:
+        """Whether the filter can be answered by slicing the dense cube."""
+        if facet_filter.sources is not None:
+            return False
+        min_citations = facet_filter.min_citations or 0
+        return any(low == min_citations for _, low, _ in CITATION_BUCKETS)
+
+    def paper_mask(self, facet_filter: FacetFilter, exclude: Optional[str] = None) -> np.ndarray:
+        """Boolean mask over papers, optionally ignoring one facet."""
+        mask = np.ones(len(self.citations), dtype=bool)
+        if facet_filter.document_types is not None and exclude != 'documentType':
+            doc_mask = np.array([d in facet_filter.document_types for d in self.document_types], dtype=bool)
+            mask &= doc_mask[self.doc_codes]
+        if facet_filter.sources is not None and exclude != 'source':
+            codes = [self.source_codes_by_name[s] for s in facet_filter.sources if s in self.source_codes_by_name]
+            mask &= np.isin(self.source_codes, codes)
+        if facet_filter.min_citations is not None and exclude != 'citations':
+            mask &= self.citations >= facet_filter.min_citations
+        return mask
+
+    def entity_counts(self, kind: str, facet_filter: FacetFilter) -> Dict[str, Dict[str, int]]:
+        """Unique paper and citation counts per entity under a filter, zero counts dropped."""
+        cube = self.kinds[kind]
+        if self._uses_cube(facet_filter):
+            doc_mask, bucket_mask = self._dimension_masks(facet_filter)
+            counts = cube['counts'][:, :, doc_mask][:, :, :, bucket_mask].sum(axis=(1, 2, 3))
+            cites = cube['citations'][:, :, doc_mask][:, :, :, bucket_mask].sum(axis=(1, 2, 3))
+        else:
+            selected = self.paper_mask(facet_filter)[cube['pair_cols']]
+            rows = cube['pair_rows'][selected]
+            counts = np.bincount(rows, minlength=len(cube['ids']))
+            cites = np.bincount(rows, weights=self.citations[cube['pair_cols'][selected]], minlength=len(cube['ids']))
+
+        ids = cube['ids']
+        return {
+            ids[row]: {'paperCount': int(counts[row]), 'citationCount': int(cites[row])}
+            for row in np.flatnonzero(counts)
+        }
+
+    def facet_counts(self, facet_filter: FacetFilter, top_sources: int = 25) -> Dict[str, List[Dict]]:
+        """Unique paper counts per facet value, each facet ignoring its own selection."""
+        if facet_filter.is_empty() and self._unfiltered_facets is not None:
+            return self._unfiltered_facets
+
+        mask = self.paper_mask(facet_filter, exclude='documentType')
+        doc_counts = np.bincount(self.doc_codes[mask], minlength=len(self.document_types))
+
+        mask = self.paper_mask(facet_filter, exclude='source')
+        source_counts = np.bincount(self.source_codes[mask], minlength=len(self.sources))
+        top = np.argsort(-source_counts, kind='stable')[:top_sources]
+
+        mask = self.paper_mask(facet_filter, exclude='citations')
+        bucket_counts = np.bincount(self.bucket_codes[mask], minlength=len(CITATION_BUCKETS))
+
+        mask = self.paper_mask(facet_filter)
+        year_counts = np.bincount(self.year_codes[mask], minlength=len(self.years))
+
+        return {
+            'documentType': [
+                {'value': name, 'paperCount': int(doc_counts[i])}
+                for i, name in enumerate(self.document_types)
+            ],
+            'source': [
+                {'value': self.sources[i], 'paperCount': int(source_counts[i])}
+                for i in top if source_counts[i] > 0
+            ],
+            'citations': [
+                {'value': label, 'min': low, 'max': high, 'paperCount': int(bucket_counts[i])}
+                for i, (label, low, high) in enumerate(CITATION_BUCKETS)
+            ],
+            'year': [
+                {'value': year, 'paperCount': int(year_counts[i])}
+                for i, year in enumerate(self.years)
+            ],
+            'totalPapers': int(mask.sum())
+        }
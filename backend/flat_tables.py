@@ -0,0 +1,104 @@
+import json
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+
+class StringKeys:
+    """Strings in one fixed-width byte array, found by binary search instead of a dict.
+
+    Row i holds strings[i]. find() maps a string back to its row, or to
+    rows[i] when the strings are aliases of rows elsewhere (legacy IDs,
+    name slugs). Everything is a plain array, so a mapped snapshot shares it
+    between workers instead of each one unpickling a dict.
+    """
+
+    def __init__(self, strings: Sequence[str], rows: Optional[Sequence[int]] = None):
+        encoded = [s.encode('utf-8') for s in strings]
+        self.values = np.array(encoded, dtype=bytes) if encoded else np.zeros(0, dtype='S1')
+        self.order = np.argsort(self.values, kind='stable').astype(np.int32)
+        self.rows = None if rows is None else np.asarray(rows, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, row) -> str:
+        return self.values[row].decode('utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        return (value.decode('utf-8') for value in self.values)
+
+    def __contains__(self, value: str) -> bool:
+        return self.find(value) is not None
+
+    def find(self, value: str) -> Optional[int]:
+        """Row of a string (or the row it is an alias of), or None if absent."""
+        needle = value.encode('utf-8')
+        if not len(self.values) or len(needle) > self.values.dtype.itemsize:
+            return None
+        pos = int(np.searchsorted(self.values, needle, sorter=self.order))
+        if pos == len(self.values) or self.values[self.order[pos]] != needle:
+            return None
+        row = int(self.order[pos])
+        return row if self.rows is None else int(self.rows[row])
+
+
+class RaggedArray:
+    """Variable-length integer arrays stored back to back.
+
+    Row i is values[offsets[i]:offsets[i + 1]], returned as a view, so a
+    list of per-entity arrays becomes two arrays instead of one object per
+    entity.
+    """
+
+    def __init__(self, arrays: Sequence[np.ndarray], dtype=np.int32):
+        lengths = np.fromiter((len(a) for a in arrays), dtype=np.int64, count=len(arrays))
+        self.offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        self.values = np.concatenate(arrays).astype(dtype) if len(arrays) else np.zeros(0, dtype=dtype)
+
+    @classmethod
+    def from_flat(cls, values: np.ndarray, offsets: np.ndarray) -> 'RaggedArray':
+        ragged = cls.__new__(cls)
+        ragged.values = values
+        ragged.offsets = np.asarray(offsets, dtype=np.int64)
+        return ragged
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> np.ndarray:
+        return self.values[self.offsets[row]:self.offsets[row + 1]]
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        return (self[row] for row in range(len(self)))
+
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+
+class RecordTable:
+    """JSON records stored back to back in one byte array and decoded on access.
+
+    Used for the display data of papers and entities (names, affiliations,
+    counts), so a request decodes only the records it returns and workers
+    share the bytes through the snapshot mapping.
+    """
+
+    def __init__(self, records: Iterable[Optional[Dict]]):
+        bodies = [json.dumps(record, separators=(',', ':'), ensure_ascii=False).encode('utf-8') for record in records]
+        lengths = np.fromiter((len(b) for b in bodies), dtype=np.int64, count=len(bodies))
+        self.offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        self.blob = np.frombuffer(b''.join(bodies), dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> Optional[Dict]:
+        return json.loads(self.blob[self.offsets[row]:self.offsets[row + 1]].tobytes())
+
+    def __iter__(self) -> Iterator[Optional[Dict]]:
+        return (self[row] for row in range(len(self)))
+
+    def rows(self, rows: Iterable[int]) -> List[Optional[Dict]]:
+        """Records of several rows, in the order given."""
+        return [self[int(row)] for row in rows]
@@ -0,0 +1,118 @@
+import numpy as np
+from typing import Dict, List, Optional
+
+from flat_tables import RaggedArray, RecordTable
+
+
+LEADERBOARD_KINDS = ('country', 'university', 'author')
+LEADERBOARD_METRICS = ('citations', 'hIndex', 'paperCount')
+
+
+def h_index(citations_desc: np.ndarray) -> int:
+    """h-index of a citation array sorted in descending order."""
+    ranks = np.arange(1, len(citations_desc) + 1)
+    return int(np.count_nonzero(citations_desc >= ranks))
+
+
+class Leaderboards:
+    """Per-entity citation metrics with rankings precomputed at load time.
+
+    For every country, university and author this keeps total citations and
+    h-index, plus its papers ordered by citations; papers per year are
+    counted from those on request. One argsort per metric is stored, so any
+    top-N page is a slice.
+    """
+
+    def __init__(self, papers: RecordTable, ids, entity_papers: Dict[str, RaggedArray],
+                 names: Dict[str, Dict[str, Dict]], paper_dicts: List[Dict]):
+        """papers are in integer key order, as records and as dicts; entity_papers holds each entity's paper keys by entity key."""
+        self.papers = papers
+        self.ids = ids
+        self.citations = np.array([paper.get('cited_by') or 0 for paper in paper_dicts], dtype=np.int64)
+        self.years = np.array([paper.get('year', 0) or 0 for paper in paper_dicts], dtype=np.int64)
+        self.kinds = {}
+        for kind in LEADERBOARD_KINDS:
+            self._add_kind(kind, entity_papers.get(kind, RaggedArray([])), names.get(kind, {}))
+
+    @classmethod
+    def from_processor(cls, processor) -> 'Leaderboards':
+        """Build the leaderboards from a processed CSVProcessor."""
+        names = {'country': {}, 'university': {}, 'author': {}}
+        for country in processor.get_processed_data() or []:
+            names['country'][country['id']] = {'name': country['name']}
+            for uni in country['universities']:
+                names['university'].setdefault(uni['id'], {'name': uni['name'], 'country': country['name']})
+                for author in uni['authors']:
+                    names['author'].setdefault(author['id'], {'name': author['name'], 'affiliation': author['affiliation']})
+        return cls(processor.paper_table(), processor.ids, processor.entity_papers, names, processor.paper_list())
+
+    def _add_kind(self, kind: str, entity_papers: RaggedArray, names: Dict[str, Dict]):
+        entity_ids = self.ids.id_list(kind)
+        citations = np.zeros(len(entity_ids), dtype=np.int64)
+        h_indexes = np.zeros(len(entity_ids), dtype=np.int64)
+        paper_counts = np.zeros(len(entity_ids), dtype=np.int64)
+        papers_by_citations = []
+
+        for row, paper_keys in enumerate(entity_papers):
+            # Most cited first, ties in dataset order
+            paper_keys = paper_keys[np.argsort(-self.citations[paper_keys], kind='stable')]
+            cites = self.citations[paper_keys]
+
+            citations[row] = cites.sum()
+            h_indexes[row] = h_index(cites)
+            paper_counts[row] = len(paper_keys)
+            papers_by_citations.append(paper_keys)
+
+        metrics = {'citations': citations, 'hIndex': h_indexes, 'paperCount': paper_counts}
+
+        # Ties are broken by the other metrics so rankings are stable across reloads
+        rankings = {
+            'citations': np.lexsort((-paper_counts, -h_indexes, -citations)),
+            'hIndex': np.lexsort((-paper_counts, -citations, -h_indexes)),
+            'paperCount': np.lexsort((-h_indexes, -citations, -paper_counts)),
+        }
+
+        self.kinds[kind] = {
+            'ids': entity_ids,
+            'names': RecordTable(names.get(entity_id, {'name': entity_id}) for entity_id in entity_ids),
+            'metrics': metrics,
+            'rankings': rankings,
+            'papers_by_citations': RaggedArray(papers_by_citations)
+        }
+
+    def _entry(self, kind: str, row: int) -> Dict:
+        board = self.kinds[kind]
+        years, counts = np.unique(self.years[board['papers_by_citations'][row]], return_counts=True)
+        return {
+            'id': board['ids'][row],
+            **board['names'][row],
+            'paperCount': int(board['metrics']['paperCount'][row]),
+            'citations': int(board['metrics']['citations'][row]),
+            'hIndex': int(board['metrics']['hIndex'][row]),
+            'papersPerYear': {int(y): int(c) for y, c in zip(years, counts)}
+        }
+
+    def top(self, kind: str, metric: str, limit: int = 10, offset: int = 0) -> List[Dict]:
+        """Get a page of the ranking for one metric."""
+        ranking = self.kinds[kind]['rankings'][metric][offset:offset + limit]
+        return [
+            {'rank': offset + i + 1, **self._entry(kind, int(row))}
+            for i, row in enumerate(ranking)
+        ]
+
+    def total(self, kind: str) -> int:
+        return len(self.kinds[kind]['ids'])
+
+    def entity(self, kind: str, entity_id: str) -> Optional[Dict]:
+        """Get the metrics of one entity, or None if it is unknown."""
+        row = self.ids.key(kind, entity_id)
+        if row is None:
+            return None
+        return self._entry(kind, row)
+
+    def top_papers(self, kind: str, entity_id: str, limit: int = 10) -> Optional[List[Dict]]:
+        """Get the most-cited papers of one entity, or None if it is unknown."""
+        row = self.ids.key(kind, entity_id)
+        if row is None:
+            return None
+        return self.papers.rows(self.kinds[kind]['papers_by_citations'][row][:limit])
@@ -0,0 +1,44 @@
+import gzip
+import hashlib
+import json
+from typing import Dict, List
+
+
+class CountryMapLayer:
+    """GeoJSON FeatureCollection of country points for the map, serialized once.
+
+    Built alongside the other indexes for each year filter. The body is kept
+    as JSON bytes plus a gzip copy and a content-hash ETag, so serving the map
+    is a header check and a write of prebuilt bytes. Countries without known
+    coordinates are left out of the features and listed under 'unmapped'.
+    """
+
+    def __init__(self, data: List[Dict]):
+        features = []
+        unmapped = []
+        for country in data:
+            if country['lat'] == 0 and country['lng'] == 0:
+                unmapped.append(country['id'])
+                continue
+            features.append({
+                'type': 'Feature',
+                'id': country['id'],
+                'geometry': {'type': 'Point', 'coordinates': [country['lng'], country['lat']]},
+                'properties': {
+                    'name': country['name'],
+                    'paperCount': country['paperCount'],
+                    'universityCount': len(country['universities'])
+                }
+            })
+
+        self.country_count = len(features)
+        self.unmapped = unmapped
+        collection = {'type': 'FeatureCollection', 'features': features, 'unmapped': unmapped}
+        self.body = json.dumps(collection, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        # mtime=0 keeps the compressed bytes identical across rebuilds of the same data
+        self.gzip_body = gzip.compress(self.body, compresslevel=9, mtime=0)
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest()[:20] + '"'
+
+    @classmethod
+    def from_processor(cls, processor) -> 'CountryMapLayer':
+        return cls(processor.get_processed_data())
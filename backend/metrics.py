@@ -0,0 +1,201 @@
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+# Timings collected while serving the current request, reported in Server-Timing
+request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar('request_timings', default=None)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels) + '}'
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self.values.get(tuple(sorted(labels.items())), 0)
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        for key, value in sorted(self.values.items()):
+            lines.append(f'{self.name}{_format_labels(key)} {value}')
+        return lines
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    def set(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.values[key] = value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f'# TYPE {self.name} gauge'
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram with labels; observe() is a bisect and three additions."""
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        idx = bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * (len(self.buckets) + 2)
+            series[idx] += 1
+            series[-1] += value
+
+    def count(self, **labels) -> int:
+        series = self.series.get(tuple(sorted(labels.items())))
+        return sum(series[:-1]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for key, series in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series[:-1]):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{self.name}_bucket{_format_labels(key + (("le", le),))} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(key)} {series[-1]}')
+            lines.append(f'{self.name}_count{_format_labels(key)} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """Process-wide metrics exposed in Prometheus text format."""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self.metrics.setdefault(name, Counter(name, help_text))
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self.metrics.setdefault(name, Gauge(name, help_text))
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...]) -> Histogram:
+        return self.metrics.setdefault(name, Histogram(name, help_text, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+ingest_stage_seconds = registry.histogram(
+    'ingest_stage_seconds', 'Time spent in each dataset ingest stage', STAGE_BUCKETS)
+cache_requests_total = registry.counter(
+    'cache_requests_total', 'Dataset cache lookups by cache and result (hit, miss, rejected)')
+cache_evictions_total = registry.counter(
+    'cache_evictions_total', 'Entries evicted from a cache')
+cache_entries = registry.gauge(
+    'cache_entries', 'Entries currently held in a cache')
+cache_bytes = registry.gauge(
+    'cache_bytes', 'Estimated memory held by a cache')
+http_request_duration_seconds = registry.histogram(
+    'http_request_duration_seconds', 'Request latency by route, method and status', LATENCY_BUCKETS)
+http_response_size_bytes = registry.histogram(
+    'http_response_size_bytes', 'Response body size by route', SIZE_BUCKETS)
+
+
+def record_stage(stage: str, seconds: float):
+    """Record an ingest stage duration, and add it to the current request's Server-Timing."""
+    ingest_stage_seconds.observe(seconds, stage=stage)
+    timings = request_timings.get()
+    if timings is not None:
+        timings.append((stage, seconds))
+
+
+@contextmanager
+def timed_stage(stage: str):
+    """Time a block as an ingest stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording route latency and response size, and adding Server-Timing.
+
+    Routes are labelled by endpoint name rather than raw path so label
+    cardinality stays bounded no matter which IDs clients request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        timings = []
+        token = request_timings.set(timings)
+        state = {'status': 500, 'size': 0}
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                state['status'] = message['status']
+                elapsed = time.perf_counter() - start
+                entries = [f'{name};dur={seconds * 1000:.2f}' for name, seconds in timings]
+                entries.append(f'app;dur={elapsed * 1000:.2f}')
+                headers = list(message.get('headers', []))
+                headers.append((b'server-timing', ', '.join(entries).encode('latin-1')))
+                message = {**message, 'headers': headers}
+            elif message['type'] == 'http.response.body':
+                state['size'] += len(message.get('body', b''))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_timings.reset(token)
+            endpoint = scope.get('endpoint')
+            route = getattr(endpoint, '__name__', 'unmatched')
+            http_request_duration_seconds.observe(
+                time.perf_counter() - start, route=route, method=scope['method'], status=str(state['status']))
+            http_response_size_bytes.observe(state['size'], route=route)
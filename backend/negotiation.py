@@ -0,0 +1,170 @@
+import gzip
+import hashlib
+from contextvars import ContextVar
+from typing import Optional
+
+import anyio
+from fastapi.responses import JSONResponse
+
+from metrics import registry
+
+
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+MSGPACK_ACCEPT = ('application/msgpack', 'application/x-msgpack')
+
+# Only textual and MessagePack bodies at least this large are compressed
+COMPRESSIBLE_TYPES = (b'application/json', b'application/geo+json', b'application/msgpack', b'text/')
+MIN_COMPRESS_BYTES = 1024
+# Bodies at least this large are hashed and compressed in a worker thread
+THREAD_COMPRESS_BYTES = 256 * 1024
+
+compressed_bytes_total = registry.counter('response_compressed_bytes_total', 'Response bytes before and after compression')
+
+# Body format the client accepts for the current request, set by CompressionMiddleware
+accepted_format: ContextVar[str] = ContextVar('accepted_format', default='json')
+
+
+def accepted_tokens(header: str) -> dict:
+    """Parse an Accept or Accept-Encoding header into {token: quality}."""
+    tokens = {}
+    for item in header.split(','):
+        parts = [p.strip() for p in item.split(';')]
+        if not parts[0]:
+            continue
+        quality = 1.0
+        for param in parts[1:]:
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        tokens[parts[0].lower()] = quality
+    return tokens
+
+
+def choose_format(accept: str) -> str:
+    """'msgpack' when the client asks for MessagePack over JSON, otherwise 'json'."""
+    tokens = accepted_tokens(accept)
+    msgpack_q = max((tokens.get(t, 0.0) for t in MSGPACK_ACCEPT), default=0.0)
+    json_q = max(tokens.get('application/json', 0.0), tokens.get('*/*', 0.0) * 0.9)
+    return 'msgpack' if msgpack_q > 0 and msgpack_q >= json_q else 'json'
+
+
+def brotli_module():
+    """The optional brotli module, or None if it isn't installed."""
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Preferred content coding the client accepts: br when available, then gzip."""
+    tokens = accepted_tokens(accept_encoding)
+    if tokens.get('br', 0) > 0 and brotli_module() is not None:
+        return 'br'
+    if tokens.get('gzip', 0) > 0 or (tokens.get('*', 0) > 0 and 'gzip' not in tokens):
+        return 'gzip'
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli_module().compress(body, quality=5)
+    # mtime=0 keeps the output identical for identical bodies
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+class NegotiatedResponse(JSONResponse):
+    """JSON response that renders as MessagePack when the client prefers it."""
+
+    def __init__(self, content=None, status_code: int = 200, headers=None, media_type=None, background=None):
+        if accepted_format.get() == 'msgpack':
+            self.media_type = MSGPACK_MEDIA_TYPE
+        super().__init__(content, status_code, headers, media_type, background)
+
+    def render(self, content) -> bytes:
+        if self.media_type == MSGPACK_MEDIA_TYPE:
+            import msgpack
+            return msgpack.packb(content, use_bin_type=True)
+        return super().render(content)
+
+
+class CompressionMiddleware:
+    """ASGI middleware negotiating the body format and compressing large responses.
+
+    Compressed bodies are cached by content digest and coding, so a hot
+    response is compressed once per dataset version instead of on every
+    request; entries for replaced datasets simply age out of the LRU.
+    Responses that already carry a Content-Encoding (the prebuilt map layer)
+    or aren't textual pass through untouched.
+    """
+
+    def __init__(self, app, cache, minimum_size: int = MIN_COMPRESS_BYTES):
+        self.app = app
+        self.cache = cache
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        headers = {k.lower(): v.decode('latin-1') for k, v in scope.get('headers', [])}
+        token = accepted_format.set(choose_format(headers.get(b'accept', '')))
+        encoding = choose_encoding(headers.get(b'accept-encoding', ''))
+        state = {'start': None, 'body': [], 'passthrough': False}
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                response_headers = message.get('headers', [])
+                content_type = next((v for k, v in response_headers if k.lower() == b'content-type'), b'')
+                already_encoded = any(k.lower() == b'content-encoding' for k, _ in response_headers)
+                if already_encoded or not content_type.startswith(COMPRESSIBLE_TYPES):
+                    state['passthrough'] = True
+                    await send(message)
+                else:
+                    state['start'] = message
+                return
+
+            if message['type'] != 'http.response.body' or state['passthrough']:
+                await send(message)
+                return
+
+            state['body'].append(message.get('body', b''))
+            if message.get('more_body', False):
+                return
+            await self._send_buffered(send, state['start'], b''.join(state['body']), encoding)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            accepted_format.reset(token)
+
+    def _compress_cached(self, body: bytes, encoding: str) -> bytes:
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = compress(body, encoding)
+            self.cache.put(key, compressed, size=len(compressed))
+        return compressed
+
+    async def _send_buffered(self, send, start, body: bytes, encoding: Optional[str]):
+        headers = [(k, v) for k, v in start.get('headers', []) if k.lower() not in (b'content-length', b'vary')]
+        headers.append((b'vary', b'Accept, Accept-Encoding'))
+
+        if encoding is not None and start['status'] == 200 and len(body) >= self.minimum_size:
+            if len(body) >= THREAD_COMPRESS_BYTES:
+                # A multi-megabyte body would block every other request on the loop
+                compressed = await anyio.to_thread.run_sync(self._compress_cached, body, encoding)
+            else:
+                compressed = self._compress_cached(body, encoding)
+            compressed_bytes_total.inc(len(body), stage='original', encoding=encoding)
+            compressed_bytes_total.inc(len(compressed), stage='compressed', encoding=encoding)
+            body = compressed
+            headers.append((b'content-encoding', encoding.encode('latin-1')))
+
+        headers.append((b'content-length', str(len(body)).encode('latin-1')))
+        await send({**start, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
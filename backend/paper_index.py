@@ -0,0 +1,139 @@
+import numpy as np
+from typing import List, Optional
+
+from flat_tables import RaggedArray
+
+
+ENTITY_KINDS = ('country', 'university', 'author')
+
+# Kinds bounded in number (there are only so many countries) keep dense bitset
+# rows; universities and authors grow with the dataset and stay sorted key arrays
+DENSE_KINDS = ('country',)
+
+
+class PaperBitmapIndex:
+    """Per-entity paper sets for exact unique counts across entity unions.
+
+    Every paper has an integer key. Countries are few, so each is stored as
+    one row of packed uint64 words with a bit per paper, and their unions and
+    intersections are a handful of vectorized word operations. Universities
+    and authors grow with the dataset, so a dense matrix would grow with
+    entities x papers; they keep the processor's ragged array of sorted
+    int32 paper keys and are combined with set merges.
+
+    A paper set is therefore either a uint64 bitset or a sorted int32 key
+    array; every method below accepts both.
+    """
+
+    def __init__(self, ids, citations: np.ndarray):
+        self.ids = ids
+        self.paper_ids = ids.paper_ids
+        self.citations = citations
+        self.n_words = max(1, (len(self.paper_ids) + 63) // 64)
+        self.matrices = {kind: np.zeros((0, self.n_words), dtype=np.uint64) for kind in DENSE_KINDS}
+        self.sorted_keys = {kind: RaggedArray([]) for kind in ENTITY_KINDS if kind not in DENSE_KINDS}
+
+    @classmethod
+    def from_processor(cls, processor) -> 'PaperBitmapIndex':
+        """Build the index from a processed CSVProcessor."""
+        citations = np.array(
+            [paper.get('cited_by', 0) or 0 for paper in processor.paper_list()],
+            dtype=np.int64
+        )
+        index = cls(processor.ids, citations)
+        for kind in ENTITY_KINDS:
+            if kind in DENSE_KINDS:
+                index.add_entities(kind, *processor.incidence(kind))
+            else:
+                index.sorted_keys[kind] = processor.entity_papers.get(kind, RaggedArray([]))
+        return index
+
+    def add_entities(self, kind: str, rows: np.ndarray, cols: np.ndarray):
+        """Set the bits of every (entity key, paper key) pair of one dense kind in a single vectorized pass."""
+        matrix = np.zeros((self.ids.count(kind), self.n_words), dtype=np.uint64)
+        if len(rows):
+            bits = np.left_shift(np.uint64(1), (cols % 64).astype(np.uint64))
+            np.bitwise_or.at(matrix, (rows, cols // 64), bits)
+        self.matrices[kind] = matrix
+        return self
+
+    def get(self, kind: str, entity_id: str) -> Optional[np.ndarray]:
+        """Get the paper set of one entity, or None if it has no papers."""
+        row = self.ids.key(kind, entity_id)
+        if row is None:
+            return None
+        if kind in DENSE_KINDS:
+            return self.matrices[kind][row]
+        return self.sorted_keys[kind][row]
+
+    @staticmethod
+    def is_bitmap(papers: np.ndarray) -> bool:
+        return papers.dtype == np.uint64
+
+    def to_bitmap(self, keys: np.ndarray) -> np.ndarray:
+        """Bitset of a key array."""
+        bitmap = np.zeros(self.n_words, dtype=np.uint64)
+        keys = keys.astype(np.int64)
+        np.bitwise_or.at(bitmap, keys // 64, np.left_shift(np.uint64(1), (keys % 64).astype(np.uint64)))
+        return bitmap
+
+    def to_keys(self, papers: np.ndarray) -> np.ndarray:
+        """Sorted paper keys of a paper set."""
+        if self.is_bitmap(papers):
+            return np.flatnonzero(self.mask(papers)).astype(np.int32)
+        return papers
+
+    def union(self, sets: List[np.ndarray]) -> np.ndarray:
+        """Papers belonging to at least one of the sets."""
+        bitmaps = [s for s in sets if self.is_bitmap(s)]
+        key_arrays = [s for s in sets if not self.is_bitmap(s)]
+        keys = np.unique(np.concatenate(key_arrays)) if key_arrays else None
+        if not bitmaps:
+            return keys if keys is not None else np.zeros(self.n_words, dtype=np.uint64)
+        combined = np.bitwise_or.reduce(np.vstack(bitmaps), axis=0)
+        if keys is not None:
+            combined |= self.to_bitmap(keys)
+        return combined
+
+    def intersection(self, sets: List[np.ndarray]) -> np.ndarray:
+        """Papers belonging to every one of the sets."""
+        if not sets:
+            return np.zeros(self.n_words, dtype=np.uint64)
+        bitmaps = [s for s in sets if self.is_bitmap(s)]
+        key_arrays = sorted((s for s in sets if not self.is_bitmap(s)), key=len)
+        if not key_arrays:
+            return np.bitwise_and.reduce(np.vstack(bitmaps), axis=0)
+
+        # Start from the smallest key array and only ever shrink it
+        keys = key_arrays[0]
+        for other in key_arrays[1:]:
+            keys = np.intersect1d(keys, other, assume_unique=True)
+        for bitmap in bitmaps:
+            wide = keys.astype(np.int64)
+            keys = keys[(bitmap[wide // 64] >> (wide % 64).astype(np.uint64)) & np.uint64(1) == 1]
+        return keys
+
+    def count(self, papers: np.ndarray) -> int:
+        """Number of papers in a set."""
+        if self.is_bitmap(papers):
+            return int(np.bitwise_count(papers).sum())
+        return len(papers)
+
+    def mask(self, papers: np.ndarray) -> np.ndarray:
+        """Boolean mask over paper positions for a set."""
+        if not self.is_bitmap(papers):
+            mask = np.zeros(len(self.paper_ids), dtype=bool)
+            mask[papers] = True
+            return mask
+        bits = np.unpackbits(papers.view(np.uint8), bitorder='little')
+        return bits[:len(self.paper_ids)].astype(bool)
+
+    def citation_count(self, papers: np.ndarray) -> int:
+        """Total citations of the papers in a set, each paper counted once."""
+        if self.is_bitmap(papers):
+            return int(self.citations[self.mask(papers)].sum())
+        return int(self.citations[papers].sum())
+
+    def paper_ids_for(self, papers: np.ndarray) -> List[str]:
+        """Paper ids contained in a set, in dataset order."""
+        return [self.paper_ids[i] for i in self.to_keys(papers)]
@@ -0,0 +1,40 @@
+# Named country groups for region aggregation
+# Country names are matched through the same ID scheme as the processed data
+
+REGIONS = {
+    'asean': {
+        'name': 'ASEAN',
+        'countries': [
+            'Brunei Darussalam', 'Cambodia', 'Indonesia', 'Laos', 'Malaysia',
+            'Myanmar', 'Philippines', 'Singapore', 'Thailand', 'Viet Nam', 'Vietnam',
+        ],
+    },
+    'eu': {
+        'name': 'European Union',
+        'countries': [
+            'Austria', 'Belgium', 'Bulgaria', 'Croatia', 'Cyprus', 'Czech Republic',
+            'Denmark', 'Estonia', 'Finland', 'France', 'Germany', 'Greece', 'Hungary',
+            'Ireland', 'Italy', 'Latvia', 'Lithuania', 'Luxembourg', 'Malta',
+            'Netherlands', 'Poland', 'Portugal', 'Romania', 'Slovakia', 'Slovenia',
+            'Spain', 'Sweden',
+        ],
+    },
+    'gcc': {
+        'name': 'Gulf Cooperation Council',
+        'countries': [
+            'Bahrain', 'Kuwait', 'Oman', 'Qatar', 'Saudi Arabia', 'United Arab Emirates',
+        ],
+    },
+    'brics': {
+        'name': 'BRICS',
+        'countries': [
+            'Brazil', 'Russian Federation', 'Russia', 'India', 'China', 'South Africa',
+            'Egypt', 'Ethiopia', 'Iran', 'United Arab Emirates', 'Indonesia',
+        ],
+    },
+}
+
+
+def get_region(region_id: str) -> dict:
+    """Get a named region by ID (case-insensitive)."""
+    return REGIONS.get(region_id.lower().strip()) if region_id else None
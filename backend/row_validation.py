@@ -0,0 +1,112 @@
+import re
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from metrics import registry
+
+
+quarantined_rows_total = registry.counter('ingest_quarantined_rows_total', 'Source rows set aside by validation per reason')
+dropped_author_cells_total = registry.counter('ingest_dropped_author_cells_total', 'Author cells blanked for a malformed Scopus ID')
+
+# Publication years outside this range are typos or placeholder values
+MIN_YEAR = 1900
+MAX_YEAR = 2100
+
+# Cleaned author cells are 'Name (Scopus author ID)' or, without an ID, just
+# the name (the processor gives those a name-based ID). A trailing
+# parenthesized ID that isn't numeric is malformed.
+TRAILING_ID_PATTERN = r'\([^()]*\)\s*$'
+AUTHOR_ID_PATTERN = r'\(\d+\)\s*$'
+AUTHOR_COLUMN = re.compile(r'^Author \d+$')
+
+QUARANTINE_COLUMNS = ['EID', 'Title', 'Year', 'Cited by']
+
+
+def _present(column: pd.Series) -> pd.Series:
+    """Cells holding a value, treating blanks and 'nan' strings as missing."""
+    text = column.astype(str).str.strip()
+    return column.notna() & (text != '') & (text.str.lower() != 'nan')
+
+
+def _whole_numbers(column: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """Coerce a column to numbers; returns (values, mask of cells that aren't whole numbers)."""
+    text = column.astype(str).str.replace(',', '', regex=False).str.strip()
+    values = pd.to_numeric(text.where(_present(column)), errors='coerce')
+    fractional = values.notna() & (values != np.floor(values))
+    return values, (_present(column) & values.isna()) | fractional
+
+
+def validate_rows(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Split a cleaned frame into rows fit for processing and quarantined rows.
+
+    Every check is a column operation, so a source with a few malformed rows
+    costs a handful of vectorized passes instead of a failed build:
+
+    - Year must be a whole number between MIN_YEAR and MAX_YEAR
+    - Cited by must be a non-negative whole number (blank means 0)
+    - EIDs must be unique; later duplicates are quarantined. Rows without an
+      EID are kept, as in dataset_manifest.load_sources
+    - an Author N cell ending in a non-numeric "(ID)" is blanked, keeping
+      the row and its other authors; name-only cells are left alone
+
+    Valid rows come back with Year and Cited by as int64. Quarantined rows
+    keep their original values plus a 'Reason' column listing every failed
+    check.
+    """
+    reasons = pd.DataFrame(index=df.index)
+
+    if 'Year' in df.columns:
+        years, malformed = _whole_numbers(df['Year'])
+        reasons['invalid year'] = malformed | years.isna() | (years < MIN_YEAR) | (years > MAX_YEAR)
+    else:
+        years = None
+
+    if 'Cited by' in df.columns:
+        cited_by, malformed = _whole_numbers(df['Cited by'])
+        reasons['invalid citation count'] = malformed | (cited_by < 0)
+    else:
+        cited_by = None
+
+    if 'EID' in df.columns:
+        has_eid = _present(df['EID'])
+        eids = df['EID'].astype(str).str.strip()
+        reasons['duplicate EID'] = has_eid & eids.duplicated()
+
+    bad = reasons.any(axis=1)
+    valid = df[~bad].copy()
+
+    dropped = 0
+    for col in [col for col in valid.columns if AUTHOR_COLUMN.match(col)]:
+        text = valid[col].astype(str)
+        malformed = (
+            _present(valid[col]) & text.str.contains(TRAILING_ID_PATTERN, regex=True)
+            & ~text.str.contains(AUTHOR_ID_PATTERN, regex=True)
+        )
+        if malformed.any():
+            valid.loc[malformed, col] = np.nan
+            dropped += int(malformed.sum())
+    if dropped:
+        dropped_author_cells_total.inc(dropped)
+        print(f"Dropped {dropped} author cells with a malformed Scopus ID")
+
+    if years is not None:
+        valid['Year'] = years[~bad].astype(np.int64)
+    if cited_by is not None:
+        valid['Cited by'] = cited_by[~bad].fillna(0).astype(np.int64)
+
+    quarantined = df.loc[bad, [col for col in QUARANTINE_COLUMNS if col in df.columns]].copy()
+    flagged = reasons[bad]
+    quarantined['Reason'] = [
+        '; '.join(reason for reason, failed in row.items() if failed)
+        for _, row in flagged.iterrows()
+    ]
+    for reason, count in flagged.sum().items():
+        if count:
+            quarantined_rows_total.inc(int(count), reason=reason)
+
+    if len(quarantined):
+        print(f"Quarantined {len(quarantined)} of {len(df)} rows: "
+              + ', '.join(f"{int(count)} {reason}" for reason, count in flagged.sum().items() if count))
+    return valid, quarantined
@@ -1,16 +1,39 @@
-from fastapi import FastAPI, APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, JSONResponse, Response, FileResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
-from csv_processor import CSVProcessor
-from openpyxl import Workbook
-from io import BytesIO
+from facet_cube import FacetFilter
+from leaderboards import LEADERBOARD_KINDS, LEADERBOARD_METRICS
+from time_series import TREND_KINDS
+from suggest_index import SUGGEST_KINDS, MAX_SUGGESTIONS
+from drilldown import (
+    parse_sort, parse_fields, page, project,
+    UNIVERSITY_SORT_KEYS, AUTHOR_SORT_KEYS, PAPER_SORT_KEYS,
+    DEFAULT_UNIVERSITY_SORT, DEFAULT_AUTHOR_SORT, DEFAULT_PAPER_SORT
+)
+from regions import REGIONS, get_region
+from country_coordinates import canonical_country_name
+from entity_ids import compact_id
+from metrics import registry, timed_stage, MetricsMiddleware, cache_requests_total
+from dataset_cache import DatasetCache, pickled_size
+from dataset_snapshot import SnapshotStore
+from dataset_manifest import source_paths, dataset_version
+from exports import EXPORTS, XLSX_MEDIA_TYPE, export_filename
+from export_jobs import ExportJobQueue, QueueFullError
+from negotiation import NegotiatedResponse, CompressionMiddleware
+from admission import ADMISSION_DEFAULTS, AdmissionLimiter, AdmissionRejected
+from static_artifacts import StaticArtifacts, StaticArtifactMiddleware
+from pydantic import BaseModel
+import asyncio
+
+# pandas, scipy, openpyxl and motor are imported where they are first needed
+# (dataset build, exports, persistence) so workers answer /api/ sooner
 
 
 ROOT_DIR = Path(__file__).parent
@@ -23,56 +46,257 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# MongoDB connection, opened on first get_db() call
+client = None
+
 
-# Create the main app without a prefix
-app = FastAPI()
+def get_db():
+    """Get the MongoDB database, connecting on first use."""
+    global client
+    if client is None:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    return client[os.environ['DB_NAME']]
+
+# Create the main app without a prefix; route results render as JSON or MessagePack per Accept
+app = FastAPI(default_response_class=NegotiatedResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
-# Global data cache - stores data for each year filter
-cached_data = {}  # year -> processed_data
-cached_stats = {}  # year -> stats
+# Global data cache - stores stats and indexes for each year filter,
+# bounded so arbitrary ?year= values can't grow memory without limit
+dataset_cache = DatasetCache(
+    'dataset',
+    max_entries=int(os.environ.get('DATASET_CACHE_MAX_ENTRIES', '8')),
+    max_bytes=int(os.environ.get('DATASET_CACHE_MAX_MB', '2048')) * 1024 * 1024
+)
+available_years = {}  # dataset version -> set of years present in the source
+
+# How authors are tied to institutions: 'precise' (their own affiliations)
+# or 'all' (every author of a paper at every institution)
+affiliation_mode = os.environ.get('AFFILIATION_MODE', 'precise')
 
-def load_data(year_filter: Optional[int] = None):
-    """Load and process CSV data with optional year filter."""
-    global cached_data, cached_stats
-    
-    cache_key = year_filter if year_filter else 'all'
-    
-    # Return cached data if available
-    if cache_key in cached_data:
-        return cached_data[cache_key], cached_stats[cache_key]
+# With DATASET_SNAPSHOT_DIR set, one process builds each dataset and the
+# other workers map its snapshot instead of parsing the CSV themselves
+snapshot_store = (
+    SnapshotStore(os.environ['DATASET_SNAPSHOT_DIR'], settings=(affiliation_mode,))
+    if os.environ.get('DATASET_SNAPSHOT_DIR') else None
+)
+
+# Rows failing ingest validation are written here as quarantine.csv when set
+quarantine_dir = os.environ.get('QUARANTINE_DIR')
+
+# Exports run in a bounded worker pool, never on the event loop
+export_queue = ExportJobQueue(
+    max_workers=int(os.environ.get('EXPORT_WORKERS', '2')),
+    max_pending=int(os.environ.get('EXPORT_MAX_PENDING', '16')),
+    ttl_seconds=float(os.environ.get('EXPORT_TTL_SECONDS', '3600')),
+    directory=os.environ.get('EXPORT_DIR')
+)
+
+
+# Per route class limits on expensive work, e.g. ADMISSION_BUILD_CONCURRENCY / ADMISSION_BUILD_QUEUE
+admission = {
+    route_class: AdmissionLimiter(
+        route_class,
+        max_concurrent=int(os.environ.get(f'ADMISSION_{route_class.upper()}_CONCURRENCY', concurrent)),
+        max_queue=int(os.environ.get(f'ADMISSION_{route_class.upper()}_QUEUE', queued))
+    )
+    for route_class, (concurrent, queued) in ADMISSION_DEFAULTS.items()
+}
+
+
+class UnknownYearError(ValueError):
+    """Raised when a year filter names a year with no papers in the dataset."""
     
-    # Try new uncleaned file first, fallback to old cleaned file
-    csv_path = '/app/Scopus_Data_APU_2021_Dec_2025_Complete.csv'
-    if not os.path.exists(csv_path):
-        csv_path = '/app/APU_publications_2021_2025_cleaned_Final.csv'
+    def __init__(self, year: int, years: set):
+        super().__init__(f"No papers for year {year}")
+        self.year = year
+        self.years = sorted(years)
+
+
+def get_csv_path() -> Optional[str]:
+    """Get the dataset source, or None if it doesn't exist.
+    
+    The source is one CSV file or, with DATA_SOURCES, a directory or glob of
+    overlapping exports merged on EID.
+    """
+    sources = os.environ.get('DATA_SOURCES')
+    if sources:
+        if not source_paths(sources):
+            logger.error(f"No CSV files found for {sources}")
+            return None
+        return sources
+    
+    # DATA_CSV_PATH overrides the default files
+    # Otherwise try new uncleaned file first, fallback to old cleaned file
+    csv_path = os.environ.get('DATA_CSV_PATH')
+    if not csv_path:
+        csv_path = '/app/Scopus_Data_APU_2021_Dec_2025_Complete.csv'
+        if not os.path.exists(csv_path):
+            csv_path = '/app/APU_publications_2021_2025_cleaned_Final.csv'
     if not os.path.exists(csv_path):
         logger.error(f"CSV file not found at {csv_path}")
-        return None, None
+        return None
+    return csv_path
+
+
+def validate_year(csv_path: str, year_filter: Optional[int]):
+    """Reject years absent from the dataset without reading or processing it again."""
+    if not year_filter:
+        return
+    
+    key = dataset_version(csv_path)
+    years = available_years.get(key)
+    if years is None:
+        from data_cleaner import read_years
+        years = read_years(csv_path)
+        available_years.clear()
+        available_years[key] = years
+    
+    if year_filter not in years:
+        cache_requests_total.inc(cache='dataset', result='rejected')
+        raise UnknownYearError(year_filter, years)
+
+
+def build_dataset(csv_path: str, year_filter: Optional[int] = None):
+    """Process the CSV and build all indexes for one year filter."""
+    from csv_processor import CSVProcessor
+    from paper_index import PaperBitmapIndex
+    from facet_cube import FacetCube
+    from collaboration_graph import CollaborationGraph
+    from leaderboards import Leaderboards
+    from drilldown import DrilldownIndex
+    from map_layer import CountryMapLayer
+    from time_series import YearSeries
+    from author_index import AuthorIndex
+    from suggest_index import SuggestIndex
     
     try:
-        processor = CSVProcessor(csv_path, year_filter=year_filter)
+        processor = CSVProcessor(csv_path, year_filter=year_filter, affiliation_mode=affiliation_mode)
         processor.load_csv().process_data()
-        data = processor.get_processed_data()
         stats = processor.get_stats()
+        if quarantine_dir and len(processor.quarantined):
+            write_quarantine_report(processor.quarantined)
         
-        # Cache the results
-        cached_data[cache_key] = data
-        cached_stats[cache_key] = stats
+        with timed_stage('index'):
+            indexes = {
+                'ids': processor.ids,
+                'papers': PaperBitmapIndex.from_processor(processor),
+                'facets': FacetCube.from_processor(processor),
+                'collaborations': CollaborationGraph.from_processor(processor),
+                'leaderboards': Leaderboards.from_processor(processor),
+                'drilldown': DrilldownIndex.from_processor(processor),
+                'map': CountryMapLayer.from_processor(processor),
+                'authors': AuthorIndex.from_processor(processor),
+                'suggest': SuggestIndex.from_processor(processor)
+            }
+            # Trends span every year, so only the unfiltered dataset carries them
+            if not year_filter:
+                indexes['trends'] = YearSeries.from_processor(processor)
         
-        logger.info(f"Data loaded successfully for year={year_filter}: {stats}")
-        return data, stats
+        # Measured once here and kept in the entry (and its snapshot), so
+        # caching it doesn't walk the indexes again
+        size = pickled_size(indexes)
+        logger.info(f"Data loaded successfully for year={year_filter}: {stats}, {size / 1e6:.1f} MB")
+        # The hierarchy itself lives in the drill-down index's flat tables,
+        # so nothing in the entry needs unpickling object by object
+        return {'stats': stats, 'indexes': indexes, 'size': size}
     except Exception as e:
         logger.error(f"Error processing CSV: {e}")
         import traceback
         traceback.print_exc()
+        return None
+
+
+def write_quarantine_report(quarantined):
+    """Write the rows set aside by ingest validation for whoever maintains the source."""
+    os.makedirs(quarantine_dir, exist_ok=True)
+    path = os.path.join(quarantine_dir, 'quarantine.csv')
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    quarantined.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    logger.warning(f"{len(quarantined)} malformed rows quarantined to {path}")
+
+
+def dataset_key(csv_path: str, year_filter: Optional[int]):
+    """Cache key of a dataset: the source version and year filter.
+    
+    A refreshed source gets new keys, so it is rebuilt rather than served
+    from the old data; entries of the old version age out of the LRU.
+    """
+    return (dataset_version(csv_path), year_filter or 'all')
+
+
+def load_dataset(year_filter: Optional[int] = None):
+    """Get the cached dataset entry for a year filter, building it if needed."""
+    csv_path = get_csv_path()
+    if csv_path is None:
+        return None
+    
+    validate_year(csv_path, year_filter)
+    cache_key = dataset_key(csv_path, year_filter)
+    
+    def build():
+        if snapshot_store is not None:
+            return snapshot_store.get_or_build(csv_path, year_filter, lambda: build_dataset(csv_path, year_filter))
+        return build_dataset(csv_path, year_filter)
+    
+    return dataset_cache.get_or_build(cache_key, build, size_of=lambda entry: entry['size'])
+
+
+def load_data(year_filter: Optional[int] = None):
+    """Load the full hierarchy and stats with optional year filter; the hierarchy is decoded on each call."""
+    entry = load_dataset(year_filter)
+    if entry is None:
         return None, None
+    return entry['indexes']['drilldown'].tree(), entry['stats']
+
+
+async def dataset_ready(year: Optional[int] = None):
+    """Route dependency getting the dataset entry for a year filter.
+
+    A cold dataset is built off the event loop within the build admission
+    limit; warm requests return immediately, so cheap routes keep their
+    latency while other years are being built. Routes read the returned
+    entry rather than looking the dataset up again, so a failed build or an
+    eviction can't send them back into a build on the event loop.
+    """
+    csv_path = get_csv_path()
+    if csv_path is None:
+        raise HTTPException(status_code=500, detail="Data not loaded")
+
+    key = dataset_key(csv_path, year)
+    entry = dataset_cache.get(key) if key in dataset_cache else None
+    if entry is None:
+        # Unknown years are rejected from the cached year set before taking a build
+        # slot, so requests for them can't queue behind or crowd out real builds
+        await run_in_threadpool(validate_year, csv_path, year)
+        async with admission['build'].slot():
+            entry = await run_in_threadpool(load_dataset, year)
+    if entry is None:
+        raise HTTPException(status_code=500, detail="Data not loaded")
+    return entry
+
+
+async def all_years_ready():
+    """Like dataset_ready, for routes that always read the unfiltered dataset and take no year."""
+    return await dataset_ready(None)
+
+
+def resolve_id(entry: dict, kind: str, entity_id: Optional[str]) -> Optional[str]:
+    """Map a current or legacy entity ID to the current one in a dataset entry; unknown IDs are returned unchanged."""
+    if entity_id is None:
+        return entity_id
+    return entry['indexes']['ids'].resolve(kind, entity_id) or entity_id
+
+
+def split_ids(value: Optional[str]) -> list:
+    """Split a comma-separated query parameter into a list of IDs."""
+    if not value:
+        return []
+    return [part.strip() for part in value.split(',') if part.strip()]
 
 
 # Routes
@@ -81,119 +305,182 @@ async def root():
     return {"message": "Research Papers World Map API"}
 
 @api_router.get("/stats")
-async def get_stats(year: Optional[int] = None):
+async def get_stats(year: Optional[int] = None, entry: dict = Depends(dataset_ready)):
     """Get overall statistics with optional year filter."""
-    data, stats = load_data(year_filter=year)
+    stats = entry['stats']
     
     if stats is None:
         raise HTTPException(status_code=500, detail="Data not loaded")
     
-    # Count only countries with valid coordinates (that appear on map)
-    countries_on_map = 0
-    if data:
-        for country in data:
-            if country['lat'] != 0 or country['lng'] != 0:
-                countries_on_map += 1
-    
+    layer = entry['indexes']['map']
     return {
         **stats,
-        'totalCountries': countries_on_map  # Only show countries visible on map
+        'totalCountries': layer.country_count  # Only show countries visible on map
     }
 
-@api_router.get("/data/countries")
-async def get_countries(year: Optional[int] = None):
-    """Get all countries with paper counts and coordinates, with optional year filter."""
-    data, stats = load_data(year_filter=year)
+@api_router.get("/map/countries.geojson")
+async def get_country_map_layer(request: Request, year: Optional[int] = None, entry: dict = Depends(dataset_ready)):
+    """Get the country map layer as GeoJSON, served from prebuilt (gzipped) bytes."""
+    layer = entry['indexes']['map']
+    
+    headers = {
+        'ETag': layer.etag,
+        'Cache-Control': 'public, max-age=300',
+        'Vary': 'Accept-Encoding'
+    }
+    if request.headers.get('if-none-match') == layer.etag:
+        return Response(status_code=304, headers=headers)
     
-    if data is None:
-        raise HTTPException(status_code=500, detail="Data not loaded")
+    if 'gzip' in request.headers.get('accept-encoding', ''):
+        headers['Content-Encoding'] = 'gzip'
+        return Response(layer.gzip_body, media_type='application/geo+json', headers=headers)
+    return Response(layer.body, media_type='application/geo+json', headers=headers)
+
+@api_router.get("/data/countries")
+async def get_countries(
+    year: Optional[int] = None,
+    document_type: Optional[List[str]] = Query(None),
+    source: Optional[List[str]] = Query(None),
+    min_citations: Optional[int] = None,
+    entry: dict = Depends(dataset_ready)
+):
+    """Get all countries with paper counts and coordinates, with optional year and facet filters."""
+    data = entry['indexes']['drilldown'].countries
+    
+    facet_filter = FacetFilter(document_type, source, min_citations)
+    if facet_filter.is_empty():
+        counts = None
+    else:
+        cube = entry['indexes']['facets']
+        counts = cube.entity_counts('country', facet_filter)
     
     # Return simplified country data for map
     countries = []
     for country in data:
+        paper_count = country['paperCount']
+        if counts is not None:
+            if country['id'] not in counts:
+                continue
+            paper_count = counts[country['id']]['paperCount']
         countries.append({
             'id': country['id'],
             'name': country['name'],
             'lat': country['lat'],
             'lng': country['lng'],
-            'paperCount': country['paperCount']
+            'paperCount': paper_count
         })
     
-    return {'countries': countries}
+    if counts is None:
+        return {'countries': countries}
+    
+    return {
+        'countries': sorted(countries, key=lambda x: x['paperCount'], reverse=True),
+        'filters': facet_filter.to_dict(),
+        'facets': cube.facet_counts(facet_filter)
+    }
 
 @api_router.get("/data/country/{country_id}")
-async def get_country(country_id: str, year: Optional[int] = None):
-    """Get universities for a specific country with optional year filter."""
-    data, stats = load_data(year_filter=year)
-    
-    if data is None:
-        raise HTTPException(status_code=500, detail="Data not loaded")
-    
-    # Find country
-    country = None
-    for c in data:
-        if c['id'] == country_id:
-            country = c
-            break
-    
-    if not country:
+async def get_country(
+    country_id: str,
+    year: Optional[int] = None,
+    document_type: Optional[List[str]] = Query(None),
+    source: Optional[List[str]] = Query(None),
+    min_citations: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
+    sort: Optional[str] = None,
+    fields: Optional[str] = None,
+    entry: dict = Depends(dataset_ready)
+):
+    """Get universities for a specific country with optional year and facet filters, paginated."""
+    drilldown = entry['indexes']['drilldown']
+    country_id = resolve_id(entry, 'country', country_id)
+    
+    row = drilldown.country_row(country_id)
+    if row is None:
         raise HTTPException(status_code=404, detail="Country not found")
-    
-    # Return country with simplified universities (without full author data)
-    universities = []
-    for uni in country['universities']:
-        universities.append({
-            'id': uni['id'],
-            'name': uni['name'],
-            'paperCount': uni['paperCount'],
-            'authors': len(uni['authors'])
-        })
-    
-    return {
+    country = drilldown.countries[row]
+    
+    sort_spec = parse_sort(sort, UNIVERSITY_SORT_KEYS, DEFAULT_UNIVERSITY_SORT)
+    if sort_spec is None:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(UNIVERSITY_SORT_KEYS)}")
+    sort_key, descending = sort_spec
+    
+    # Return country with simplified universities (without full author data);
+    # only the universities on the page are decoded
+    university_rows = drilldown.university_rows(row, sort_key)
+    total = len(university_rows)
+    country_count = country['paperCount']
+    
+    facet_filter = FacetFilter(document_type, source, min_citations)
+    if facet_filter.is_empty():
+        universities = drilldown.universities.rows(page(university_rows, descending, offset, limit))
+    else:
+        cube = entry['indexes']['facets']
+        counts = cube.entity_counts('country_university', facet_filter)
+        country_count = cube.entity_counts('country', facet_filter).get(country_id, {}).get('paperCount', 0)
+        universities = sorted(
+            [
+                {**uni, 'paperCount': counts[f"{country_id}/{uni['id']}"]['paperCount']}
+                for uni in drilldown.universities.rows(university_rows)
+                if f"{country_id}/{uni['id']}" in counts
+            ],
+            key=UNIVERSITY_SORT_KEYS[sort_key],
+            reverse=True
+        )
+        total = len(universities)
+        universities = page(universities, descending, offset, limit)
+    
+    result = {
         'country': {
             'id': country['id'],
             'name': country['name'],
-            'paperCount': country['paperCount'],
-            'universities': universities
-        }
+            'paperCount': country_count,
+            'universities': project(universities, parse_fields(fields))
+        },
+        'page': {'total': total, 'offset': offset, 'limit': limit, 'sort': sort or DEFAULT_UNIVERSITY_SORT}
     }
-
-@api_router.get("/data/university/{country_id}/{university_id}")
-async def get_university(country_id: str, university_id: str, year: Optional[int] = None):
-    """Get authors for a specific university with optional year filter."""
-    data, stats = load_data(year_filter=year)
     
-    if data is None:
-        raise HTTPException(status_code=500, detail="Data not loaded")
-    
-    # Find country and university
-    country = None
-    for c in data:
-        if c['id'] == country_id:
-            country = c
-            break
+    if not facet_filter.is_empty():
+        result['filters'] = facet_filter.to_dict()
+        result['facets'] = cube.facet_counts(facet_filter)
     
-    if not country:
+    return result
+
+@api_router.get("/data/university/{country_id}/{university_id}")
+async def get_university(
+    country_id: str,
+    university_id: str,
+    year: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
+    sort: Optional[str] = None,
+    fields: Optional[str] = None,
+    entry: dict = Depends(dataset_ready)
+):
+    """Get authors for a specific university with optional year filter, paginated."""
+    drilldown = entry['indexes']['drilldown']
+    country_id = resolve_id(entry, 'country', country_id)
+    university_id = resolve_id(entry, 'university', university_id)
+    
+    row = drilldown.country_row(country_id)
+    if row is None:
         raise HTTPException(status_code=404, detail="Country not found")
+    country = drilldown.countries[row]
     
-    university = None
-    for uni in country['universities']:
-        if uni['id'] == university_id:
-            university = uni
-            break
-    
-    if not university:
+    row = drilldown.university_row(country_id, university_id)
+    if row is None:
         raise HTTPException(status_code=404, detail="University not found")
+    university = drilldown.universities[row]
+    
+    sort_spec = parse_sort(sort, AUTHOR_SORT_KEYS, DEFAULT_AUTHOR_SORT)
+    if sort_spec is None:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(AUTHOR_SORT_KEYS)}")
+    sort_key, descending = sort_spec
     
     # Return university with simplified authors (without papers)
-    authors = []
-    for author in university['authors']:
-        authors.append({
-            'id': author['id'],
-            'name': author['name'],
-            'affiliation': author['affiliation'],
-            'paperCount': author['paperCount']
-        })
+    author_rows = drilldown.author_rows(row, sort_key)
+    authors = drilldown.authors.rows(page(author_rows, descending, offset, limit))
     
     return {
         'university': {
@@ -201,279 +488,407 @@ async def get_university(country_id: str, university_id: str, year: Optional[int
             'name': university['name'],
             'country': country['name'],
             'paperCount': university['paperCount'],
-            'authors': authors
-        }
+            'authors': project(authors, parse_fields(fields))
+        },
+        'page': {'total': len(author_rows), 'offset': offset, 'limit': limit, 'sort': sort or DEFAULT_AUTHOR_SORT}
     }
 
 @api_router.get("/data/author/{country_id}/{university_id}/{author_id}")
-async def get_author(country_id: str, university_id: str, author_id: str, year: Optional[int] = None):
-    """Get papers for a specific author with optional year filter."""
-    data, stats = load_data(year_filter=year)
+async def get_author(
+    country_id: str,
+    university_id: str,
+    author_id: str,
+    year: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
+    sort: Optional[str] = None,
+    fields: Optional[str] = None,
+    entry: dict = Depends(dataset_ready)
+):
+    """Get papers for a specific author with optional year filter, paginated."""
+    drilldown = entry['indexes']['drilldown']
+    country_id = resolve_id(entry, 'country', country_id)
+    university_id = resolve_id(entry, 'university', university_id)
+    author_id = resolve_id(entry, 'author', author_id)
+    
+    if drilldown.country_row(country_id) is None:
+        raise HTTPException(status_code=404, detail="Country not found")
     
-    if data is None:
-        raise HTTPException(status_code=500, detail="Data not loaded")
+    if drilldown.university_row(country_id, university_id) is None:
+        raise HTTPException(status_code=404, detail="University not found")
     
-    # Find country, university, and author
-    country = None
-    for c in data:
-        if c['id'] == country_id:
-            country = c
-            break
+    row = drilldown.author_row(country_id, university_id, author_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Author not found")
+    author = drilldown.authors[row]
     
-    if not country:
-        raise HTTPException(status_code=404, detail="Country not found")
+    sort_spec = parse_sort(sort, PAPER_SORT_KEYS, DEFAULT_PAPER_SORT)
+    if sort_spec is None:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(PAPER_SORT_KEYS)}")
+    sort_key, descending = sort_spec
     
-    university = None
-    for uni in country['universities']:
-        if uni['id'] == university_id:
-            university = uni
-            break
+    keys = drilldown.paper_keys(row, sort_key)
+    papers = drilldown.papers.rows(page(keys, descending, offset, limit))
     
-    if not university:
-        raise HTTPException(status_code=404, detail="University not found")
+    return {
+        'author': {
+            **author,
+            'papers': project(papers, parse_fields(fields))
+        },
+        'page': {'total': len(keys), 'offset': offset, 'limit': limit, 'sort': sort or DEFAULT_PAPER_SORT}
+    }
+
+@api_router.get("/authors/{author_id}")
+async def get_author_profile(
+    author_id: str,
+    year: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
+    sort: Optional[str] = None,
+    fields: Optional[str] = None,
+    entry: dict = Depends(dataset_ready)
+):
+    """Get one author across all affiliations: merged affiliations, totals and unique papers, paginated."""
+    authors = entry['indexes']['authors']
+    
+    author_id = resolve_id(entry, 'author', author_id)
+    profile = authors.get(author_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Author not found")
     
-    author = None
-    for a in university['authors']:
-        if a['id'] == author_id:
-            author = a
-            break
+    sort_spec = parse_sort(sort, PAPER_SORT_KEYS, DEFAULT_PAPER_SORT)
+    if sort_spec is None:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(PAPER_SORT_KEYS)}")
+    sort_key, descending = sort_spec
     
-    if not author:
-        raise HTTPException(status_code=404, detail="Author not found")
+    keys = authors.paper_keys(author_id, sort_key)
+    papers = authors.paper_dicts(page(keys, descending, offset, limit))
     
-    return {'author': author}
+    return {
+        'author': {
+            **profile,
+            'papers': project(papers, parse_fields(fields))
+        },
+        'page': {'total': len(keys), 'offset': offset, 'limit': limit, 'sort': sort or DEFAULT_PAPER_SORT}
+    }
 
 @api_router.get("/search")
-async def search(q: Optional[str] = None, year: Optional[int] = None):
+async def search(q: Optional[str] = None, year: Optional[int] = None, entry: dict = Depends(dataset_ready)):
     """Search across all data."""
-    data, stats = load_data(year_filter=year)
+    drilldown = entry['indexes']['drilldown']
     
-    if data is None:
-        raise HTTPException(status_code=500, detail="Data not loaded")
+    def render():
+        return NegotiatedResponse({'countries': drilldown.tree()})
     
     # Note: Search filtering should be done on frontend for better performance
-    # This endpoint returns all data, frontend will filter
-    return {'countries': data}
+    # This endpoint returns all data, frontend will filter.
+    # Decoding and rendering the full tree is heavy, so it is bounded and kept off the event loop.
+    async with admission['search'].slot():
+        return await run_in_threadpool(render)
 
-@api_router.get("/export/papers")
-async def export_papers(year: Optional[int] = None):
-    """Export all paper titles to Excel."""
-    data, stats = load_data(year_filter=year)
-    
-    if data is None:
-        raise HTTPException(status_code=500, detail="Data not loaded")
-    
-    # Create workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Papers"
-    
-    # Headers
-    ws.append(["#", "Title", "Year", "Source", "Citations", "DOI", "Authors"])
-    
-    # Collect all unique papers
-    papers_dict = {}
-    for country in data:
-        for uni in country['universities']:
-            for author in uni['authors']:
-                for paper in author['papers']:
-                    if paper['id'] not in papers_dict:
-                        papers_dict[paper['id']] = paper
-    
-    # Add papers
-    for idx, (paper_id, paper) in enumerate(papers_dict.items(), 1):
-        ws.append([
-            idx,
-            paper['title'],
-            paper['year'],
-            paper['source'],
-            paper.get('cited_by', 0),
-            paper.get('doi', ''),
-            ', '.join(paper.get('authors', []))
-        ])
-    
-    # Adjust column widths
-    ws.column_dimensions['B'].width = 60
-    ws.column_dimensions['D'].width = 40
-    ws.column_dimensions['F'].width = 30
-    ws.column_dimensions['G'].width = 50
-    
-    # Save to BytesIO
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-    
-    filename = f"papers_export_{year if year else 'all_years'}.xlsx"
-    
-    return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
+@api_router.get("/suggest")
+async def suggest(
+    q: str = '',
+    year: Optional[int] = None,
+    limit: int = Query(5, ge=1, le=MAX_SUGGESTIONS),
+    kind: Optional[List[str]] = Query(None),
+    entry: dict = Depends(dataset_ready)
+):
+    """Get the top countries, universities, authors and paper titles with a word starting with q."""
+    kinds = kind or list(SUGGEST_KINDS)
+    if any(k not in SUGGEST_KINDS for k in kinds):
+        raise HTTPException(status_code=400, detail=f"kind must be one of {', '.join(SUGGEST_KINDS)}")
+    
+    index = entry['indexes']['suggest']
+    return {'query': q, **index.suggest(q, limit, kinds)}
 
-@api_router.get("/export/authors")
-async def export_authors(year: Optional[int] = None):
-    """Export all authors to Excel."""
-    data, stats = load_data(year_filter=year)
-    
-    if data is None:
-        raise HTTPException(status_code=500, detail="Data not loaded")
-    
-    # Create workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Authors"
+@api_router.get("/facets")
+async def get_facets(
+    year: Optional[int] = None,
+    document_type: Optional[List[str]] = Query(None),
+    source: Optional[List[str]] = Query(None),
+    min_citations: Optional[int] = None,
+    entry: dict = Depends(dataset_ready)
+):
+    """Get document type, source, citation and year facet counts for a filter."""
+    cube = entry['indexes']['facets']
+    facet_filter = FacetFilter(document_type, source, min_citations)
+    return {
+        'filters': facet_filter.to_dict(),
+        'facets': cube.facet_counts(facet_filter)
+    }
+
+@api_router.get("/collaborations")
+async def get_collaborations(
+    level: str = 'country',
+    top_k: Optional[int] = Query(100, ge=1),
+    min_weight: int = Query(1, ge=1),
+    entity_id: Optional[str] = None,
+    year: Optional[int] = None,
+    entry: dict = Depends(dataset_ready)
+):
+    """Get weighted co-authorship edges between countries or universities."""
+    if level not in ('country', 'university'):
+        raise HTTPException(status_code=400, detail="level must be 'country' or 'university'")
+    
+    graph = entry['indexes']['collaborations']
+    entity_id = resolve_id(entry, level, entity_id)
+    edges = graph.edges(level, top_k=top_k, min_weight=min_weight, entity_id=entity_id)
+    if edges is None:
+        raise HTTPException(status_code=404, detail=f"{level.capitalize()} not found")
     
-    # Headers
-    ws.append(["#", "Author Name", "Author ID", "Affiliation", "Country", "Paper Count"])
+    return {
+        'level': level,
+        'nodes': graph.nodes_for(level, edges),
+        'edges': edges,
+        'totalEdges': graph.edge_count(level)
+    }
+
+@api_router.get("/leaderboards/{kind}")
+async def get_leaderboard(
+    kind: str,
+    metric: str = 'citations',
+    limit: int = Query(10, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    year: Optional[int] = None,
+    entry: dict = Depends(dataset_ready)
+):
+    """Get the top countries, universities or authors by citations, h-index or paper count."""
+    if kind not in LEADERBOARD_KINDS:
+        raise HTTPException(status_code=404, detail="Leaderboard not found")
+    if metric not in LEADERBOARD_METRICS:
+        raise HTTPException(status_code=400, detail=f"metric must be one of {', '.join(LEADERBOARD_METRICS)}")
+    
+    boards = entry['indexes']['leaderboards']
+    return {
+        'kind': kind,
+        'metric': metric,
+        'total': boards.total(kind),
+        'entries': boards.top(kind, metric, limit=limit, offset=offset)
+    }
+
+@api_router.get("/leaderboards/{kind}/{entity_id}")
+async def get_leaderboard_entity(
+    kind: str,
+    entity_id: str,
+    papers: int = Query(10, ge=0, le=1000),
+    year: Optional[int] = None,
+    entry: dict = Depends(dataset_ready)
+):
+    """Get the metrics and most-cited papers of one country, university or author."""
+    if kind not in LEADERBOARD_KINDS:
+        raise HTTPException(status_code=404, detail="Leaderboard not found")
+    
+    boards = entry['indexes']['leaderboards']
+    entity_id = resolve_id(entry, kind, entity_id)
+    metrics = boards.entity(kind, entity_id)
+    if metrics is None:
+        raise HTTPException(status_code=404, detail=f"{kind.capitalize()} not found")
     
-    # Collect all unique authors
-    authors_dict = {}
-    for country in data:
-        for uni in country['universities']:
-            for author in uni['authors']:
-                if author['id'] not in authors_dict:
-                    authors_dict[author['id']] = {
-                        'name': author['name'],
-                        'id': author['id'],
-                        'affiliation': author['affiliation'],
-                        'country': country['name'],
-                        'paperCount': author['paperCount']
-                    }
-    
-    # Add authors
-    for idx, (author_id, author) in enumerate(authors_dict.items(), 1):
-        ws.append([
-            idx,
-            author['name'],
-            author['id'],
-            author['affiliation'],
-            author['country'],
-            author['paperCount']
-        ])
-    
-    # Adjust column widths
-    ws.column_dimensions['B'].width = 40
-    ws.column_dimensions['C'].width = 20
-    ws.column_dimensions['D'].width = 50
-    ws.column_dimensions['E'].width = 25
-    
-    # Save to BytesIO
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-    
-    filename = f"authors_export_{year if year else 'all_years'}.xlsx"
-    
-    return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
+    return {
+        **metrics,
+        'topPapers': boards.top_papers(kind, entity_id, limit=papers)
+    }
 
-@api_router.get("/export/countries")
-async def export_countries(year: Optional[int] = None):
-    """Export all countries to Excel."""
-    data, stats = load_data(year_filter=year)
+@api_router.get("/trends/{kind}/{entity_id}")
+async def get_trend(kind: str, entity_id: str, entry: dict = Depends(all_years_ready)):
+    """Get papers, citations and year-over-year growth per year for one country, university or author."""
+    if kind not in TREND_KINDS:
+        raise HTTPException(status_code=404, detail="Trend not found")
+    
+    trends = entry['indexes']['trends']
+    series = trends.series(kind, resolve_id(entry, kind, entity_id))
+    if series is None:
+        raise HTTPException(status_code=404, detail=f"{kind.capitalize()} not found")
+    return series
+
+@api_router.get("/groups/regions")
+async def get_regions():
+    """List the named regions available for group aggregation."""
+    return {
+        'regions': [
+            {'id': region_id, 'name': region['name'], 'countries': region['countries']}
+            for region_id, region in REGIONS.items()
+        ]
+    }
+
+@api_router.get("/groups/aggregate")
+async def aggregate_group(
+    countries: Optional[str] = None,
+    universities: Optional[str] = None,
+    authors: Optional[str] = None,
+    region: Optional[str] = None,
+    op: str = 'union',
+    year: Optional[int] = None,
+    entry: dict = Depends(dataset_ready)
+):
+    """Get exact unique paper and citation counts for a union or intersection of entities."""
+    if op not in ('union', 'intersection'):
+        raise HTTPException(status_code=400, detail="op must be 'union' or 'intersection'")
+    
+    country_ids = split_ids(countries)
+    if region:
+        named_region = get_region(region)
+        if not named_region:
+            raise HTTPException(status_code=404, detail="Region not found")
+        region_countries = [canonical_country_name(name) for name in named_region['countries']]
+    else:
+        region_countries = []
+    
+    university_ids = split_ids(universities)
+    author_ids = split_ids(authors)
+    if not (country_ids or region_countries or university_ids or author_ids):
+        raise HTTPException(status_code=400, detail="No countries, universities, authors or region given")
+    
+    index = entry['indexes']['papers']
+    ids = entry['indexes']['ids']
+    
+    # Legacy IDs resolve to current ones; region countries are matched by name
+    country_ids = [ids.resolve('country', cid) or cid for cid in country_ids]
+    country_ids += [ids.id_for('country', name) or compact_id(name) for name in region_countries]
+    requested = (
+        [('country', cid) for cid in dict.fromkeys(country_ids)] +
+        [('university', uid) for uid in dict.fromkeys(ids.resolve('university', u) or u for u in university_ids)] +
+        [('author', aid) for aid in dict.fromkeys(ids.resolve('author', a) or a for a in author_ids)]
+    )
     
-    if data is None:
-        raise HTTPException(status_code=500, detail="Data not loaded")
+    # Entities without papers in this year are reported, not treated as errors
+    members = []
+    missing = []
+    bitmaps = []
+    for kind, entity_id in requested:
+        bitmap = index.get(kind, entity_id)
+        if bitmap is None:
+            missing.append({'kind': kind, 'id': entity_id})
+            continue
+        bitmaps.append(bitmap)
+        members.append({'kind': kind, 'id': entity_id, 'paperCount': index.count(bitmap)})
+    
+    if op == 'intersection' and missing:
+        combined = index.intersection([])
+    elif op == 'intersection':
+        combined = index.intersection(bitmaps)
+    else:
+        combined = index.union(bitmaps)
     
-    # Create workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Countries"
-    
-    # Headers
-    ws.append(["#", "Country Name", "Paper Count", "Universities Count", "Latitude", "Longitude"])
-    
-    # Add countries
-    for idx, country in enumerate(data, 1):
-        ws.append([
-            idx,
-            country['name'],
-            country['paperCount'],
-            len(country['universities']),
-            country['lat'],
-            country['lng']
-        ])
-    
-    # Adjust column widths
-    ws.column_dimensions['B'].width = 30
-    
-    # Save to BytesIO
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-    
-    filename = f"countries_export_{year if year else 'all_years'}.xlsx"
-    
-    return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
+    return {
+        'op': op,
+        'region': region,
+        'paperCount': index.count(combined),
+        'citationCount': index.citation_count(combined),
+        'members': members,
+        'missing': missing
+    }
 
-@api_router.get("/export/universities")
-async def export_universities(year: Optional[int] = None):
-    """Export all universities to Excel."""
-    data, stats = load_data(year_filter=year)
-    
-    if data is None:
+def export_job_key(kind: str, year: Optional[int]):
+    """Dedupe key for an export: the same kind and year of the same dataset version."""
+    csv_path = get_csv_path()
+    if csv_path is None:
         raise HTTPException(status_code=500, detail="Data not loaded")
+    validate_year(csv_path, year)
+    return (kind, year or None, dataset_version(csv_path))
+
+
+def submit_export(kind: str, year: Optional[int]):
+    """Queue an export job (or find the identical one) without building anything on the event loop."""
+    if kind not in EXPORTS:
+        raise HTTPException(status_code=404, detail=f"Unknown export '{kind}'; expected one of {', '.join(EXPORTS)}")
+    
+    def run(path: str, progress):
+        # Runs in an export worker thread, including any dataset build
+        data, _ = load_data(year_filter=year)
+        if data is None:
+            raise RuntimeError("Data not loaded")
+        EXPORTS[kind](data, path, progress)
     
-    # Create workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Universities"
-    
-    # Headers
-    ws.append(["#", "University Name", "Country", "Paper Count", "Authors Count"])
-    
-    # Collect all universities
-    universities_list = []
-    for country in data:
-        for uni in country['universities']:
-            universities_list.append({
-                'name': uni['name'],
-                'country': country['name'],
-                'paperCount': uni['paperCount'],
-                'authorsCount': len(uni['authors'])
-            })
-    
-    # Sort by paper count
-    universities_list.sort(key=lambda x: x['paperCount'], reverse=True)
-    
-    # Add universities
-    for idx, uni in enumerate(universities_list, 1):
-        ws.append([
-            idx,
-            uni['name'],
-            uni['country'],
-            uni['paperCount'],
-            uni['authorsCount']
-        ])
-    
-    # Adjust column widths
-    ws.column_dimensions['B'].width = 60
-    ws.column_dimensions['C'].width = 25
-    
-    # Save to BytesIO
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-    
-    filename = f"universities_export_{year if year else 'all_years'}.xlsx"
-    
-    return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
+    try:
+        return export_queue.submit(kind, year, export_job_key(kind, year), export_filename(kind, year), run)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={'Retry-After': '5'})
+
+
+class ExportRequest(BaseModel):
+    kind: str
+    year: Optional[int] = None
+
+
+@api_router.post("/exports", status_code=202)
+async def create_export(request: ExportRequest):
+    """Start an export job, or return the identical job already queued, running or finished."""
+    job = submit_export(request.kind, request.year)
+    return job.to_dict(export_queue.ttl_seconds)
+
+@api_router.get("/exports/{job_id}")
+async def get_export(job_id: str):
+    """Get the status and progress of an export job."""
+    job = export_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export job not found or expired")
+    return job.to_dict(export_queue.ttl_seconds)
+
+@api_router.get("/exports/{job_id}/download")
+async def download_export(job_id: str):
+    """Download the artifact of a finished export job."""
+    job = export_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export job not found or expired")
+    if job.status != 'done':
+        raise HTTPException(status_code=409, detail=f"Export job is {job.status}")
+    return FileResponse(job.path, media_type=XLSX_MEDIA_TYPE, filename=job.filename)
+
+@api_router.get("/export/{kind}")
+async def export_inline(kind: str, year: Optional[int] = None):
+    """Export countries, universities, authors or papers to Excel in one request.
+    
+    Goes through the export job queue, so the event loop only awaits the job.
+    Prefer POST /api/exports for large datasets.
+    """
+    async with admission['export'].slot():
+        job = submit_export(kind, year)
+        await asyncio.wrap_future(job.future)
+    if job.status != 'done':
+        raise HTTPException(status_code=500, detail=f"Export failed: {job.error}")
+    return FileResponse(job.path, media_type=XLSX_MEDIA_TYPE, filename=job.filename)
 
 # Include the router in the main app
 app.include_router(api_router)
 
+@app.exception_handler(UnknownYearError)
+async def unknown_year_handler(request: Request, exc: UnknownYearError):
+    return JSONResponse(
+        status_code=404,
+        content={'detail': str(exc), 'availableYears': exc.years}
+    )
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    return JSONResponse(
+        status_code=429,
+        content={'detail': str(exc), 'routeClass': exc.route_class},
+        headers={'Retry-After': str(exc.retry_after)}
+    )
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition of ingest, cache and route metrics."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+# Compressed bodies of hot responses, reused until they age out
+compression_cache = DatasetCache(
+    'compressed',
+    max_entries=int(os.environ.get('COMPRESSION_CACHE_MAX_ENTRIES', '512')),
+    max_bytes=int(os.environ.get('COMPRESSION_CACHE_MAX_MB', '64')) * 1024 * 1024
+)
+app.add_middleware(CompressionMiddleware, cache=compression_cache)
+
+# Prebuilt artifacts from `python static_artifacts.py <dir>` answer matching
+# requests before any dataset is loaded; everything else is served dynamically
+if os.environ.get('STATIC_ARTIFACTS_DIR'):
+    app.add_middleware(StaticArtifactMiddleware, artifacts=StaticArtifacts(os.environ['STATIC_ARTIFACTS_DIR']))
+
+# Added last so it is outermost and records the bytes actually sent
+app.add_middleware(MetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -484,4 +899,6 @@ app.add_middleware(
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    if client is not None:
+        client.close()
+    export_queue.shutdown()
\ No newline at end of file
@@ -0,0 +1,283 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+import anyio
+
+from metrics import registry
+from negotiation import choose_format
+
+
+static_requests_total = registry.counter('static_artifact_requests_total', 'Requests answered from prebuilt artifacts')
+
+MANIFEST = 'manifest.json'
+CURRENT = 'CURRENT'
+
+
+def year_dir(year: Optional[int]) -> str:
+    return str(year) if year else 'all'
+
+
+def read_file(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def static_artifact():
+    """Endpoint name recorded in route metrics for requests served from prebuilt artifacts."""
+
+
+class StaticArtifacts:
+    """Serves a directory written by the build CLI in place of the matching API routes.
+
+    The root holds one directory per dataset version plus a CURRENT file
+    naming the live one, so a new build is switched in atomically. Each
+    version has a manifest mapping every prebuilt URL (per year filter) to
+    its file, media type and ETag. Only requests with no query parameters
+    other than 'year' are answered here; everything else, including legacy
+    IDs, falls through to the dynamic routes.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.loaded = (None, None)  # (CURRENT mtime, (version, routes))
+
+    def routes(self) -> Tuple[Optional[str], Dict]:
+        """(version, {year dir: {path: entry}}) of the live build, reloaded when CURRENT changes."""
+        current = os.path.join(self.root, CURRENT)
+        try:
+            mtime = os.path.getmtime(current)
+        except OSError:
+            return None, {}
+        if self.loaded[0] != mtime:
+            with open(current) as f:
+                version = f.read().strip()
+            with open(os.path.join(self.root, version, MANIFEST)) as f:
+                manifest = json.load(f)
+            self.loaded = (mtime, (version, manifest['routes']))
+        return self.loaded[1]
+
+    def lookup(self, path: str, query: Dict[str, List[str]]) -> Optional[Tuple[str, Dict]]:
+        """Get (file path, entry) for a request, or None if it isn't prebuilt."""
+        if set(query) - {'year'}:
+            return None
+        year = query.get('year', [None])[-1]
+        version, routes = self.routes()
+        entry = routes.get(year or 'all', {}).get(path)
+        if entry is None:
+            return None
+        return os.path.join(self.root, version, entry['file']), entry
+
+
+class StaticArtifactMiddleware:
+    """ASGI middleware answering prebuilt GET requests straight from disk, pre-compressed when accepted."""
+
+    def __init__(self, app, artifacts: StaticArtifacts):
+        self.app = app
+        self.artifacts = artifacts
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] not in ('GET', 'HEAD'):
+            await self.app(scope, receive, send)
+            return
+
+        # Artifacts are prebuilt as JSON; MessagePack clients get the dynamic route
+        headers = {k.lower(): v.decode('latin-1') for k, v in scope.get('headers', [])}
+        query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        found = self.artifacts.lookup(scope['path'], query)
+        if found is None or choose_format(headers.get(b'accept', '')) == 'msgpack':
+            await self.app(scope, receive, send)
+            return
+        file_path, entry = found
+
+        response_headers = [
+            (b'content-type', entry['mediaType'].encode('latin-1')),
+            (b'etag', entry['etag'].encode('latin-1')),
+            (b'cache-control', b'public, max-age=300'),
+            (b'vary', b'Accept, Accept-Encoding'),
+        ]
+        if entry.get('filename'):
+            response_headers.append((b'content-disposition', f'attachment; filename="{entry["filename"]}"'.encode('latin-1')))
+        scope['endpoint'] = static_artifact
+        static_requests_total.inc()
+
+        if headers.get(b'if-none-match') == entry['etag']:
+            await send({'type': 'http.response.start', 'status': 304, 'headers': response_headers})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        if entry.get('gzip') and 'gzip' in headers.get(b'accept-encoding', ''):
+            file_path = file_path + '.gz'
+            response_headers.append((b'content-encoding', b'gzip'))
+        if scope['method'] == 'HEAD':
+            size, body = os.path.getsize(file_path), b''
+        else:
+            # Exports run to several megabytes, so the file is read off the event loop
+            body = await anyio.to_thread.run_sync(read_file, file_path)
+            size = len(body)
+        response_headers.append((b'content-length', str(size).encode('latin-1')))
+        await send({'type': 'http.response.start', 'status': 200, 'headers': response_headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+
+async def fetch(app, path: str, query: str = '') -> Tuple[int, Dict[str, str], bytes]:
+    """Run one GET request through the ASGI app in process, uncompressed."""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode('utf-8'), 'root_path': '',
+        'query_string': query.encode('latin-1'),
+        'headers': [(b'host', b'localhost'), (b'accept-encoding', b'identity')],
+        'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+    }
+    received = {'status': 500, 'headers': {}, 'body': []}
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            received['status'] = message['status']
+            received['headers'] = {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in message['headers']}
+        elif message['type'] == 'http.response.body':
+            received['body'].append(message.get('body', b''))
+
+    await app(scope, receive, send)
+    return received['status'], received['headers'], b''.join(received['body'])
+
+
+class ArtifactWriter:
+    """Writes files of one build and records the route each one answers."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.routes = {}
+        self.files = 0
+        self.bytes = 0
+
+    def write(self, year: Optional[int], url: str, body: bytes, media_type: str,
+              extension: str = '.json', compress: bool = True, filename: Optional[str] = None):
+        name = url.lstrip('/')
+        if not os.path.splitext(name)[1]:
+            name += extension
+        relative = os.path.join(year_dir(year), name)
+        path = os.path.join(self.directory, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(body)
+        if compress:
+            with open(path + '.gz', 'wb') as f:
+                f.write(gzip.compress(body, compresslevel=9, mtime=0))
+        self.routes.setdefault(year_dir(year), {})[url] = {
+            'file': relative,
+            'mediaType': media_type,
+            'etag': '"' + hashlib.sha1(body).hexdigest()[:20] + '"',
+            'gzip': compress
+        }
+        if filename:
+            self.routes[year_dir(year)][url]['filename'] = filename
+        self.files += 1
+        self.bytes += len(body)
+
+
+async def build_year(app, writer: ArtifactWriter, year: Optional[int]):
+    """Write the stats, map layer, country list, drill-down documents and exports of one year filter."""
+    import server
+    from exports import EXPORTS, XLSX_MEDIA_TYPE, export_filename
+
+    query = f'year={year}' if year else ''
+
+    async def save(url: str):
+        status, headers, body = await fetch(app, url, query)
+        if status != 200:
+            raise RuntimeError(f"{url}?{query} returned {status}")
+        writer.write(year, url, body, headers.get('content-type', 'application/json'))
+        return body
+
+    await save('/api/stats')
+    await save('/api/map/countries.geojson')
+    countries = json.loads(await save('/api/data/countries'))['countries']
+    for country in countries:
+        document = json.loads(await save(f"/api/data/country/{country['id']}"))
+        for uni in document['country']['universities']:
+            await save(f"/api/data/university/{country['id']}/{uni['id']}")
+
+    data, _ = server.load_data(year_filter=year)
+    workbook = os.path.join(writer.directory, '.workbook.xlsx')
+    for kind, export in EXPORTS.items():
+        export(data, workbook)
+        with open(workbook, 'rb') as f:
+            # Workbooks are zip files already
+            writer.write(year, f'/api/export/{kind}', f.read(), XLSX_MEDIA_TYPE,
+                         extension='.xlsx', compress=False, filename=export_filename(kind, year))
+    os.remove(workbook)
+
+
+def build(output: str, years: Optional[List[int]] = None) -> str:
+    """Build every artifact into a new version directory under output and make it current."""
+    import asyncio
+    import server
+    from data_cleaner import read_years
+    from dataset_manifest import dataset_version, source_paths
+
+    csv_path = server.get_csv_path()
+    if csv_path is None:
+        raise FileNotFoundError("No dataset source found")
+    if not years:
+        years = [None] + sorted(read_years(csv_path))
+
+    version = hashlib.sha1(repr((dataset_version(csv_path), server.affiliation_mode)).encode('utf-8')).hexdigest()[:16]
+    os.makedirs(output, exist_ok=True)
+    staging = os.path.join(output, f'.{version}.{os.getpid()}.tmp')
+    shutil.rmtree(staging, ignore_errors=True)
+    writer = ArtifactWriter(staging)
+
+    # The dynamic app renders each document, so static bodies match the API byte for byte
+    app = server.app
+    start = time.perf_counter()
+    for year in years:
+        asyncio.run(build_year(app, writer, year))
+        print(f"Built artifacts for {year_dir(year)}: {writer.files} files so far")
+
+    with open(os.path.join(staging, MANIFEST), 'w') as f:
+        json.dump({
+            'version': version,
+            'builtAt': time.time(),
+            'sources': source_paths(csv_path),
+            'affiliationMode': server.affiliation_mode,
+            'years': [year_dir(year) for year in years],
+            'routes': writer.routes
+        }, f)
+
+    final = os.path.join(output, version)
+    shutil.rmtree(final, ignore_errors=True)
+    os.replace(staging, final)
+    current_tmp = os.path.join(output, f'.{CURRENT}.tmp')
+    with open(current_tmp, 'w') as f:
+        f.write(version)
+    os.replace(current_tmp, os.path.join(output, CURRENT))
+    print(f"Wrote {writer.files} artifacts ({writer.bytes / 1e6:.1f} MB) to {final} "
+          f"in {time.perf_counter() - start:.1f}s")
+    return final
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Prebuild API artifacts for static serving.")
+    parser.add_argument('output', help="directory to write versioned builds into (serve with STATIC_ARTIFACTS_DIR)")
+    parser.add_argument('--source', help="CSV file, directory or glob (defaults to the server's dataset)")
+    parser.add_argument('--year', type=int, action='append', dest='years', help="only build these years")
+    args = parser.parse_args()
+    if args.source:
+        os.environ['DATA_SOURCES'] = args.source
+    # Building must not be answered from an older build
+    os.environ.pop('STATIC_ARTIFACTS_DIR', None)
+    try:
+        build(args.output, args.years)
+    except FileNotFoundError as e:
+        sys.exit(str(e))
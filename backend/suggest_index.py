@@ -0,0 +1,164 @@
+import re
+import unicodedata
+from typing import Dict, List
+
+import numpy as np
+
+from flat_tables import RaggedArray, RecordTable, StringKeys
+
+
+SUGGEST_KINDS = ('countries', 'universities', 'authors', 'papers')
+MAX_SUGGESTIONS = 20
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents and punctuation, and collapse whitespace."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(' ', text.casefold()).strip()
+
+
+class PrefixTable:
+    """Word index over the names of one kind of suggestion.
+
+    Names are stored once, as word ids into a sorted vocabulary laid out
+    name after name, plus a posting list of (row, word position) per word
+    sorted by word. Everything grows with the number of words, and every
+    vocabulary prefix is a contiguous range of word ids. The vocabulary,
+    entries and precomputed prefixes are flat arrays, so a mapped snapshot
+    shares them between workers.
+
+    A prefix matches a name when its words appear consecutively in the
+    name, the last one possibly unfinished ("asia pac" matches "Asia Pacific
+    University"). A lookup anchors on the prefix word with the fewest
+    postings and checks the other words of each candidate by reading the
+    word ids at the neighbouring positions, all as array operations. Top
+    entries for every one and two character prefix, the largest blocks, are
+    ranked once at load time.
+    """
+
+    def __init__(self, entries: List[Dict], names: List[str], ranks: List[int]):
+        self.entries = RecordTable(entries)
+        self.ranks = np.array(ranks, dtype=np.int64)
+        names = [normalize(name).split() for name in names]
+
+        vocabulary = sorted({word for words in names for word in words})
+        word_ids = {word: i for i, word in enumerate(vocabulary)}
+        # Normalized words are ASCII, so byte order is word order
+        self.vocabulary = np.array([word.encode('ascii') for word in vocabulary], dtype=bytes)
+        if not vocabulary:
+            self.vocabulary = np.zeros(0, dtype='S1')
+        self.lengths = np.array([len(words) for words in names], dtype=np.int64)
+        self.offsets = np.concatenate(([0], np.cumsum(self.lengths)))
+        self.name_words = np.array([word_ids[word] for words in names for word in words], dtype=np.int32)
+
+        # Postings sorted by word id, with each word's block start
+        order = np.argsort(self.name_words, kind='stable')
+        self.rows = np.repeat(np.arange(len(names), dtype=np.int32), self.lengths)[order]
+        self.positions = (np.arange(len(self.name_words)) - np.repeat(self.offsets[:-1], self.lengths))[order].astype(np.int32)
+        self.word_starts = np.searchsorted(self.name_words[order], np.arange(len(self.vocabulary) + 1))
+
+        prefixes = sorted({word[:n] for word in vocabulary for n in (1, 2)})
+        top = []
+        for prefix in prefixes:
+            lo, hi = self._word_range(prefix, True)
+            rows = np.unique(self.rows[self.word_starts[lo]:self.word_starts[hi]])
+            top.append(self._ranked(rows)[:MAX_SUGGESTIONS])
+        self.top_prefixes = StringKeys(prefixes)
+        self.top = RaggedArray(top)
+
+    def _word_range(self, word: str, partial: bool):
+        """Word ids equal to a word, or starting with it if partial."""
+        needle = word.encode('ascii')
+        lo = int(np.searchsorted(self.vocabulary, needle))
+        if partial:
+            return lo, int(np.searchsorted(self.vocabulary, needle + b'\xff'))
+        return lo, int(np.searchsorted(self.vocabulary, needle, side='right'))
+
+    def _ranked(self, rows: np.ndarray) -> List[int]:
+        # Highest rank first, ties in load order
+        return rows[np.argsort(-self.ranks[rows], kind='stable')].tolist()
+
+    def lookup(self, prefix: str, limit: int) -> List[Dict]:
+        """Best-ranked entries whose name contains an already normalized prefix at a word start."""
+        words = prefix.split()
+        if len(words) == 1 and len(prefix) <= 2:
+            row = self.top_prefixes.find(prefix)
+            return [] if row is None else self.entries.rows(self.top[row][:limit])
+
+        # Anchor on the word with the fewest postings; only the last may be unfinished
+        ranges = [self._word_range(word, i == len(words) - 1) for i, word in enumerate(words)]
+        anchor = min(range(len(words)), key=lambda i: self.word_starts[ranges[i][1]] - self.word_starts[ranges[i][0]])
+        lo, hi = ranges[anchor]
+        block = slice(self.word_starts[lo], self.word_starts[hi])
+        rows = self.rows[block]
+        starts = self.positions[block].astype(np.int64) - anchor
+
+        for i, (word_lo, word_hi) in enumerate(ranges):
+            if i == anchor or not len(rows):
+                continue
+            positions = starts + i
+            inside = (positions >= 0) & (positions < self.lengths[rows])
+            ids = self.name_words[np.where(inside, self.offsets[rows] + positions, 0)]
+            keep = inside & (ids >= word_lo) & (ids < word_hi)
+            rows, starts = rows[keep], starts[keep]
+
+        return self.entries.rows(self._ranked(np.unique(rows))[:limit])
+
+
+class SuggestIndex:
+    """Type-ahead suggestions for countries, universities, authors and paper titles.
+
+    Entities are ranked by paper count and papers by citations, so the
+    names people are most likely looking for come first.
+    """
+
+    def __init__(self, data: List[Dict], papers: List[Dict], ids, entity_papers: Dict[str, List[np.ndarray]]):
+        """papers are in integer key order; entity_papers holds each entity's paper keys by entity key."""
+        def paper_count(kind: str, entity_id: str) -> int:
+            return len(entity_papers[kind][ids.key(kind, entity_id)])
+
+        countries, universities, authors = {}, {}, {}
+        for country in data:
+            countries[country['id']] = {'id': country['id'], 'name': country['name'], 'paperCount': country['paperCount']}
+            for uni in country['universities']:
+                universities.setdefault(uni['id'], {
+                    'id': uni['id'],
+                    'name': uni['name'],
+                    'countryId': country['id'],
+                    'country': country['name'],
+                    'paperCount': paper_count('university', uni['id'])
+                })
+                for author in uni['authors']:
+                    authors.setdefault(author['id'], {
+                        'id': author['id'],
+                        'name': author['name'],
+                        'paperCount': paper_count('author', author['id'])
+                    })
+
+        paper_entries = [
+            {'id': paper['id'], 'title': paper['title'], 'year': paper.get('year'), 'citations': paper.get('cited_by') or 0}
+            for paper in papers if paper.get('title')
+        ]
+
+        self.tables = {}
+        for kind, entries in (('countries', countries), ('universities', universities), ('authors', authors)):
+            entries = list(entries.values())
+            self.tables[kind] = PrefixTable(entries, [e['name'] for e in entries], [e['paperCount'] for e in entries])
+        self.tables['papers'] = PrefixTable(
+            paper_entries, [p['title'] for p in paper_entries], [p['citations'] for p in paper_entries]
+        )
+
+    @classmethod
+    def from_processor(cls, processor) -> 'SuggestIndex':
+        """Build the index from a processed CSVProcessor."""
+        return cls(processor.get_processed_data() or [], processor.paper_list(), processor.ids, processor.entity_papers)
+
+    def suggest(self, prefix: str, limit: int = 5, kinds=SUGGEST_KINDS) -> Dict[str, List[Dict]]:
+        """Top suggestions per kind for a typed prefix; an empty prefix matches nothing."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return {kind: [] for kind in kinds}
+        return {kind: self.tables[kind].lookup(prefix, limit) for kind in kinds}
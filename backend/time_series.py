@@ -0,0 +1,78 @@
+import numpy as np
+from typing import Dict, List, Optional
+
+
+TREND_KINDS = ('country', 'university', 'author')
+
+
+def growth_rates(values: np.ndarray) -> List[Optional[float]]:
+    """Year-over-year growth as a fraction; None where the previous year is zero."""
+    rates = [None]
+    for prev, cur in zip(values[:-1], values[1:]):
+        rates.append(round(float(cur - prev) / float(prev), 4) if prev else None)
+    return rates
+
+
+class YearSeries:
+    """Papers and citations per year for every country, university and author.
+
+    Built once from the all-years dataset as dense entity × year arrays, so
+    a trend for any entity is one row lookup instead of a dataset build per
+    year. Years run contiguously from the first to the last in the dataset,
+    with zeros for years an entity has no papers. Citations are those of the
+    papers published in each year.
+    """
+
+    def __init__(self, papers: List[Dict], ids, incidence: Dict[str, tuple]):
+        """papers are in integer key order; incidence maps a kind to (entity key, paper key) arrays."""
+        self.ids = ids
+        paper_years = np.array([paper.get('year', 0) or 0 for paper in papers], dtype=np.int64)
+        known = paper_years[paper_years > 0]
+        first, last = (int(known.min()), int(known.max())) if len(known) else (0, -1)
+        self.years = list(range(first, last + 1))
+
+        # Papers without a year are left out of every series
+        year_codes = np.where(paper_years > 0, paper_years - first, -1)
+        citations = np.array([paper.get('cited_by') or 0 for paper in papers], dtype=np.int64)
+
+        n_years = len(self.years)
+        self.kinds = {}
+        for kind in TREND_KINDS:
+            rows, cols = incidence[kind]
+            n_entities = ids.count(kind)
+            codes = year_codes[cols]
+            dated = codes >= 0
+            cells = rows[dated] * n_years + codes[dated]
+            size = n_entities * n_years
+            self.kinds[kind] = {
+                'papers': np.bincount(cells, minlength=size).astype(np.int32).reshape(n_entities, n_years),
+                'citations': np.bincount(cells, weights=citations[cols][dated], minlength=size)
+                .astype(np.int64).reshape(n_entities, n_years)
+            }
+
+    @classmethod
+    def from_processor(cls, processor) -> 'YearSeries':
+        """Build the series from a processed CSVProcessor."""
+        return cls(
+            processor.paper_list(), processor.ids,
+            {kind: processor.incidence(kind) for kind in TREND_KINDS}
+        )
+
+    def series(self, kind: str, entity_id: str) -> Optional[Dict]:
+        """Get the yearly counts and growth of one entity, or None if it is unknown."""
+        row = self.ids.key(kind, entity_id)
+        if row is None:
+            return None
+        papers = self.kinds[kind]['papers'][row]
+        citations = self.kinds[kind]['citations'][row]
+        return {
+            'kind': kind,
+            'id': entity_id,
+            'years': self.years,
+            'papers': papers.tolist(),
+            'citations': citations.tolist(),
+            'paperGrowth': growth_rates(papers),
+            'citationGrowth': growth_rates(citations),
+            'totalPapers': int(papers.sum()),
+            'totalCitations': int(citations.sum())
+        }
@@ -87,15 +87,10 @@ function App() {
 
   const handleAuthorClick = async (author) => {
     try {
-      // Fetch full author data with papers
+      // Fetch the author's profile with papers from all affiliations
       const yearParam = appliedYearFilter !== 'all' ? parseInt(appliedYearFilter) : null;
-      const fullAuthor = await ApiService.getAuthor(
-        selectedCountry.id, 
-        selectedUniversity.id, 
-        author.id,
-        yearParam
-      );
-      setSelectedAuthor(fullAuthor);
+      const profile = await ApiService.getAuthorProfile(author.id, yearParam);
+      setSelectedAuthor({...author, ...profile});
     } catch (err) {
       console.error('Error loading author:', err);
     }
@@ -9,14 +9,50 @@ import {
   SelectTrigger,
   SelectValue,
 } from './ui/select';
+import ApiService from '../services/api';
 
 const YEARS = [2021, 2022, 2023, 2024, 2025];
 
-const BACKEND_URL = process.env.REACT_APP_BACKEND_URL || '';
-const API_BASE = BACKEND_URL ? `${BACKEND_URL}/api` : '/api';
+const EXPORT_POLL_MS = 1000;
+
+const SUGGEST_DEBOUNCE_MS = 150;
+
+const SUGGESTION_GROUPS = [
+  { kind: 'countries', icon: Globe, label: (s) => s.name },
+  { kind: 'universities', icon: Building2, label: (s) => s.name },
+  { kind: 'authors', icon: User, label: (s) => s.name },
+  { kind: 'papers', icon: FileText, label: (s) => s.title },
+];
 
 const Header = ({ searchTerm, yearFilter, onSearchChange, onYearChange, onApplyFilters, onClearFilters, stats }) => {
   const [showExportMenu, setShowExportMenu] = useState(false);
+  const [exporting, setExporting] = useState(null);
+  const [suggestions, setSuggestions] = useState(null);
+  const [showSuggestions, setShowSuggestions] = useState(false);
+  
+  // Type-ahead suggestions for the search box, debounced per keystroke
+  useEffect(() => {
+    const term = (searchTerm || '').trim();
+    if (!term) {
+      setSuggestions(null);
+      return undefined;
+    }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const result = await ApiService.suggest(term, yearFilter !== 'all' ? parseInt(yearFilter) : null);
+        if (!cancelled) setSuggestions(result);
+      } catch (error) {
+        if (!cancelled) setSuggestions(null);
+      }
+    }, SUGGEST_DEBOUNCE_MS);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [searchTerm, yearFilter]);
+  
+  const hasSuggestions = suggestions && SUGGESTION_GROUPS.some(({ kind }) => suggestions[kind]?.length);
   
   // Close menu when clicking outside
   useEffect(() => {
@@ -30,19 +66,32 @@ const Header = ({ searchTerm, yearFilter, onSearchChange, onYearChange, onApplyF
     return () => document.removeEventListener('click', handleClickOutside);
   }, [showExportMenu]);
   
-  const handleExport = (type) => {
-    const yearParam = yearFilter !== 'all' ? `?year=${yearFilter}` : '';
-    const url = `${API_BASE}/export/${type}${yearParam}`;
-    
-    // Create a temporary anchor element to trigger download
-    const link = document.createElement('a');
-    link.href = url;
-    link.download = `${type}_export_${yearFilter !== 'all' ? yearFilter : 'all_years'}.xlsx`;
-    document.body.appendChild(link);
-    link.click();
-    document.body.removeChild(link);
-    
+  const handleExport = async (type) => {
     setShowExportMenu(false);
+    setExporting(type);
+    try {
+      // Exports run as background jobs; poll until the file is ready
+      let job = await ApiService.createExport(type, yearFilter !== 'all' ? parseInt(yearFilter) : null);
+      while (job.status === 'queued' || job.status === 'running') {
+        await new Promise(resolve => setTimeout(resolve, EXPORT_POLL_MS));
+        job = await ApiService.getExport(job.id);
+      }
+      if (job.status !== 'done') {
+        throw new Error(job.error || 'Export failed');
+      }
+      
+      // Create a temporary anchor element to trigger download
+      const link = document.createElement('a');
+      link.href = ApiService.exportDownloadUrl(job);
+      link.download = `${type}_export_${yearFilter !== 'all' ? yearFilter : 'all_years'}.xlsx`;
+      document.body.appendChild(link);
+      link.click();
+      document.body.removeChild(link);
+    } catch (error) {
+      console.error('Error exporting data:', error);
+    } finally {
+      setExporting(null);
+    }
   };
 
   return (
@@ -62,10 +111,11 @@ const Header = ({ searchTerm, yearFilter, onSearchChange, onYearChange, onApplyF
           <div className="relative export-menu-container">
             <Button 
               onClick={() => setShowExportMenu(!showExportMenu)}
+              disabled={exporting !== null}
               className="bg-white text-cyan-600 hover:bg-cyan-50"
             >
               <Download className="w-4 h-4 mr-2" />
-              Export Data
+              {exporting ? `Exporting ${exporting}...` : 'Export Data'}
             </Button>
             
             {showExportMenu && (
@@ -152,9 +202,38 @@ const Header = ({ searchTerm, yearFilter, onSearchChange, onYearChange, onApplyF
               type="text"
               placeholder="Search country, university, author, or paper title..."
               value={searchTerm}
-              onChange={(e) => onSearchChange(e.target.value)}
+              onChange={(e) => {
+                onSearchChange(e.target.value);
+                setShowSuggestions(true);
+              }}
+              onFocus={() => setShowSuggestions(true)}
+              onBlur={() => setShowSuggestions(false)}
               className="pl-10 bg-white border-0 shadow-md h-11"
             />
+            {showSuggestions && hasSuggestions && (
+              <div className="absolute left-0 right-0 top-full mt-1 bg-white rounded-lg shadow-lg z-[2000] max-h-96 overflow-y-auto">
+                {SUGGESTION_GROUPS.map(({ kind, icon: Icon, label }) => (
+                  (suggestions[kind] || []).map(suggestion => (
+                    <button
+                      key={`${kind}-${suggestion.id}`}
+                      type="button"
+                      onMouseDown={(e) => e.preventDefault()}
+                      onClick={() => {
+                        onSearchChange(label(suggestion));
+                        setShowSuggestions(false);
+                      }}
+                      className="w-full flex items-center gap-2 px-3 py-2 text-left text-sm text-gray-700 hover:bg-cyan-50"
+                    >
+                      <Icon className="w-4 h-4 text-cyan-600 flex-shrink-0" />
+                      <span className="truncate">{label(suggestion)}</span>
+                      <span className="ml-auto text-xs text-gray-400 flex-shrink-0">
+                        {kind === 'papers' ? `${suggestion.citations} citations` : `${suggestion.paperCount} papers`}
+                      </span>
+                    </button>
+                  ))
+                ))}
+              </div>
+            )}
           </div>
 
           <div className="flex items-center gap-2 bg-white rounded-lg shadow-md px-3 py-2">
@@ -101,7 +101,7 @@ const MapView = ({ onCountryClick, selectedCountry, searchTerm, yearFilter }) =>
       try {
         setLoading(true);
         const yearParam = yearFilter !== 'all' ? parseInt(yearFilter) : null;
-        const data = await ApiService.getCountries(yearParam);
+        const data = await ApiService.getCountryLayer(yearParam);
         setCountries(data);
         setFilteredCountries(data);
       } catch (err) {
@@ -28,6 +28,23 @@ class ApiService {
     }
   }
 
+  async getCountryLayer(year = null) {
+    try {
+      const params = year ? { year } : {};
+      const response = await axios.get(`${API_BASE}/map/countries.geojson`, { params });
+      return response.data.features.map(feature => ({
+        id: feature.id,
+        name: feature.properties.name,
+        lat: feature.geometry.coordinates[1],
+        lng: feature.geometry.coordinates[0],
+        paperCount: feature.properties.paperCount
+      }));
+    } catch (error) {
+      console.error('Error fetching country map layer:', error);
+      throw error;
+    }
+  }
+
   async getCountry(countryId, year = null) {
     try {
       const params = year ? { year } : {};
@@ -61,6 +78,27 @@ class ApiService {
     }
   }
 
+  async getTrend(kind, entityId) {
+    try {
+      const response = await axios.get(`${API_BASE}/trends/${kind}/${entityId}`);
+      return response.data;
+    } catch (error) {
+      console.error('Error fetching trend:', error);
+      throw error;
+    }
+  }
+
+  async getAuthorProfile(authorId, year = null) {
+    try {
+      const params = year ? { year } : {};
+      const response = await axios.get(`${API_BASE}/authors/${authorId}`, { params });
+      return response.data.author;
+    } catch (error) {
+      console.error('Error fetching author profile:', error);
+      throw error;
+    }
+  }
+
   async search(query, year) {
     try {
       const params = {};
@@ -74,6 +112,43 @@ class ApiService {
       throw error;
     }
   }
+
+  async suggest(query, year = null, limit = 5) {
+    try {
+      const params = { q: query, limit };
+      if (year) params.year = year;
+      
+      const response = await axios.get(`${API_BASE}/suggest`, { params });
+      return response.data;
+    } catch (error) {
+      console.error('Error fetching suggestions:', error);
+      throw error;
+    }
+  }
+
+  async createExport(kind, year = null) {
+    try {
+      const response = await axios.post(`${API_BASE}/exports`, { kind, year });
+      return response.data;
+    } catch (error) {
+      console.error('Error creating export:', error);
+      throw error;
+    }
+  }
+
+  async getExport(jobId) {
+    try {
+      const response = await axios.get(`${API_BASE}/exports/${jobId}`);
+      return response.data;
+    } catch (error) {
+      console.error('Error fetching export status:', error);
+      throw error;
+    }
+  }
+
+  exportDownloadUrl(job) {
+    return `${BACKEND_URL}${job.downloadUrl}`;
+  }
 }
 
 export default new ApiService();
@@ -0,0 +1,64 @@
+"""Minimal in-process ASGI client.
+
+Calls the FastAPI app directly, without sockets or extra dependencies, so
+route timings only include the application's own work.
+"""
+import asyncio
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+
+
+class ASGIResponse:
+    def __init__(self, status: int, headers: List[Tuple[bytes, bytes]], body: bytes):
+        self.status = status
+        self.headers = {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in headers}
+        self.body = body
+
+
+async def asgi_request(app, url: str, method: str = 'GET', headers: Dict[str, str] = None,
+                       body: bytes = b'') -> ASGIResponse:
+    """Send one HTTP request to an ASGI app and collect the full response."""
+    parts = urlsplit(url)
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': parts.path,
+        'raw_path': parts.path.encode(),
+        'root_path': '',
+        'query_string': parts.query.encode(),
+        'headers': [(b'host', b'benchmark')] + [
+            (k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in (headers or {}).items()
+        ],
+        'client': ('127.0.0.1', 0),
+        'server': ('benchmark', 80),
+    }
+
+    request_sent = False
+    response_done = asyncio.Event()
+    start = {}
+    chunks = []
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        # Streaming responses listen for a disconnect until the body is sent
+        await response_done.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            start['status'] = message['status']
+            start['headers'] = message.get('headers', [])
+        elif message['type'] == 'http.response.body':
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body', False):
+                response_done.set()
+
+    await app(scope, receive, send)
+    response_done.set()
+    return ASGIResponse(start.get('status', 500), start.get('headers', []), b''.join(chunks))
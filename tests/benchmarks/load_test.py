@@ -0,0 +1,318 @@
+"""Concurrent load test for the API with per-route latency percentiles.
+
+Drives a realistic mix of map loads, drill-downs, author views, searches and
+exports at a fixed concurrency, either in-process through the ASGI app (one
+event loop, the same contention a single uvicorn worker sees) or against a
+running server over HTTP.
+
+Usage:
+    # In-process against a synthetic dataset, warm caches
+    python -m tests.benchmarks.load_test --papers 5000 --requests 2000 --concurrency 32
+
+    # Cold-cache stampede: caches cleared right before traffic starts
+    python -m tests.benchmarks.load_test --papers 5000 --cold --years all:1,2021:1,2022:1,2023:1,2024:1,2025:1
+
+    # Against a local uvicorn (start it fresh for a cold run)
+    python -m tests.benchmarks.load_test --url http://127.0.0.1:8001 --requests 5000 --concurrency 64
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / 'backend'
+sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'benchmark')
+
+from tests.benchmarks.asgi_client import asgi_request  # noqa: E402
+from tests.benchmarks.synthetic_scopus import write_synthetic_csv  # noqa: E402
+
+
+# Scenario -> relative weight in the traffic mix
+DEFAULT_MIX = {
+    'map': 40,
+    'country': 20,
+    'university': 12,
+    'author': 12,
+    'search': 6,
+    'leaderboard': 5,
+    'export': 5,
+}
+
+EXPORT_ROUTES = ['/api/export/papers', '/api/export/authors', '/api/export/countries', '/api/export/universities']
+
+
+def parse_weights(spec: str) -> dict:
+    """Parse 'a:3,b:1' into {'a': 3.0, 'b': 1.0}."""
+    weights = {}
+    for part in spec.split(','):
+        if not part.strip():
+            continue
+        key, _, weight = part.partition(':')
+        weights[key.strip()] = float(weight or 1)
+    return weights
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+class InProcessTarget:
+    """Send requests straight into the ASGI app on the current event loop."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def get(self, url: str):
+        response = await asgi_request(self.app, url)
+        return response.status, response.body
+
+    def close(self):
+        pass
+
+
+class HTTPTarget:
+    """Send requests to a running server from a thread pool (stdlib only)."""
+
+    def __init__(self, base_url: str, concurrency: int):
+        self.base_url = base_url.rstrip('/')
+        self.pool = ThreadPoolExecutor(max_workers=concurrency)
+
+    def _fetch(self, url: str):
+        try:
+            with urllib.request.urlopen(self.base_url + url, timeout=300) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    async def get(self, url: str):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, self._fetch, url)
+
+    def close(self):
+        self.pool.shutdown(wait=False)
+
+
+def with_year(url: str, year) -> str:
+    if year == 'all':
+        return url
+    return f"{url}{'&' if '?' in url else '?'}year={year}"
+
+
+async def discover(target, years: list, sample: int) -> dict:
+    """Collect real country, university and author IDs for every year in the mix."""
+    entities = {}
+    for year in years:
+        status, body = await target.get(with_year('/api/data/countries', year))
+        if status != 200:
+            raise RuntimeError(f"Could not list countries for year={year}: HTTP {status}")
+        countries = [c['id'] for c in json.loads(body)['countries'][:sample]]
+
+        universities, authors = [], []
+        for country_id in countries[:max(1, sample // 4)]:
+            status, body = await target.get(with_year(f'/api/data/country/{country_id}?limit={sample}', year))
+            if status != 200:
+                continue
+            for uni in json.loads(body)['country']['universities'][:4]:
+                universities.append((country_id, uni['id']))
+
+        for country_id, uni_id in universities[:sample]:
+            status, body = await target.get(with_year(f'/api/data/university/{country_id}/{uni_id}?limit=4', year))
+            if status != 200:
+                continue
+            for author in json.loads(body)['university']['authors']:
+                authors.append((country_id, uni_id, author['id']))
+
+        entities[year] = {'countries': countries, 'universities': universities, 'authors': authors}
+    return entities
+
+
+def build_plan(n_requests: int, mix: dict, years: dict, entities: dict, seed: int) -> list:
+    """Pre-generate the (scenario, url) sequence so runs are reproducible."""
+    rng = random.Random(seed)
+    scenarios = list(mix)
+    scenario_weights = [mix[s] for s in scenarios]
+    year_keys = list(years)
+    year_weights = [years[y] for y in year_keys]
+
+    plan = []
+    while len(plan) < n_requests:
+        scenario = rng.choices(scenarios, weights=scenario_weights)[0]
+        year = rng.choices(year_keys, weights=year_weights)[0]
+        found = entities[year]
+
+        if scenario == 'map':
+            # A map load is the stats call plus the country layer
+            plan.append(('map:stats', with_year('/api/stats', year)))
+            url, scenario = with_year('/api/data/countries', year), 'map:countries'
+        elif scenario == 'country' and found['countries']:
+            url = with_year(f"/api/data/country/{rng.choice(found['countries'])}", year)
+        elif scenario == 'university' and found['universities']:
+            country_id, uni_id = rng.choice(found['universities'])
+            url = with_year(f'/api/data/university/{country_id}/{uni_id}', year)
+        elif scenario == 'author' and found['authors']:
+            country_id, uni_id, author_id = rng.choice(found['authors'])
+            url = with_year(f'/api/data/author/{country_id}/{uni_id}/{author_id}', year)
+        elif scenario == 'search':
+            url = with_year('/api/search', year)
+        elif scenario == 'leaderboard':
+            url = with_year(f"/api/leaderboards/{rng.choice(['country', 'university', 'author'])}?limit=20", year)
+        elif scenario == 'export':
+            url = with_year(rng.choice(EXPORT_ROUTES), year)
+            scenario = f"export:{url.split('/')[3].split('?')[0]}"
+        else:
+            continue
+        plan.append((scenario, url))
+    return plan[:n_requests]
+
+
+async def drive(target, plan: list, concurrency: int) -> dict:
+    """Run the plan with a fixed number of concurrent clients."""
+    queue = list(reversed(plan))
+    samples = {}
+
+    async def client():
+        while queue:
+            scenario, url = queue.pop()
+            start = time.perf_counter()
+            try:
+                status, body = await target.get(url)
+            except Exception:
+                status, body = 599, b''
+            elapsed = time.perf_counter() - start
+            samples.setdefault(scenario, []).append((elapsed, status, len(body)))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return {'wallSeconds': time.perf_counter() - start, 'samples': samples}
+
+
+def summarize(run: dict) -> dict:
+    routes = {}
+    all_latencies = []
+    total_errors = 0
+    for scenario, samples in sorted(run['samples'].items()):
+        latencies = sorted(s[0] for s in samples)
+        errors = sum(1 for s in samples if s[1] >= 400)
+        total_errors += errors
+        all_latencies.extend(latencies)
+        routes[scenario] = {
+            'requests': len(samples),
+            'errors': errors,
+            'throughput': len(samples) / run['wallSeconds'],
+            'p50Ms': percentile(latencies, 50) * 1000,
+            'p95Ms': percentile(latencies, 95) * 1000,
+            'p99Ms': percentile(latencies, 99) * 1000,
+            'maxMs': latencies[-1] * 1000,
+            'meanBytes': sum(s[2] for s in samples) / len(samples),
+        }
+    all_latencies.sort()
+    return {
+        'wallSeconds': run['wallSeconds'],
+        'requests': len(all_latencies),
+        'errors': total_errors,
+        'throughput': len(all_latencies) / run['wallSeconds'] if run['wallSeconds'] else 0,
+        'p50Ms': percentile(all_latencies, 50) * 1000,
+        'p95Ms': percentile(all_latencies, 95) * 1000,
+        'p99Ms': percentile(all_latencies, 99) * 1000,
+        'routes': routes,
+    }
+
+
+def print_report(title: str, summary: dict):
+    print(f"\n== {title}: {summary['requests']} requests in {summary['wallSeconds']:.2f}s "
+          f"({summary['throughput']:.1f} req/s, {summary['errors']} errors) ==")
+    print(f"{'route':28s} {'n':>6s} {'err':>5s} {'req/s':>8s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'max ms':>9s}")
+    for scenario, r in summary['routes'].items():
+        print(f"{scenario:28s} {r['requests']:6d} {r['errors']:5d} {r['throughput']:8.1f} "
+              f"{r['p50Ms']:9.2f} {r['p95Ms']:9.2f} {r['p99Ms']:9.2f} {r['maxMs']:9.2f}")
+    print(f"{'ALL':28s} {summary['requests']:6d} {summary['errors']:5d} {summary['throughput']:8.1f} "
+          f"{summary['p50Ms']:9.2f} {summary['p95Ms']:9.2f} {summary['p99Ms']:9.2f}")
+
+
+async def main_async(args) -> dict:
+    years = parse_weights(args.years)
+    mix = parse_weights(args.mix) if args.mix else DEFAULT_MIX
+
+    if args.url:
+        target = HTTPTarget(args.url, args.concurrency)
+        clear_caches = None
+    else:
+        import logging
+        logging.disable(logging.INFO)
+        import server
+
+        if args.csv:
+            os.environ['DATA_CSV_PATH'] = args.csv
+        elif args.papers:
+            tmp = tempfile.mkdtemp()
+            os.environ['DATA_CSV_PATH'] = write_synthetic_csv(
+                os.path.join(tmp, 'scopus_load_test.csv'), args.papers, layout='cleaned', seed=args.seed)
+        target = InProcessTarget(server.app)
+
+        clear_caches = server.dataset_cache.clear
+
+    results = {'config': vars(args)}
+    with contextlib.redirect_stdout(io.StringIO()):
+        entities = await discover(target, list(years), args.sample)
+    plan = build_plan(args.requests, mix, years, entities, args.seed)
+
+    if args.cold:
+        if clear_caches is None:
+            print("Note: --cold with --url relies on the server having been started fresh")
+        else:
+            clear_caches()
+        with contextlib.redirect_stdout(io.StringIO()):
+            run = await drive(target, plan, args.concurrency)
+        results['cold'] = summarize(run)
+        print_report('cold cache', results['cold'])
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        run = await drive(target, plan, args.concurrency)
+    results['warm'] = summarize(run)
+    print_report('warm cache', results['warm'])
+
+    target.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent load test with per-route latency percentiles')
+    parser.add_argument('--url', help='Base URL of a running server; default is in-process')
+    parser.add_argument('--csv', help='Dataset for in-process runs (default: DATA_CSV_PATH or the app default)')
+    parser.add_argument('--papers', type=int, help='Generate a synthetic cleaned dataset of this size for in-process runs')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--years', default='all:6,2025:1,2024:1,2023:1',
+                        help="Year weights, e.g. 'all:6,2024:1'; 'all' sends no year parameter")
+    parser.add_argument('--mix', help=f"Scenario weights, default {','.join(f'{k}:{v}' for k, v in DEFAULT_MIX.items())}")
+    parser.add_argument('--cold', action='store_true', help='Also run once right after clearing the dataset caches')
+    parser.add_argument('--sample', type=int, default=20, help='Entities discovered per year for drill-down URLs')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help='Write the summaries as JSON')
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,275 @@
+"""Benchmark suite for the ingest pipeline, API routes and exports.
+
+Generates synthetic Scopus exports at each requested size and layout, then
+measures wall time and peak traced memory for:
+
+- ``load_and_clean_csv``, ``CSVProcessor.process_data`` and ``get_stats``
+- every API route, cold (first request, includes the dataset build) and warm
+- every Excel export
+
+Results are written as JSON so two runs can be diffed with ``--compare``.
+
+Usage:
+    python -m tests.benchmarks.run_benchmarks --sizes 1000,10000 --layouts cleaned,raw
+    python -m tests.benchmarks.run_benchmarks --compare old.json new.json
+"""
+import argparse
+import asyncio
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / 'backend'
+sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'benchmark')
+
+from tests.benchmarks.asgi_client import asgi_request  # noqa: E402
+from tests.benchmarks.synthetic_scopus import write_synthetic_csv  # noqa: E402
+
+
+EXPORT_ROUTES = ['/api/export/papers', '/api/export/authors', '/api/export/countries', '/api/export/universities']
+
+
+def measure(fn, repeat: int = 3, trace_memory: bool = True) -> dict:
+    """Best-of-N wall time, plus peak traced memory from one extra traced run."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = fn()
+        timings.append(time.perf_counter() - start)
+
+    peak = None
+    if trace_memory:
+        gc.collect()
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'seconds': min(timings),
+        'meanSeconds': sum(timings) / len(timings),
+        'peakBytes': peak,
+        'result': result
+    }
+
+
+def route_list(data: list) -> list:
+    """API routes to benchmark, with drill-down IDs taken from the biggest entities."""
+    routes = [
+        '/api/',
+        '/api/stats',
+        '/api/data/countries',
+        '/api/data/countries?document_type=Article&min_citations=5',
+        '/api/facets',
+        '/api/collaborations?level=country&top_k=100',
+        '/api/collaborations?level=university&top_k=100',
+        '/api/leaderboards/author?metric=hIndex&limit=50',
+        '/api/search',
+    ]
+    if data:
+        country = data[0]
+        routes.append(f"/api/data/country/{country['id']}")
+        routes.append(f"/api/groups/aggregate?countries={','.join(c['id'] for c in data[:10])}")
+        if country['universities']:
+            uni = country['universities'][0]
+            routes.append(f"/api/data/university/{country['id']}/{uni['id']}")
+            routes.append(f"/api/data/university/{country['id']}/{uni['id']}?limit=50")
+            if uni['authors']:
+                author = uni['authors'][0]
+                routes.append(f"/api/data/author/{country['id']}/{uni['id']}/{author['id']}")
+    return routes
+
+
+def run_pipeline(csv_path: str, args) -> list:
+    """Measure the ingest stages on one CSV."""
+    from data_cleaner import load_and_clean_csv
+    from csv_processor import CSVProcessor
+
+    results = []
+    load = measure(lambda: load_and_clean_csv(csv_path), repeat=args.repeat, trace_memory=args.memory)
+    results.append(('load_and_clean_csv', load))
+    df = load['result']
+
+    def process():
+        processor = CSVProcessor(csv_path)
+        processor.df = df
+        return processor.process_data()
+
+    processed = measure(process, repeat=args.repeat, trace_memory=args.memory)
+    results.append(('process_data', processed))
+    processor = processed['result']
+
+    results.append(('get_stats', measure(processor.get_stats, repeat=args.repeat, trace_memory=args.memory)))
+    return results
+
+
+def run_routes(csv_path: str, args) -> list:
+    """Measure every API route and export through the in-process ASGI client."""
+    import server
+
+    os.environ['DATA_CSV_PATH'] = csv_path
+    server.dataset_cache.clear()
+
+    loop = asyncio.new_event_loop()
+
+    def get(url):
+        response = loop.run_until_complete(asgi_request(server.app, url))
+        if response.status != 200:
+            raise RuntimeError(f"{url} returned {response.status}")
+        return len(response.body)
+
+    results = []
+
+    # The first request pays for the full dataset build
+    results.append(('route_cold:/api/stats', measure(lambda: get('/api/stats'), repeat=1, trace_memory=False)))
+
+    data, _ = server.load_data()
+    for url in route_list(data):
+        results.append((f"route:{url}", measure(lambda: get(url), repeat=args.repeat, trace_memory=args.memory)))
+    loop.close()
+
+    if not args.skip_exports:
+        # Repeated export requests are served from the finished, deduplicated
+        # job, so workbook generation is timed on the export functions themselves
+        from exports import EXPORTS
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for url in EXPORT_ROUTES:
+                kind = url.rsplit('/', 1)[1]
+                path = os.path.join(tmp, f"{kind}.xlsx")
+
+                def export():
+                    EXPORTS[kind](data, path)
+                    return os.path.getsize(path)
+
+                results.append((f"export:{url}", measure(export, repeat=args.repeat, trace_memory=args.memory)))
+    return results
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> dict:
+    import logging
+    logging.disable(logging.INFO)
+
+    records = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for layout in args.layouts:
+            for size in args.sizes:
+                csv_path = os.path.join(tmp, f"scopus_{layout}_{size}.csv")
+                start = time.perf_counter()
+                write_synthetic_csv(
+                    csv_path, size, layout=layout,
+                    authors_per_paper=args.authors_per_paper,
+                    affiliations_per_paper=args.affiliations_per_paper,
+                    seed=args.seed
+                )
+                print(f"[{layout} {size}] generated in {time.perf_counter() - start:.1f}s")
+
+                measurements = run_pipeline(csv_path, args) + run_routes(csv_path, args)
+                for stage, m in measurements:
+                    record = {
+                        'layout': layout,
+                        'size': size,
+                        'stage': stage,
+                        'seconds': round(m['seconds'], 6),
+                        'meanSeconds': round(m['meanSeconds'], 6),
+                        'peakBytes': m['peakBytes'],
+                    }
+                    if stage.startswith(('route', 'export')):
+                        record['responseBytes'] = m['result']
+                    records.append(record)
+                    peak = f"{m['peakBytes'] / 1e6:9.1f} MB" if m['peakBytes'] is not None else ''
+                    print(f"[{layout} {size}] {stage:70s} {m['seconds'] * 1000:10.2f} ms {peak}")
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sizes': args.sizes,
+            'layouts': args.layouts,
+            'authorsPerPaper': args.authors_per_paper,
+            'affiliationsPerPaper': args.affiliations_per_paper,
+            'repeat': args.repeat,
+            'seed': args.seed,
+        },
+        'results': records
+    }
+
+
+def compare(old_path: str, new_path: str):
+    """Print per-stage time and memory ratios between two result files."""
+    with open(old_path) as f:
+        old = {(r['layout'], r['size'], r['stage']): r for r in json.load(f)['results']}
+    with open(new_path) as f:
+        new = {(r['layout'], r['size'], r['stage']): r for r in json.load(f)['results']}
+
+    for key in sorted(set(old) & set(new), key=lambda k: (k[0], k[1], k[2])):
+        o, n = old[key], new[key]
+        time_ratio = n['seconds'] / o['seconds'] if o['seconds'] else float('inf')
+        mem = ''
+        if o.get('peakBytes') and n.get('peakBytes'):
+            mem = f"mem x{n['peakBytes'] / o['peakBytes']:.2f}"
+        print(f"{key[0]:8s} {key[1]:>9} {key[2]:70s} time x{time_ratio:.2f} {mem}")
+
+    for key in sorted(set(old) ^ set(new)):
+        print(f"{key[0]:8s} {key[1]:>9} {key[2]:70s} only in {'old' if key in old else 'new'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ingest, API routes and exports')
+    parser.add_argument('--sizes', default='1000,10000',
+                        help='Comma-separated paper counts, e.g. 1000,10000,100000,1000000')
+    parser.add_argument('--layouts', default='cleaned,raw', help='Comma-separated layouts: cleaned, raw')
+    parser.add_argument('--authors-per-paper', type=int, default=5)
+    parser.add_argument('--affiliations-per-paper', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-memory', dest='memory', action='store_false',
+                        help='Skip the traced run used for peak memory')
+    parser.add_argument('--skip-exports', action='store_true')
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='Compare two result files and exit')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    args.sizes = [int(s) for s in args.sizes.split(',') if s]
+    args.layouts = [s.strip() for s in args.layouts.split(',') if s.strip()]
+
+    results = run(args)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
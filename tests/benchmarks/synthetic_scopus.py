@@ -0,0 +1,217 @@
+"""Synthetic Scopus export generator for benchmarks.
+
+Produces both layouts the backend ingests:
+
+- raw: the Scopus CSV export (``Authors with affiliations``, ``Author full names``)
+  that ``DataCleaner`` parses
+- cleaned: the wide layout with ``Author 1..10``, ``Country 1..18``,
+  ``University 1..18`` and ``Author with Affliliation 1..10`` columns
+
+Entity popularity is skewed (a few large institutions and prolific authors, a
+long tail of small ones), which is what the real exports look like.
+"""
+import random
+import sys
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'backend'))
+
+from country_coordinates import COUNTRY_COORDINATES  # noqa: E402
+
+
+MAX_AUTHORS = 10
+MAX_AFFILIATIONS = 18
+
+DOCUMENT_TYPES = ['Article', 'Conference paper', 'Book chapter', 'Review', 'Book']
+DOCUMENT_TYPE_WEIGHTS = [35, 50, 8, 5, 2]
+
+LAST_NAMES = [
+    'Tan', 'Lee', 'Wong', 'Kumar', 'Rahman', 'Ahmed', 'Smith', 'Chen', 'Wang', 'Ali',
+    'Singh', 'Nguyen', 'Garcia', 'Khan', 'Lim', 'Ng', 'Hassan', 'Ibrahim', 'Zhang', 'Liu',
+]
+FIRST_NAMES = [
+    'Wei', 'Aisha', 'Raj', 'Mei', 'Omar', 'Sara', 'John', 'Li', 'Nur', 'Arjun',
+    'Hana', 'Minh', 'Maria', 'Farid', 'Kai', 'Siti', 'Yusuf', 'Priya', 'Jun', 'Adam',
+]
+INSTITUTION_WORDS = [
+    'Technology', 'Science', 'Innovation', 'Engineering', 'Management', 'Medicine',
+    'Applied Sciences', 'Business', 'Computing', 'Agriculture',
+]
+
+
+def _skewed_cum_weights(n: int) -> List[float]:
+    """Zipf-like cumulative weights so low indices are picked far more often."""
+    return list(accumulate(1.0 / (k + 1) for k in range(n)))
+
+
+class SyntheticScopus:
+    """Deterministic generator of synthetic Scopus papers."""
+
+    def __init__(self, n_papers: int, authors_per_paper: int = 5, affiliations_per_paper: int = 3,
+                 n_universities: int = None, n_authors: int = None, seed: int = 42):
+        self.n_papers = n_papers
+        self.authors_per_paper = min(authors_per_paper, MAX_AUTHORS * 2)
+        self.affiliations_per_paper = min(affiliations_per_paper, MAX_AFFILIATIONS)
+        self.rng = random.Random(seed)
+
+        countries = sorted({name.strip() for name in COUNTRY_COORDINATES})
+        n_universities = n_universities or max(50, n_papers // 20)
+        n_authors = n_authors or max(100, n_papers // 2)
+
+        self.universities = []
+        for k in range(n_universities):
+            country = countries[k % len(countries)].title()
+            word = INSTITUTION_WORDS[k % len(INSTITUTION_WORDS)]
+            self.universities.append((f"University of {word} {k}", f"City {k % 997}", country))
+
+        self.authors = []
+        for k in range(n_authors):
+            last = f"{LAST_NAMES[k % len(LAST_NAMES)]}{k // len(LAST_NAMES) or ''}"
+            first = FIRST_NAMES[(k * 7) % len(FIRST_NAMES)]
+            self.authors.append((last, first, str(57000000000 + k)))
+
+        self.university_weights = _skewed_cum_weights(n_universities)
+        self.author_weights = _skewed_cum_weights(n_authors)
+
+    def _pick_unique(self, population: List, cum_weights: List[float], k: int) -> List:
+        picked = {}
+        attempts = 0
+        while len(picked) < min(k, len(population)) and attempts < k * 10:
+            item = self.rng.choices(population, cum_weights=cum_weights)[0]
+            picked[item] = None
+            attempts += 1
+        return list(picked)
+
+    def papers(self) -> List[Dict]:
+        """Generate the paper records shared by both layouts."""
+        rng = self.rng
+        papers = []
+        for n in range(self.n_papers):
+            n_authors = max(1, min(self.authors_per_paper * 2, int(rng.expovariate(1 / self.authors_per_paper)) + 1))
+            n_affiliations = max(1, min(self.affiliations_per_paper * 2, MAX_AFFILIATIONS,
+                                        int(rng.expovariate(1 / self.affiliations_per_paper)) + 1))
+            authors = self._pick_unique(self.authors, self.author_weights, n_authors)
+            affiliations = self._pick_unique(self.universities, self.university_weights, n_affiliations)
+
+            # Every author gets one or two of the paper's affiliations
+            author_affiliations = [
+                sorted({rng.randrange(len(affiliations)) for _ in range(1 + (rng.random() < 0.2))})
+                for _ in authors
+            ]
+
+            eid = f"2-s2.0-{85000000000 + n}"
+            doi = f"10.9999/synthetic.{n}"
+            papers.append({
+                'eid': eid,
+                'title': f"Synthetic study {n} of {INSTITUTION_WORDS[n % len(INSTITUTION_WORDS)].lower()}",
+                'year': 2021 + n % 5,
+                'source': f"Journal of {INSTITUTION_WORDS[(n * 3) % len(INSTITUTION_WORDS)]} {n % 40}",
+                'cited_by': int(rng.paretovariate(1.5)) - 1,
+                'doi': doi,
+                'link': f"https://www.scopus.com/inward/record.uri?eid={eid}&doi={doi}",
+                'document_type': rng.choices(DOCUMENT_TYPES, weights=DOCUMENT_TYPE_WEIGHTS)[0],
+                'authors': authors,
+                'affiliations': affiliations,
+                'author_affiliations': author_affiliations,
+            })
+        return papers
+
+    @staticmethod
+    def to_raw_frame(papers: List[Dict]) -> pd.DataFrame:
+        """Scopus export layout, as parsed by DataCleaner."""
+        rows = []
+        for p in papers:
+            authors_with_affiliations = []
+            for (last, first, _), affil_idx in zip(p['authors'], p['author_affiliations']):
+                affils = ', '.join(', '.join(p['affiliations'][i]) for i in affil_idx)
+                authors_with_affiliations.append(f"{last}, {first}, {affils}")
+            rows.append({
+                'Authors': '; '.join(f"{last}, {first[0]}." for last, first, _ in p['authors']),
+                'Author full names': '; '.join(f"{last}, {first} ({aid})" for last, first, aid in p['authors']),
+                'Author(s) ID': '; '.join(aid for _, _, aid in p['authors']),
+                'Title': p['title'],
+                'Year': p['year'],
+                'Source title': p['source'],
+                'Cited by': p['cited_by'],
+                'DOI': p['doi'],
+                'Link': p['link'],
+                'Affiliations': '; '.join(', '.join(a) for a in p['affiliations']),
+                'Authors with affiliations': '; '.join(authors_with_affiliations),
+                'Document Type': p['document_type'],
+                'Source': 'Scopus',
+                'EID': p['eid'],
+            })
+        return pd.DataFrame(rows)
+
+    @staticmethod
+    def to_cleaned_frame(papers: List[Dict]) -> pd.DataFrame:
+        """Wide cleaned layout, as consumed directly by CSVProcessor."""
+        rows = []
+        for p in papers:
+            row = {}
+            for i in range(1, MAX_AUTHORS + 1):
+                row[f'Author {i}'] = None
+            for i, (last, first, aid) in enumerate(p['authors'][:MAX_AUTHORS], 1):
+                row[f'Author {i}'] = f"{last}, {first} ({aid})"
+            row['Author(s) ID'] = '; '.join(aid for _, _, aid in p['authors'])
+            row['Title'] = p['title']
+            row['Year'] = p['year']
+            row['Source title'] = p['source']
+            row['Cited by'] = p['cited_by']
+            row['DOI'] = p['doi']
+            row['Link'] = p['link']
+            for i in range(1, MAX_AFFILIATIONS + 1):
+                affil = p['affiliations'][i - 1] if i <= len(p['affiliations']) else None
+                row[f'Country {i}'] = affil[2] if affil else None
+            for i in range(1, MAX_AFFILIATIONS + 1):
+                affil = p['affiliations'][i - 1] if i <= len(p['affiliations']) else None
+                row[f'University {i}'] = affil[0] if affil else None
+            for i in range(1, MAX_AUTHORS + 1):
+                row[f'Author with Affliliation {i}'] = None
+            for i, ((last, first, _), affil_idx) in enumerate(zip(p['authors'][:MAX_AUTHORS], p['author_affiliations']), 1):
+                row[f'Author with Affliliation {i}'] = f"{last}, {first} - {p['affiliations'][affil_idx[0]][0]}"
+            row['Document Type'] = p['document_type']
+            row['Publication Stage'] = 'Final'
+            row['Source'] = 'Scopus'
+            row['EID'] = p['eid']
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+
+def write_synthetic_csv(path: str, n_papers: int, layout: str = 'cleaned', **kwargs) -> str:
+    """Write a synthetic export of n_papers in the given layout ('raw' or 'cleaned')."""
+    generator = SyntheticScopus(n_papers, **kwargs)
+    papers = generator.papers()
+    if layout == 'raw':
+        df = generator.to_raw_frame(papers)
+    elif layout == 'cleaned':
+        df = generator.to_cleaned_frame(papers)
+    else:
+        raise ValueError(f"Unknown layout: {layout}")
+    df.to_csv(path, index=False)
+    return path
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Write a synthetic Scopus export')
+    parser.add_argument('path')
+    parser.add_argument('--papers', type=int, default=1000)
+    parser.add_argument('--layout', choices=['raw', 'cleaned'], default='cleaned')
+    parser.add_argument('--authors-per-paper', type=int, default=5)
+    parser.add_argument('--affiliations-per-paper', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    write_synthetic_csv(
+        args.path, args.papers, layout=args.layout,
+        authors_per_paper=args.authors_per_paper,
+        affiliations_per_paper=args.affiliations_per_paper,
+        seed=args.seed
+    )
+    print(f"Wrote {args.papers} {args.layout} papers to {args.path}")
@@ -0,0 +1,48 @@
+"""Precise affiliation mode: each author gets the institutions of their own segment."""
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'backend'))
+
+from data_cleaner import DataCleaner  # noqa: E402
+
+APU = ('Asia Pacific University', 'Malaysia')
+OXFORD = ('University of Oxford', 'United Kingdom')
+
+SEGMENTS = {
+    'lim': 'Lim, A., Asia Pacific University, Kuala Lumpur, Malaysia',
+    'tan': 'Tan, B., University of Oxford, Oxford, United Kingdom',
+}
+
+
+def parse(full_names: str, affiliations: str):
+    cleaner = DataCleaner(pd.DataFrame(), affiliation_mode='precise')
+    return cleaner._parse_author_segments({'Author full names': full_names, 'Authors with affiliations': affiliations})
+
+
+def test_segments_match_authors_by_position_when_counts_agree():
+    pairs = parse('Lim, A. (111); Tan, B. (222)', f"{SEGMENTS['lim']}; {SEGMENTS['tan']}")
+    assert pairs == [('Lim, A.', '111', [APU]), ('Tan, B.', '222', [OXFORD])]
+
+
+def test_position_match_wins_over_surnames():
+    # Counts agree, so segments follow author order even if the names differ
+    pairs = parse('Lim, A. (111); Ng, C. (333)', f"{SEGMENTS['lim']}; {SEGMENTS['tan']}")
+    assert pairs == [('Lim, A.', '111', [APU]), ('Ng, C.', '333', [OXFORD])]
+
+
+def test_surname_fallback_when_counts_differ():
+    pairs = parse('Tan, B. (222); Ng, C. (333); Lim, A. (111)', f"{SEGMENTS['lim']}; {SEGMENTS['tan']}")
+    assert pairs == [('Tan, B.', '222', [OXFORD]), ('Ng, C.', '333', []), ('Lim, A.', '111', [APU])]
+
+
+def test_each_segment_is_used_once_in_the_fallback():
+    pairs = parse('Lim, A. (111); Lim, Z. (999)', SEGMENTS['lim'])
+    assert pairs == [('Lim, A.', '111', [APU]), ('Lim, Z.', '999', [])]
+
+
+def test_missing_affiliations_leave_authors_without_institutions():
+    pairs = parse('Lim, A. (111)', 'nan')
+    assert pairs == [('Lim, A.', '111', [])]
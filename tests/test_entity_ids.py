@@ -0,0 +1,81 @@
+"""Entity IDs: compact hashes, collision fallback and legacy truncated-slug aliases."""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'backend'))
+
+import entity_ids  # noqa: E402
+from entity_ids import ID_LENGTHS, EntityIds, compact_id, legacy_id, slug  # noqa: E402
+
+# Two names whose slugs share their first 50 characters
+LONG_NAME = 'Universiti Teknologi Malaysia Faculty of Computing and Informatics, Johor'
+LONG_SIBLING = 'Universiti Teknologi Malaysia Faculty of Computing and Informatics, Kuala Lumpur'
+
+
+def frozen_too(ids: EntityIds):
+    """The builder and its frozen copy, which must answer every lookup alike."""
+    return [ids, ids.freeze()]
+
+
+def test_ids_are_short_hashes_stable_across_spellings():
+    ids = EntityIds()
+    entity_id = ids.assign('university', 'Asia Pacific University')
+    assert entity_id == compact_id('Asia Pacific University') and len(entity_id) == ID_LENGTHS[0]
+    assert ids.assign('university', 'asia pacific university.') == entity_id
+    for lookup in frozen_too(ids):
+        assert lookup.id_for('university', 'ASIA PACIFIC UNIVERSITY') == entity_id
+        assert lookup.key('university', entity_id) == 0
+
+
+def test_colliding_short_id_falls_back_to_the_next_length(monkeypatch):
+    real = entity_ids.compact_id
+
+    def colliding(text, length=ID_LENGTHS[0]):
+        return 'a' * length if length == ID_LENGTHS[0] else real(text, length)
+
+    monkeypatch.setattr(entity_ids, 'compact_id', colliding)
+    ids = EntityIds()
+    first = ids.assign('author', 'Lim, A.')
+    second = ids.assign('author', 'Tan, B.')
+
+    assert first == 'a' * ID_LENGTHS[0]
+    assert second == real('Tan, B.', ID_LENGTHS[1]) and len(second) == ID_LENGTHS[1]
+    assert ids.assign('author', 'Tan, B.') == second
+    for lookup in frozen_too(ids):
+        assert [lookup.key('author', first), lookup.key('author', second)] == [0, 1]
+        assert lookup.id_for('author', 'Tan, B.') == second
+        assert lookup.resolve('author', second) == second
+
+
+def test_every_length_taken_is_an_error(monkeypatch):
+    monkeypatch.setattr(entity_ids, 'compact_id', lambda text, length=ID_LENGTHS[0]: 'a' * length)
+    ids = EntityIds()
+    for name in ('A', 'B', 'C'):
+        ids.assign('country', name)
+    with pytest.raises(ValueError):
+        ids.assign('country', 'D')
+
+
+def test_legacy_truncated_slug_resolves_to_the_first_name_with_that_prefix():
+    ids = EntityIds()
+    current = ids.assign('university', LONG_NAME)
+    sibling = ids.assign('university', LONG_SIBLING)
+    legacy = legacy_id(LONG_NAME)
+
+    assert len(legacy) == 50 and legacy == legacy_id(LONG_SIBLING) and legacy == slug(LONG_NAME)[:50]
+    assert current != sibling
+    for lookup in frozen_too(ids):
+        assert lookup.resolve('university', legacy) == current
+        assert lookup.resolve('university', sibling) == sibling
+        assert lookup.key('university', legacy) is None
+
+
+@pytest.mark.parametrize('entity_id', ['', 'unknown', legacy_id(LONG_NAME)[:49]])
+def test_unknown_ids_do_not_resolve(entity_id):
+    ids = EntityIds()
+    ids.assign('university', LONG_NAME)
+    for lookup in frozen_too(ids):
+        assert lookup.resolve('university', entity_id) is None
+        assert lookup.resolve('country', legacy_id(LONG_NAME)) is None
@@ -0,0 +1,113 @@
+"""Export job queue: dedupe, retry after failure, backpressure and artifact expiry."""
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'backend'))
+
+from export_jobs import ExportJobQueue, QueueFullError  # noqa: E402
+
+KEY = ('leaderboard', None, 'v1')
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    queues = []
+
+    def make(**settings):
+        queue = ExportJobQueue(directory=str(tmp_path), **settings)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.shutdown()
+
+
+def write_artifact(path, progress):
+    progress(0.5)
+    with open(path, 'wb') as f:
+        f.write(b'xlsx')
+
+
+def fail(path, progress):
+    raise RuntimeError('export broke')
+
+
+def blocked_until(event: threading.Event):
+    """Runner that holds its worker until the event is set."""
+    def run(path, progress):
+        assert event.wait(5)
+        write_artifact(path, progress)
+    return run
+
+
+def finish(job):
+    job.future.result(timeout=5)
+    return job
+
+
+def test_same_key_returns_the_running_and_then_the_finished_job(make_queue):
+    queue = make_queue()
+    release = threading.Event()
+    job = queue.submit('leaderboard', None, KEY, 'leaderboard.xlsx', blocked_until(release))
+    assert queue.submit('leaderboard', None, KEY, 'leaderboard.xlsx', fail) is job
+
+    release.set()
+    finish(job)
+    assert job.status == 'done' and job.progress == 1.0
+    assert queue.submit('leaderboard', None, KEY, 'leaderboard.xlsx', fail) is job
+    with open(job.path, 'rb') as f:
+        assert f.read() == b'xlsx'
+
+
+def test_other_keys_get_their_own_jobs(make_queue):
+    queue = make_queue()
+    first = finish(queue.submit('leaderboard', None, KEY, 'a.xlsx', write_artifact))
+    second = finish(queue.submit('leaderboard', 2023, ('leaderboard', 2023, 'v1'), 'b.xlsx', write_artifact))
+    assert first.id != second.id and first.path != second.path
+
+
+def test_failed_job_is_replaced_on_resubmit(make_queue, tmp_path):
+    queue = make_queue()
+    failed = finish(queue.submit('leaderboard', None, KEY, 'leaderboard.xlsx', fail))
+    assert failed.status == 'failed' and failed.error == 'export broke'
+    assert not any(name.endswith('.tmp') for name in os.listdir(tmp_path))
+
+    retried = finish(queue.submit('leaderboard', None, KEY, 'leaderboard.xlsx', write_artifact))
+    assert retried is not failed and retried.status == 'done'
+    assert queue.submit('leaderboard', None, KEY, 'leaderboard.xlsx', fail) is retried
+
+
+def test_submits_beyond_max_pending_are_rejected(make_queue):
+    queue = make_queue(max_workers=1, max_pending=2)
+    release = threading.Event()
+    jobs = [queue.submit('leaderboard', year, ('leaderboard', year, 'v1'), 'x.xlsx', blocked_until(release))
+            for year in (2021, 2022)]
+    try:
+        with pytest.raises(QueueFullError):
+            queue.submit('leaderboard', 2023, ('leaderboard', 2023, 'v1'), 'x.xlsx', write_artifact)
+        # A duplicate of a pending job is still answered while the queue is full
+        assert queue.submit('leaderboard', 2021, ('leaderboard', 2021, 'v1'), 'x.xlsx', write_artifact) is jobs[0]
+    finally:
+        release.set()
+
+    for job in jobs:
+        finish(job)
+    assert finish(queue.submit('leaderboard', 2023, ('leaderboard', 2023, 'v1'), 'x.xlsx', write_artifact)).status == 'done'
+
+
+def test_expired_jobs_are_forgotten_and_their_artifacts_deleted(make_queue):
+    queue = make_queue(ttl_seconds=0.05)
+    job = finish(queue.submit('leaderboard', None, KEY, 'leaderboard.xlsx', write_artifact))
+    assert os.path.exists(job.path) and queue.get(job.id) is job
+
+    time.sleep(0.1)
+    assert queue.get(job.id) is None
+    assert not os.path.exists(job.path)
+    # The key is free again, so the next submit runs a new export
+    assert finish(queue.submit('leaderboard', None, KEY, 'leaderboard.xlsx', write_artifact)) is not job
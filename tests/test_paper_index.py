@@ -0,0 +1,115 @@
+"""Paper set algebra: bitmap and key-array sets agree with plain Python sets."""
+import itertools
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'backend'))
+
+from entity_ids import EntityIds  # noqa: E402
+from flat_tables import RaggedArray  # noqa: E402
+from paper_index import PaperBitmapIndex  # noqa: E402
+
+# More than two 64-bit words, so bitsets span several words and a partial last one
+N_PAPERS = 150
+
+
+def build_index():
+    """An index over random memberships, with the expected paper id sets per entity."""
+    rng = random.Random(7)
+    ids = EntityIds()
+    paper_ids = [f'2-s2.0-{i}' for i in range(N_PAPERS)]
+    for paper_id in paper_ids:
+        ids.add_paper(paper_id)
+    citations = np.array([rng.randrange(50) for _ in paper_ids], dtype=np.int64)
+
+    members = {}
+    for kind, names in (('country', ['Malaysia', 'Japan', 'Chile', 'Empty Country']),
+                        ('university', ['APU', 'Oxford', 'Tokyo', 'Empty University']),
+                        ('author', ['Lim', 'Tan', 'Ng'])):
+        for name in names:
+            entity_id = ids.assign(kind, name)
+            keys = [] if name.startswith('Empty') else sorted(rng.sample(range(N_PAPERS), rng.randrange(5, 80)))
+            members[(kind, name)] = (entity_id, keys)
+
+    index = PaperBitmapIndex(ids.freeze(), citations)
+    pairs = [(ids.key('country', entity_id), key)
+             for (kind, _), (entity_id, keys) in members.items() if kind == 'country' for key in keys]
+    rows, cols = (np.array(column, dtype=np.int64) for column in zip(*pairs))
+    index.add_entities('country', rows, cols)
+    for kind in ('university', 'author'):
+        index.sorted_keys[kind] = RaggedArray([
+            np.array(keys, dtype=np.int32) for (k, _), (_, keys) in members.items() if k == kind
+        ])
+
+    expected = {entity: {paper_ids[key] for key in keys} for entity, (_, keys) in members.items()}
+    entity_ids = {entity: entity_id for entity, (entity_id, _) in members.items()}
+    return index, entity_ids, expected, dict(zip(paper_ids, citations.tolist())), paper_ids
+
+
+@pytest.fixture(scope='module')
+def built():
+    return build_index()
+
+
+def assert_matches(index, papers, expected_ids, citations, paper_ids):
+    assert index.count(papers) == len(expected_ids)
+    assert index.citation_count(papers) == sum(citations[p] for p in expected_ids)
+    assert index.paper_ids_for(papers) == [p for p in paper_ids if p in expected_ids]
+
+
+MIXED = [
+    [('country', 'Malaysia'), ('university', 'Oxford')],
+    [('country', 'Japan'), ('author', 'Lim'), ('university', 'APU')],
+    [('country', 'Malaysia'), ('country', 'Chile')],
+    [('university', 'Tokyo'), ('author', 'Tan'), ('author', 'Ng')],
+    [('country', 'Chile'), ('country', 'Japan'), ('university', 'Oxford'), ('author', 'Ng')],
+]
+
+
+@pytest.mark.parametrize('entities', MIXED)
+def test_union_matches_python_sets(built, entities):
+    index, entity_ids, expected, citations, paper_ids = built
+    sets = [index.get(kind, entity_ids[(kind, name)]) for kind, name in entities]
+    assert_matches(index, index.union(sets), set().union(*(expected[e] for e in entities)), citations, paper_ids)
+
+
+@pytest.mark.parametrize('entities', MIXED)
+def test_intersection_matches_python_sets(built, entities):
+    index, entity_ids, expected, citations, paper_ids = built
+    sets = [index.get(kind, entity_ids[(kind, name)]) for kind, name in entities]
+    anded = set.intersection(*(expected[e] for e in entities))
+    assert_matches(index, index.intersection(sets), anded, citations, paper_ids)
+
+
+def test_every_pair_in_either_order(built):
+    index, entity_ids, expected, citations, paper_ids = built
+    for a, b in itertools.permutations(expected, 2):
+        sets = [index.get(kind, entity_ids[(kind, name)]) for kind, name in (a, b)]
+        assert index.count(index.union(sets)) == len(expected[a] | expected[b])
+        assert index.paper_ids_for(index.intersection(sets)) == [p for p in paper_ids if p in expected[a] & expected[b]]
+
+
+def test_empty_inputs_give_empty_sets(built):
+    index, _, _, citations, paper_ids = built
+    assert_matches(index, index.union([]), set(), citations, paper_ids)
+    assert_matches(index, index.intersection([]), set(), citations, paper_ids)
+
+
+@pytest.mark.parametrize('kind, name', [('country', 'Empty Country'), ('university', 'Empty University')])
+def test_entity_without_papers_empties_an_intersection(built, kind, name):
+    index, entity_ids, expected, citations, paper_ids = built
+    empty = index.get(kind, entity_ids[(kind, name)])
+    assert_matches(index, empty, set(), citations, paper_ids)
+    malaysia = index.get('country', entity_ids[('country', 'Malaysia')])
+    assert_matches(index, index.intersection([malaysia, empty]), set(), citations, paper_ids)
+    assert_matches(index, index.union([malaysia, empty]), expected[('country', 'Malaysia')], citations, paper_ids)
+
+
+@pytest.mark.parametrize('kind', ['country', 'university', 'author'])
+def test_missing_entity_has_no_paper_set(built, kind):
+    index = built[0]
+    assert index.get(kind, 'no-such-entity') is None
@@ -0,0 +1,88 @@
+"""Ingest validation: malformed rows are set aside instead of failing the build."""
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'backend'))
+
+from row_validation import validate_rows  # noqa: E402
+
+
+def frame(**overrides) -> pd.DataFrame:
+    """Three well-formed cleaned rows, with per-row overrides as {column: {row: value}}."""
+    df = pd.DataFrame({
+        'EID': ['2-s2.0-1', '2-s2.0-2', '2-s2.0-3'],
+        'Title': ['First', 'Second', 'Third'],
+        'Year': [2021, 2022, 2023],
+        'Cited by': [1, 2, 3],
+        'Author 1': ['Lim, A. (111)', 'Tan, B. (222)', 'Ng, C. (333)'],
+        'Author 2': ['Ali, D. (444)', None, None],
+    }).astype(object)
+    for column, values in overrides.items():
+        for row, value in values.items():
+            df.loc[row, column] = value
+    return df
+
+
+def test_well_formed_rows_pass_with_integer_columns():
+    valid, quarantined = validate_rows(frame())
+    assert len(valid) == 3 and quarantined.empty
+    assert valid['Year'].dtype == 'int64' and valid['Cited by'].dtype == 'int64'
+    assert valid['Year'].tolist() == [2021, 2022, 2023]
+
+
+def test_non_numeric_year_is_quarantined():
+    valid, quarantined = validate_rows(frame(Year={1: 'n/a'}))
+    assert valid['EID'].tolist() == ['2-s2.0-1', '2-s2.0-3']
+    assert quarantined['EID'].tolist() == ['2-s2.0-2']
+    assert quarantined['Reason'].tolist() == ['invalid year']
+
+
+def test_fractional_missing_and_out_of_range_years_are_quarantined():
+    valid, quarantined = validate_rows(frame(Year={0: 2023.5, 1: None, 2: 1850}))
+    assert valid.empty
+    assert quarantined['Reason'].tolist() == ['invalid year'] * 3
+
+
+def test_non_numeric_and_negative_citations_are_quarantined():
+    valid, quarantined = validate_rows(frame(**{'Cited by': {0: 'twelve', 1: -4}}))
+    assert valid['EID'].tolist() == ['2-s2.0-3']
+    assert quarantined['Reason'].tolist() == ['invalid citation count'] * 2
+
+
+def test_blank_and_grouped_citations_are_coerced():
+    valid, quarantined = validate_rows(frame(**{'Cited by': {0: None, 1: '1,204'}}))
+    assert quarantined.empty
+    assert valid['Cited by'].tolist() == [0, 1204, 3]
+
+
+def test_later_duplicate_eid_is_quarantined():
+    valid, quarantined = validate_rows(frame(EID={2: '2-s2.0-1'}))
+    assert valid['Title'].tolist() == ['First', 'Second']
+    assert quarantined['Title'].tolist() == ['Third']
+    assert quarantined['Reason'].tolist() == ['duplicate EID']
+
+
+def test_rows_without_eid_are_kept():
+    valid, quarantined = validate_rows(frame(EID={0: None, 1: ''}))
+    assert len(valid) == 3 and quarantined.empty
+
+
+def test_malformed_author_id_drops_only_that_cell():
+    valid, quarantined = validate_rows(frame(**{'Author 2': {0: 'Ali, D. (44x4)'}}))
+    assert quarantined.empty
+    assert pd.isna(valid.loc[0, 'Author 2'])
+    assert valid.loc[0, 'Author 1'] == 'Lim, A. (111)'
+
+
+def test_name_only_authors_are_kept():
+    valid, quarantined = validate_rows(frame(**{'Author 1': {1: 'Tan, B.'}}))
+    assert quarantined.empty
+    assert valid.loc[1, 'Author 1'] == 'Tan, B.'
+
+
+def test_every_failed_check_is_listed():
+    valid, quarantined = validate_rows(frame(Year={2: 'soon'}, EID={2: '2-s2.0-1'}, **{'Cited by': {2: 'many'}}))
+    assert quarantined['Reason'].tolist() == ['invalid year; invalid citation count; duplicate EID']
+    assert quarantined.loc[2, 'Cited by'] == 'many'
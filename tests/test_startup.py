@@ -0,0 +1,47 @@
+"""Import-time budget for the API server.
+
+Each uvicorn worker imports ``server`` before it can answer a request, so
+dependencies only needed to build a dataset, write an export or talk to
+MongoDB must stay out of the import path.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1] / 'backend'
+
+# Cumulative microseconds for `import server`; override on slow machines
+IMPORT_BUDGET_US = int(os.environ.get('SERVER_IMPORT_BUDGET_MS', '1500')) * 1000
+
+# Loaded on first use by the dataset build, exports and persistence
+DEFERRED_MODULES = ('pandas', 'scipy', 'openpyxl', 'motor', 'pymongo', 'csv_processor', 'data_cleaner')
+
+
+def import_times() -> dict:
+    """Run `python -X importtime -c 'import server'` and parse cumulative times per module."""
+    env = dict(os.environ, MONGO_URL='mongodb://localhost:27017', DB_NAME='import_time')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import server'],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_server_import_defers_heavy_dependencies():
+    times = import_times()
+    loaded = sorted(m for m in times if m.split('.')[0] in DEFERRED_MODULES)
+    assert not loaded, f"imported at server startup: {', '.join(loaded)}"
+
+
+def test_server_import_within_budget():
+    times = import_times()
+    assert times['server'] <= IMPORT_BUDGET_US, (
+        f"import server took {times['server'] / 1000:.0f} ms, budget {IMPORT_BUDGET_US / 1000:.0f} ms"
+    )